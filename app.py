@@ -7,6 +7,7 @@ from flask_wtf.csrf import CSRFProtect
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from sqlalchemy import event
+import click
 import calendar
 import os
 import base64
@@ -15,15 +16,34 @@ from instance.install_core import install_core
 from datetime import datetime, timedelta
 from instance.base import Expenses, Employee, Company, MonthlySummary, SimpleMonthlySummary, SimpleExpenses, Settings, Info
 from day_checker import start_day_checker
+from salary_automation import backfill_fixed_expenses
 from flask_migrate import Migrate
 from auto_migrate import run_auto_migration
 from config import get_config
+from json_provider import configure_json
+from compression import compression
+from static_assets import static_assets, build_assets
+from sqlite_pragmas import configure_sqlite, checkpoint
+from conditional import ConditionalResponse, row_state
+from config_cache import config_cache
+from company_directory import company_page
+from pagination import keyset_paginate, invalidate_counts, cursor_matches_sort
+from expense_categories import top_expense_categories
+from periods import month_filter, shift_month, parse_month, months_between
+from serializers import get_serializer
+from summary_cache import summary_cache
+from user_cache import user_cache
+from summary_rebuild import LEDGERS, rebuild_summaries
+from summary_updates import ledger_deltas, simple_ledger_deltas, combine_deltas, upsert_summary_delta, apply_summary_delta
 
 
 app = Flask(__name__)
 
 # Load configuration from config.py
 app.config.from_object(get_config())
+configure_json(app)
+compression.configure(app)
+static_assets.configure(app)
 
 # Initialize extensions
 migrate = Migrate(app, db)
@@ -38,13 +58,35 @@ limiter = Limiter(
 basedir = os.path.abspath(os.path.dirname(__file__))
 
 db.init_app(app)
+with app.app_context():
+    configure_sqlite(db.engine, app.config)
 login_manager.init_app(app)
 login_manager.login_view = "login"  
+summary_cache.configure(app)
+user_cache.configure(app)
+
+MAX_SUMMARY_RANGE_MONTHS = 36
+
+# Categorias mostradas no gráfico circular; as restantes vão para "Outros"
+PIE_TOP_CATEGORIES = 8
+
+COMPANY_PAGE_SIZE = 50
+
+# Meses dos gráficos enviados por /api/dashboard (o mês anterior, para as variações, fica incluído)
+DASHBOARD_CHART_MONTHS = 6
+
+TRANSACTIONS_DEFAULT_LIMIT = 50
+TRANSACTIONS_MAX_LIMIT = 200
+
+# sort=... -> coluna usada como chave do cursor em /api/transactions (None = create_date)
+TRANSACTION_SORT_COLUMNS = {
+    'date': None,
+    'amount': Expenses.gross_value,
+}
 
 @login_manager.user_loader
 def load_user(user_id):
-    from instance.base import User
-    return User.query.get(int(user_id))
+    return user_cache.get(int(user_id))
 
 @app.route('/main-menu/<company_id>')
 @login_required
@@ -129,11 +171,16 @@ def logout():
 @app.route('/expenses/<int:company_id>')
 @login_required
 def expenses(company_id):
-    page = request.args.get('page', 1, type=int)  
     per_page = 100  
     user_type = current_user.type
     
-    pagination = Expenses.query.filter_by(company_id=company_id).order_by(Expenses.create_date.desc()).paginate(page=page, per_page=per_page, error_out=False)
+    pagination = keyset_paginate(
+        Expenses,
+        company_id,
+        per_page=per_page,
+        after=request.args.get('after'),
+        before=request.args.get('before')
+    )
     
     all_expenses = pagination.items
 
@@ -173,9 +220,11 @@ def add_expense():
         )
         
         db.session.add(new_expense)
-        db.session.commit()
+        db.session.flush()
         
         update_monthly_summary(new_expense)
+        db.session.commit()
+        invalidate_counts(Expenses, new_expense.company_id)
         
         flash('✅ Transação adicionada com sucesso!', 'success')
         return redirect(url_for('expenses', company_id=company_id))
@@ -191,63 +240,15 @@ def add_expense():
             return redirect(url_for('company'))
         
 def update_monthly_summary(expense):
-    try:
-        transaction_date = expense.create_date
-        month = transaction_date.month
-        year = transaction_date.year
-        
-        print(f"Updating monthly summary for: Month {month}, Year {year}, Company {expense.company_id}")
-        
-        summary = MonthlySummary.query.filter_by(
-            month=month, 
-            year=year,
-            company_id=expense.company_id
-        ).first()
-        
-        if not summary:
-            print(f"Creating new monthly summary")
-            summary = MonthlySummary(
-                month=month,
-                year=year,
-                company_id=expense.company_id,
-                total_sales=0.0,
-                total_sales_without_vat=0.0,
-                total_vat=0.0,
-                total_costs=0.0,
-                total_costs_without_vat=0.0,  # Inicializa explicitamente como 0.0
-                profit=0.0,
-                profit_without_vat=0.0
-            )
-            db.session.add(summary)
-        
-        # Garantir que todos os campos numéricos são inicializados
-        if summary.total_costs_without_vat is None:
-            summary.total_costs_without_vat = 0.0
-        if summary.total_sales_without_vat is None:
-            summary.total_sales_without_vat = 0.0
-        
-        if expense.transaction_type.lower() == 'ganho':
-            print(f"Processing gain: {expense.gross_value}")
-            summary.total_sales += expense.gross_value
-            summary.total_sales_without_vat += expense.net_value
-            summary.total_vat += expense.iva_value
-        elif expense.transaction_type.lower() == 'despesa':
-            print(f"Processing expense: {expense.gross_value}")
-            summary.total_costs += expense.gross_value
-            summary.total_costs_without_vat += expense.net_value
-            summary.total_vat -= expense.iva_value
-        
-        # Atualizar cálculos de lucro
-        summary.profit = summary.total_sales - summary.total_costs
-        summary.profit_without_vat = summary.total_sales_without_vat - summary.total_costs_without_vat
-        
-        print(f"Committing changes: profit={summary.profit}, profit_without_vat={summary.profit_without_vat}")
-        db.session.commit()
-        print("Monthly summary updated successfully")
-    except Exception as e:
-        db.session.rollback()
-        print(f"Error updating monthly summary: {str(e)}")
-        raise
+    transaction_date = expense.create_date
+    
+    upsert_summary_delta(
+        MonthlySummary,
+        expense.company_id,
+        transaction_date.year,
+        transaction_date.month,
+        ledger_deltas(expense.transaction_type, expense.gross_value, expense.net_value, expense.iva_value)
+    )
     
 @app.route('/delete-expense/<int:expense_id>', methods=['POST'])
 @login_required
@@ -270,7 +271,6 @@ def delete_expense(expense_id):
         transaction_date = expense.create_date
         
         db.session.delete(expense)
-        db.session.commit()
         
         remove_from_monthly_summary(
             transaction_date,
@@ -280,6 +280,8 @@ def delete_expense(expense_id):
             net_value,
             iva_value
         )
+        db.session.commit()
+        invalidate_counts(Expenses, company_id)
         
         return jsonify({'success': True, 'company_id': company_id}), 200
         
@@ -288,44 +290,13 @@ def delete_expense(expense_id):
         return jsonify({'success': False, 'message': str(e)}), 500
     
 def remove_from_monthly_summary(date, company_id, transaction_type, gross_value, net_value, iva_value):
-    try:
-        month = date.month
-        year = date.year
-        
-        print(f"Removing from monthly summary: Month {month}, Year {year}, Company {company_id}")
-        
-        summary = MonthlySummary.query.filter_by(
-            month=month, 
-            year=year,
-            company_id=company_id
-        ).first()
-        
-        if summary:
-            # Garantir que todos os campos numéricos são inicializados
-            if summary.total_costs_without_vat is None:
-                summary.total_costs_without_vat = 0.0
-            if summary.total_sales_without_vat is None:
-                summary.total_sales_without_vat = 0.0
-                
-            if transaction_type.lower() == 'ganho':
-                summary.total_sales -= gross_value
-                summary.total_sales_without_vat -= net_value
-                summary.total_vat -= iva_value
-            elif transaction_type.lower() == 'despesa':
-                summary.total_costs -= gross_value
-                summary.total_costs_without_vat -= net_value
-                summary.total_vat += iva_value
-            
-            summary.profit = summary.total_sales - summary.total_costs
-            summary.profit_without_vat = summary.total_sales_without_vat - summary.total_costs_without_vat
-            
-            print(f"Committing changes: profit={summary.profit}, profit_without_vat={summary.profit_without_vat}")
-            db.session.commit()
-            print("Monthly summary updated successfully after removal")
-    except Exception as e:
-        db.session.rollback()
-        print(f"Error removing from monthly summary: {str(e)}")
-        raise
+    apply_summary_delta(
+        MonthlySummary,
+        company_id,
+        date.year,
+        date.month,
+        ledger_deltas(transaction_type, gross_value, net_value, iva_value, sign=-1)
+    )
     
 @app.route('/get-expense/<int:expense_id>')
 @login_required
@@ -333,17 +304,7 @@ def get_expense(expense_id):
     try:
         expense = Expenses.query.get_or_404(expense_id)
         
-        
-        expense_dict = {
-            'id': expense.id,
-            'transaction_type': expense.transaction_type,
-            'description': expense.description,
-            'gross_value': expense.gross_value,
-            'iva_rate': expense.iva_rate,
-            'iva_value': expense.iva_value,
-            'net_value': expense.net_value,
-            'company_id': expense.company_id 
-        }
+        expense_dict = get_serializer('expense').dump(expense)
         
         return jsonify({'success': True, 'expense': expense_dict})
         
@@ -376,8 +337,6 @@ def update_expense(expense_id):
         expense.iva_value = float(request.form.get('iva_value'))
         expense.net_value = float(request.form.get('net_value'))
         
-        db.session.commit()
-        
         adjust_monthly_summary(
             expense,
             old_transaction_type,
@@ -385,6 +344,7 @@ def update_expense(expense_id):
             old_net_value,
             old_iva_value
         )
+        db.session.commit()
         
         flash('✅ Transação atualizada com sucesso!', 'success')
         return redirect(url_for('expenses', company_id=company_id))
@@ -404,80 +364,19 @@ def update_expense(expense_id):
             return redirect(url_for('company'))
         
 def adjust_monthly_summary(expense, old_type, old_gross, old_net, old_iva):
-    try:
-        transaction_date = expense.create_date
-        month = transaction_date.month
-        year = transaction_date.year
-        
-        print(f"Adjusting monthly summary for: Month {month}, Year {year}, Company {expense.company_id}")
-        
-        summary = MonthlySummary.query.filter_by(
-            month=month, 
-            year=year,
-            company_id=expense.company_id
-        ).first()
-        
-        if not summary:
-            print(f"Creating new monthly summary during adjustment")
-            summary = MonthlySummary(
-                month=month,
-                year=year,
-                company_id=expense.company_id,
-                total_sales=0.0,
-                total_sales_without_vat=0.0,
-                total_vat=0.0,
-                total_costs=0.0,
-                total_costs_without_vat=0.0,  # Inicializa explicitamente como 0.0
-                profit=0.0,
-                profit_without_vat=0.0
-            )
-            db.session.add(summary)
-            
-            if expense.transaction_type.lower() == 'ganho':
-                summary.total_sales += expense.gross_value
-                summary.total_sales_without_vat += expense.net_value
-                summary.total_vat += expense.iva_value
-            elif expense.transaction_type.lower() == 'despesa':
-                summary.total_costs += expense.gross_value
-                summary.total_costs_without_vat += expense.net_value
-                summary.total_vat -= expense.iva_value  
-        else:
-            # Garantir que todos os campos numéricos são inicializados
-            if summary.total_costs_without_vat is None:
-                summary.total_costs_without_vat = 0.0
-            if summary.total_sales_without_vat is None:
-                summary.total_sales_without_vat = 0.0
-                
-            # Remover os valores antigos
-            if old_type.lower() == 'ganho':
-                summary.total_sales -= old_gross
-                summary.total_sales_without_vat -= old_net
-                summary.total_vat -= old_iva
-            elif old_type.lower() == 'despesa':
-                summary.total_costs -= old_gross
-                summary.total_costs_without_vat -= old_net
-                summary.total_vat += old_iva  
-            
-            # Adicionar os novos valores
-            if expense.transaction_type.lower() == 'ganho':
-                summary.total_sales += expense.gross_value
-                summary.total_sales_without_vat += expense.net_value
-                summary.total_vat += expense.iva_value
-            elif expense.transaction_type.lower() == 'despesa':
-                summary.total_costs += expense.gross_value
-                summary.total_costs_without_vat += expense.net_value
-                summary.total_vat -= expense.iva_value 
-        
-        summary.profit = summary.total_sales - summary.total_costs
-        summary.profit_without_vat = summary.total_sales_without_vat - summary.total_costs_without_vat
-        
-        print(f"Committing changes: profit={summary.profit}, profit_without_vat={summary.profit_without_vat}")
-        db.session.commit()
-        print("Monthly summary adjusted successfully")
-    except Exception as e:
-        db.session.rollback()
-        print(f"Error adjusting monthly summary: {str(e)}")
-        raise
+    transaction_date = expense.create_date
+    new_deltas = ledger_deltas(expense.transaction_type, expense.gross_value, expense.net_value, expense.iva_value)
+    old_deltas = ledger_deltas(old_type, old_gross, old_net, old_iva, sign=-1)
+    
+    # Sem resumo existente, o novo resumo recebe apenas os valores atuais
+    upsert_summary_delta(
+        MonthlySummary,
+        expense.company_id,
+        transaction_date.year,
+        transaction_date.month,
+        combine_deltas(old_deltas, new_deltas),
+        initial=new_deltas
+    )
     
 @app.route('/employee/<int:company_id>')
 @login_required
@@ -527,19 +426,7 @@ def add_employee():
         db.session.add(new_employee)
         db.session.commit()
         
-        employee_data = {
-            'id': new_employee.id,
-            'name': new_employee.name,
-            'position': new_employee.position,
-            'gross_salary': new_employee.gross_salary,
-            'social_security_rate': new_employee.social_security_rate,
-            'employer_social_security_rate': new_employee.employer_social_security_rate,
-            'irs_rate': new_employee.irs_rate,
-            'extra_payment': new_employee.extra_payment,
-            'extra_payment_description': new_employee.extra_payment_description,
-            'is_active': new_employee.is_active,
-            'company_id': new_employee.company_id
-        }
+        employee_data = get_serializer('employee').dump(new_employee)
         
         return jsonify({
             'success': True, 
@@ -560,28 +447,17 @@ def get_employees(company_id):
     try:
         company = Company.query.get_or_404(company_id)
         
-        employees = Employee.query.filter_by(company_id=company_id).all()
-        employees_list = []
-        
-        for emp in employees:
-            employees_list.append({
-                'id': emp.id,
-                'name': emp.name,
-                'position': emp.position,
-                'gross_salary': emp.gross_salary,
-                'social_security_rate': emp.social_security_rate,
-                'employer_social_security_rate': emp.employer_social_security_rate,
-                'irs_rate': emp.irs_rate,
-                'extra_payment': emp.extra_payment,
-                'extra_payment_description': emp.extra_payment_description,
-                'is_active': emp.is_active,
-                'company_id': emp.company_id
-            })
+        conditional = ConditionalResponse(row_state(Employee, Employee.company_id == company_id))
+        if conditional.is_fresh:
+            return conditional.not_modified()
         
-        return jsonify({
+        serializer = get_serializer('employee')
+        rows = db.session.execute(serializer.select().where(Employee.company_id == company_id)).all()
+        
+        return conditional.finalize(jsonify({
             'success': True,
-            'employees': employees_list
-        })
+            'employees': serializer.dump_rows(rows)
+        }))
     
     except Exception as e:
         return jsonify({
@@ -624,19 +500,7 @@ def update_employee(employee_id):
         
         db.session.commit()
         
-        employee_data = {
-            'id': employee.id,
-            'name': employee.name,
-            'position': employee.position,
-            'gross_salary': employee.gross_salary,
-            'social_security_rate': employee.social_security_rate,
-            'employer_social_security_rate': employee.employer_social_security_rate,
-            'irs_rate': employee.irs_rate,
-            'extra_payment': employee.extra_payment,
-            'extra_payment_description': employee.extra_payment_description,
-            'is_active': employee.is_active,
-            'company_id': employee.company_id
-        }
+        employee_data = get_serializer('employee').dump(employee)
         
         return jsonify({
             'success': True,
@@ -702,19 +566,7 @@ def get_employee(employee_id):
                 'message': 'Acesso negado a este empregado.'
             }), 403
         
-        employee_data = {
-            'id': employee.id,
-            'name': employee.name,
-            'position': employee.position,
-            'gross_salary': employee.gross_salary,
-            'social_security_rate': employee.social_security_rate,
-            'employer_social_security_rate': employee.employer_social_security_rate,
-            'irs_rate': employee.irs_rate,
-            'extra_payment': employee.extra_payment,
-            'extra_payment_description': employee.extra_payment_description,
-            'is_active': employee.is_active,
-            'company_id': employee.company_id
-        }
+        employee_data = get_serializer('employee').dump(employee)
         
         return jsonify({
             'success': True,
@@ -766,8 +618,9 @@ def toggle_employee_status(employee_id):
 @app.route('/company')
 @login_required
 def company():
-    companies = Company.query.all()
-    return render_template('company.html', companies=companies)
+    search = request.args.get('q', '')
+    pagination = company_page(current_user, search, per_page=COMPANY_PAGE_SIZE)
+    return render_template('company.html', companies=pagination.items, pagination=pagination, search=search)
 
 @app.route('/add-company', methods=['POST'])
 @login_required
@@ -829,22 +682,18 @@ def add_company():
 @login_required
 def get_companies():
     try:
-        companies = Company.query.all()
-        companies_list = []
-        
-        for company in companies:
-            companies_list.append({
-                'id': company.id,
-                'name': company.name,
-                'location': company.location,
-                'relationship_type': company.relationship_type,
-                'tax_id': company.tax_id,
-                'is_active': company.is_active
-            })
+        limit = min(max(request.args.get('limit', COMPANY_PAGE_SIZE, type=int), 1), COMPANY_PAGE_SIZE)
+        pagination = company_page(
+            current_user,
+            request.args.get('q', ''),
+            after=request.args.get('after'),
+            per_page=limit
+        )
         
         return jsonify({
             'success': True,
-            'companies': companies_list
+            'companies': get_serializer('company_directory').dump_rows(pagination.items),
+            'next_cursor': pagination.next_cursor
         })
     
     except Exception as e:
@@ -857,25 +706,18 @@ def get_companies():
 @login_required
 def get_company(company_id):
     try:
+        conditional = ConditionalResponse(row_state(Company, Company.id == company_id))
+        if conditional.is_fresh:
+            return conditional.not_modified()
+        
         company = Company.query.get_or_404(company_id)
         
-        company_data = {
-            'id': company.id,
-            'name': company.name,
-            'location': company.location,
-            'relationship_type': company.relationship_type,
-            'tax_id': company.tax_id,
-            'phone': company.phone,
-            'email': company.email,
-            'contact_person': company.contact_person,
-            'notes': company.notes,
-            'is_active': company.is_active
-        }
+        company_data = get_serializer('company').dump(company)
         
-        return jsonify({
+        return conditional.finalize(jsonify({
             'success': True,
             'company': company_data
-        })
+        }))
         
     except Exception as e:
         return jsonify({
@@ -925,7 +767,55 @@ def update_company(company_id):
 @login_required
 def dashboard(company_id):
     company = Company.query.get_or_404(company_id)
-    return render_template('dashboard_viewer.html', company_id=company_id, company=company)
+    
+    # Dados do mês atual embutidos na página: o JS mostra-os sem esperar por /api/dashboard.
+    # A cache de resumos é confirmada contra a base de dados, por isso um lançamento
+    # gravado noutro worker já aparece no reload seguinte.
+    initial_dashboard = None
+    if app.config.get('DASHBOARD_EMBED_INITIAL_DATA', True):
+        today = datetime.now()
+        try:
+            initial_dashboard = dashboard_payload(company_id, today.year, today.month)
+        except Exception as e:
+            print(f"Erro ao preparar dados iniciais do dashboard: {str(e)}")
+    
+    return render_template('dashboard_viewer.html', company_id=company_id, company=company,
+                           initial_dashboard=initial_dashboard)
+
+def serialize_financial_summary(summary, prev_summary=None):
+    if not summary:
+        return {}
+    
+    data = {
+        'total_sales': summary.total_sales,
+        'total_sales_without_vat': summary.total_sales_without_vat,
+        'total_vat': summary.total_vat,
+        'total_costs': summary.total_costs,
+        'total_costs_without_vat': summary.total_costs_without_vat, 
+        'profit': summary.profit,
+        'profit_without_vat': summary.profit_without_vat,
+        'total_employee_salaries': summary.total_employee_salaries,
+        'total_employee_insurance': summary.total_employee_insurance,
+        'total_employer_social_security': summary.total_employer_social_security
+    }
+    
+    if prev_summary:
+        if prev_summary.total_sales > 0:
+            data['sales_change'] = ((summary.total_sales - prev_summary.total_sales) / prev_summary.total_sales) * 100
+        
+        if prev_summary.total_costs > 0:
+            data['costs_change'] = ((summary.total_costs - prev_summary.total_costs) / prev_summary.total_costs) * 100
+        
+        if prev_summary.profit > 0:
+            data['profit_change'] = ((summary.profit - prev_summary.profit) / prev_summary.profit) * 100
+        
+        if prev_summary.total_vat > 0:
+            data['vat_change'] = ((summary.total_vat - prev_summary.total_vat) / prev_summary.total_vat) * 100
+        
+        if prev_summary.total_employee_salaries > 0:
+            data['employee_costs_change'] = ((summary.total_employee_salaries - prev_summary.total_employee_salaries) / prev_summary.total_employee_salaries) * 100
+    
+    return data
 
 @app.route('/api/financial-summary')
 @login_required
@@ -941,61 +831,83 @@ def api_financial_summary():
                 'message': 'Parâmetros inválidos'
             }), 400
             
-        summary = MonthlySummary.query.filter_by(
-            company_id=company_id,
-            month=month,
-            year=year
-        ).first()
+        prev_period = shift_month(year, month, -1)
         
-        data = {}
+        # O ETag e a cache de resumos validam-se pelo mesmo estado: o corpo nunca é mais antigo que o ETag
+        state = summary_cache.state('expenses', company_id)
+        conditional = ConditionalResponse(state)
+        if conditional.is_fresh:
+            return conditional.not_modified()
         
-        if summary:
-            data = {
-                'total_sales': summary.total_sales,
-                'total_sales_without_vat': summary.total_sales_without_vat,
-                'total_vat': summary.total_vat,
-                'total_costs': summary.total_costs,
-                'total_costs_without_vat': summary.total_costs_without_vat, 
-                'profit': summary.profit,
-                'profit_without_vat': summary.profit_without_vat,
-                'total_employee_salaries': summary.total_employee_salaries,
-                'total_employee_insurance': summary.total_employee_insurance,
-                'total_employer_social_security': summary.total_employer_social_security
-            }
-            
-            prev_month = month - 1
-            prev_year = year
-            
-            if prev_month == 0:
-                prev_month = 12
-                prev_year -= 1
-                
-            prev_summary = MonthlySummary.query.filter_by(
-                company_id=company_id,
-                month=prev_month,
-                year=prev_year
-            ).first()
-            
-            if prev_summary:
-                if prev_summary.total_sales > 0:
-                    data['sales_change'] = ((summary.total_sales - prev_summary.total_sales) / prev_summary.total_sales) * 100
-                
-                if prev_summary.total_costs > 0:
-                    data['costs_change'] = ((summary.total_costs - prev_summary.total_costs) / prev_summary.total_costs) * 100
-                
-                if prev_summary.profit > 0:
-                    data['profit_change'] = ((summary.profit - prev_summary.profit) / prev_summary.profit) * 100
-                
-                if prev_summary.total_vat > 0:
-                    data['vat_change'] = ((summary.total_vat - prev_summary.total_vat) / prev_summary.total_vat) * 100
-                
-                if prev_summary.total_employee_salaries > 0:
-                    data['employee_costs_change'] = ((summary.total_employee_salaries - prev_summary.total_employee_salaries) / prev_summary.total_employee_salaries) * 100
+        summaries = summary_cache.get_summaries('expenses', company_id, [prev_period, (year, month)], state)
+        
+        return conditional.finalize(jsonify({
+            'success': True,
+            'summary': serialize_financial_summary(summaries[(year, month)], summaries[prev_period])
+        }))
         
+    except Exception as e:
         return jsonify({
+            'success': False,
+            'message': f'Erro ao buscar dados financeiros: {str(e)}'
+        }), 500
+
+@app.route('/api/financial-summary/range')
+@login_required
+def api_financial_summary_range():
+    try:
+        company_id = request.args.get('company_id', type=int)
+        
+        try:
+            start = parse_month(request.args.get('from'))
+            end = parse_month(request.args.get('to'))
+        except ValueError:
+            start = end = None
+        
+        if not company_id or not start or not end:
+            return jsonify({
+                'success': False,
+                'message': 'Parâmetros inválidos'
+            }), 400
+        
+        month_count = months_between(start, end)
+        
+        if month_count < 1 or month_count > MAX_SUMMARY_RANGE_MONTHS:
+            return jsonify({
+                'success': False,
+                'message': f'O intervalo deve ter entre 1 e {MAX_SUMMARY_RANGE_MONTHS} meses'
+            }), 400
+        
+        # Um mês extra antes do início para calcular as variações do primeiro mês
+        query_start = shift_month(start[0], start[1], -1)
+        
+        state = summary_cache.state('expenses', company_id)
+        conditional = ConditionalResponse(state)
+        if conditional.is_fresh:
+            return conditional.not_modified()
+        
+        by_period = summary_cache.get_summaries(
+            'expenses',
+            company_id,
+            [shift_month(query_start[0], query_start[1], offset) for offset in range(month_count + 1)],
+            state
+        )
+        
+        months_data = []
+        for offset in range(month_count):
+            year, month = shift_month(start[0], start[1], offset)
+            prev_period = shift_month(year, month, -1)
+            
+            months_data.append({
+                'year': year,
+                'month': month,
+                'summary': serialize_financial_summary(by_period.get((year, month)), by_period.get(prev_period))
+            })
+        
+        return conditional.finalize(jsonify({
             'success': True,
-            'summary': data
-        })
+            'months': months_data
+        }))
         
     except Exception as e:
         return jsonify({
@@ -1003,6 +915,76 @@ def api_financial_summary():
             'message': f'Erro ao buscar dados financeiros: {str(e)}'
         }), 500
     
+def summary_chart_data(chart_type, by_period, start, months):
+    """Bar ('bar') or profit ('line') chart of `months` months from `start`, read from `by_period` summaries."""
+    labels = []
+    sales_data = []
+    expenses_data = []
+    employee_costs_data = []
+    profit_data = []
+    
+    for offset in range(months):
+        year, month = shift_month(start[0], start[1], offset)
+        monthly_data = by_period.get((year, month))
+        
+        month_name = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 
+                      'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez'][month-1]
+        labels.append(f"{month_name}" if months <= 12 else f"{month_name}/{year % 100:02d}")
+        
+        if monthly_data:
+            sales_data.append(round(monthly_data.total_sales))
+            expenses_data.append(round(monthly_data.total_costs - (monthly_data.total_employee_salaries or 0)))
+            employee_costs_data.append(round(monthly_data.total_employee_salaries or 0))
+            profit_data.append(round(monthly_data.profit))
+        else:
+            sales_data.append(0)
+            expenses_data.append(0)
+            employee_costs_data.append(0)
+            profit_data.append(0)
+    
+    chart_data = {
+        'labels': labels,
+        'datasets': [
+            {
+                'label': 'Receitas',
+                'data': sales_data,
+                'backgroundColor': '#22c55e',
+                'borderRadius': 4
+            },
+            {
+                'label': 'Despesas',
+                'data': expenses_data,
+                'backgroundColor': '#f59e0b',
+                'borderRadius': 4
+            },
+            {
+                'label': 'Custos Colaboradores',
+                'data': employee_costs_data,
+                'backgroundColor': '#8b5cf6',
+                'borderRadius': 4
+            }
+        ]
+    }
+    
+    if chart_type == 'line':
+        chart_data = {
+            'labels': labels,
+            'datasets': [{
+                'label': 'Performance Financeira',
+                'data': profit_data,
+                'borderColor': '#3b82f6',
+                'backgroundColor': 'rgba(59, 130, 246, 0.1)',
+                'fill': True,
+                'tension': 0.4,
+                'pointBackgroundColor': '#3b82f6',
+                'pointBorderColor': '#ffffff',
+                'pointBorderWidth': 2,
+                'pointRadius': 6
+            }]
+        }
+    
+    return chart_data
+
 @app.route('/api/chart-data')
 @login_required
 def api_chart_data():
@@ -1021,99 +1003,42 @@ def api_chart_data():
         
         
         chart_data = {}
+        conditional = None
         
         if chart_type in ['bar', 'line']:
-            labels = []
-            sales_data = []
-            expenses_data = []
-            employee_costs_data = []
-            profit_data = []
+            months = min(max(request.args.get('months', 6, type=int), 1), MAX_SUMMARY_RANGE_MONTHS)
+            start = shift_month(current_year, current_month, -(months - 1))
             
-            for i in range(5, -1, -1):
-                month = current_month - i
-                year = current_year
-                
-                while month <= 0:
-                    month += 12
-                    year -= 1
-                
-                monthly_data = MonthlySummary.query.filter_by(
-                    company_id=company_id,
-                    month=month,
-                    year=year
-                ).first()
-                
-                month_name = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 
-                              'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez'][month-1]
-                labels.append(f"{month_name}")
-                
-                if monthly_data:
-                    sales_data.append(round(monthly_data.total_sales))
-                    expenses_data.append(round(monthly_data.total_costs - (monthly_data.total_employee_salaries or 0)))
-                    employee_costs_data.append(round(monthly_data.total_employee_salaries or 0))
-                    profit_data.append(round(monthly_data.profit))
-                else:
-                    sales_data.append(0)
-                    expenses_data.append(0)
-                    employee_costs_data.append(0)
-                    profit_data.append(0)
+            state = summary_cache.state('expenses', company_id)
+            conditional = ConditionalResponse(state)
+            if conditional.is_fresh:
+                return conditional.not_modified()
             
-            chart_data = {
-                'labels': labels,
-                'datasets': [
-                    {
-                        'label': 'Receitas',
-                        'data': sales_data,
-                        'backgroundColor': '#22c55e',
-                        'borderRadius': 4
-                    },
-                    {
-                        'label': 'Despesas',
-                        'data': expenses_data,
-                        'backgroundColor': '#f59e0b',
-                        'borderRadius': 4
-                    },
-                    {
-                        'label': 'Custos Colaboradores',
-                        'data': employee_costs_data,
-                        'backgroundColor': '#8b5cf6',
-                        'borderRadius': 4
-                    }
-                ]
-            }
+            by_period = summary_cache.get_summaries(
+                'expenses',
+                company_id,
+                [shift_month(start[0], start[1], offset) for offset in range(months)],
+                state
+            )
             
-            if chart_type == 'line':
-                chart_data = {
-                    'labels': labels,
-                    'datasets': [{
-                        'label': 'Performance Financeira',
-                        'data': profit_data,
-                        'borderColor': '#3b82f6',
-                        'backgroundColor': 'rgba(59, 130, 246, 0.1)',
-                        'fill': True,
-                        'tension': 0.4,
-                        'pointBackgroundColor': '#3b82f6',
-                        'pointBorderColor': '#ffffff',
-                        'pointBorderWidth': 2,
-                        'pointRadius': 6
-                    }]
-                }
+            chart_data = summary_chart_data(chart_type, by_period, start, months)
         
         elif chart_type == 'pie':
-            expenses = Expenses.query.filter(
+            conditional = ConditionalResponse(row_state(
+                Expenses,
                 Expenses.company_id == company_id,
                 Expenses.transaction_type == 'despesa',
-                db.extract('month', Expenses.create_date) == current_month,
-                db.extract('year', Expenses.create_date) == current_year
-            ).all()
+                month_filter(Expenses.create_date, current_year, current_month)
+            ))
+            if conditional.is_fresh:
+                return conditional.not_modified()
             
-            expense_categories = {}
-            for expense in expenses:
-                category = expense.description.split(' ')[0] 
-                if category in expense_categories:
-                    expense_categories[category] += expense.gross_value
-                else:
-                    expense_categories[category] = expense.gross_value
+            expense_categories = top_expense_categories(
+                company_id,
+                current_year,
+                current_month,
+                limit=PIE_TOP_CATEGORIES
+            )
             
             if len(expense_categories) < 3:
                 expense_categories = {
@@ -1142,10 +1067,11 @@ def api_chart_data():
                 }]
             }
         
-        return jsonify({
+        response = jsonify({
             'success': True,
             'chartData': chart_data
         })
+        return conditional.finalize(response) if conditional else response
         
     except Exception as e:
         return jsonify({
@@ -1153,6 +1079,104 @@ def api_chart_data():
             'message': f'Erro ao buscar dados para o gráfico: {str(e)}'
         }), 500
     
+def employee_totals(employees):
+    """Monthly payroll totals of the employee modal; gross_salary is the total cost to the company."""
+    totals = dict.fromkeys(('gross_salary', 'employee_social_security', 'employer_social_security', 'irs', 'net_salary'), 0.0)
+    
+    for employee in employees:
+        gross = employee['gross_salary'] / (1 + employee['employer_social_security_rate'] / 100)
+        employee_ss = gross * employee['social_security_rate'] / 100
+        irs = gross * employee['irs_rate'] / 100
+        totals['gross_salary'] += gross
+        totals['employee_social_security'] += employee_ss
+        totals['employer_social_security'] += gross * employee['employer_social_security_rate'] / 100
+        totals['irs'] += irs
+        totals['net_salary'] += gross - employee_ss - irs
+    
+    totals = {key: round(value, 2) for key, value in totals.items()}
+    totals['count'] = len(employees)
+    totals['total_cost'] = round(sum(employee['gross_salary'] for employee in employees), 2)
+    return totals
+
+def dashboard_state(company_id):
+    """Validator states of everything dashboard_payload() reads; the first one is its summary_state."""
+    return (
+        summary_cache.state('expenses', company_id),
+        row_state(Settings, Settings.company_id == company_id),
+        row_state(Employee, Employee.company_id == company_id),
+    )
+
+def dashboard_payload(company_id, year, month, summary_state=None):
+    """
+    Everything the dashboard shows on open for one month.
+
+    The cards, their deltas and both summary charts come from one
+    summary_cache read of the chart window, checked against `summary_state`
+    (the one the route's ETag was built from), settings from config_cache
+    and the active employees from one Core select.
+    """
+    start = shift_month(year, month, -(DASHBOARD_CHART_MONTHS - 1))
+    by_period = summary_cache.get_summaries(
+        'expenses',
+        company_id,
+        [shift_month(start[0], start[1], offset) for offset in range(DASHBOARD_CHART_MONTHS)],
+        summary_state
+    )
+    
+    serializer = get_serializer('employee')
+    employees = serializer.dump_rows(db.session.execute(
+        serializer.select().where(Employee.company_id == company_id, Employee.is_active == True)
+    ).all())
+    
+    return {
+        'company_id': company_id,
+        'year': year,
+        'month': month,
+        'summary': serialize_financial_summary(by_period[(year, month)], by_period[shift_month(year, month, -1)]),
+        'charts': {
+            chart_type: summary_chart_data(chart_type, by_period, start, DASHBOARD_CHART_MONTHS)
+            for chart_type in ('bar', 'line')
+        },
+        'settings': serialize_settings(config_cache.get_settings(company_id)),
+        'employees': {
+            'active': employees,
+            'totals': employee_totals(employees)
+        }
+    }
+
+@app.route('/api/dashboard/<int:company_id>')
+@login_required
+def api_dashboard(company_id):
+    Company.query.get_or_404(company_id)
+    
+    try:
+        today = datetime.now()
+        month = request.args.get('month', today.month, type=int)
+        year = request.args.get('year', today.year, type=int)
+        
+        if not 1 <= month <= 12:
+            return jsonify({
+                'success': False,
+                'message': 'Parâmetros inválidos'
+            }), 400
+        
+        # Mês e ano por omissão vêm do relógio: entram no ETag para a viragem do mês não dar 304
+        states = dashboard_state(company_id)
+        conditional = ConditionalResponse(*states, resolved=(year, month))
+        if conditional.is_fresh:
+            return conditional.not_modified()
+        
+        return conditional.finalize(jsonify({
+            'success': True,
+            'dashboard': dashboard_payload(company_id, year, month, states[0])
+        }))
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Erro ao buscar dados do dashboard: {str(e)}'
+        }), 500
+
 @app.route('/api/transactions')
 @login_required
 def get_transactions():
@@ -1160,7 +1184,9 @@ def get_transactions():
         company_id = request.args.get('company_id', type=int)
         month = request.args.get('month', type=int)
         year = request.args.get('year', type=int)
-        transaction_type = request.args.get('type')
+        transaction_type = (request.args.get('type') or '').lower()
+        sort = request.args.get('sort', 'date')
+        limit = request.args.get('limit', TRANSACTIONS_DEFAULT_LIMIT, type=int)
         
         if not all([company_id, month, year]):
             return jsonify({
@@ -1168,33 +1194,52 @@ def get_transactions():
                 'message': 'Parâmetros inválidos'
             }), 400
         
-        query = Expenses.query.filter(
-            Expenses.company_id == company_id,
-            db.extract('month', Expenses.create_date) == month,
-            db.extract('year', Expenses.create_date) == year
-        )
+        if transaction_type and transaction_type not in ('ganho', 'despesa'):
+            return jsonify({
+                'success': False,
+                'message': 'Tipo de transação inválido'
+            }), 400
+        
+        if sort not in TRANSACTION_SORT_COLUMNS:
+            return jsonify({
+                'success': False,
+                'message': 'Ordenação inválida'
+            }), 400
+        
+        after, before = request.args.get('cursor'), request.args.get('before')
+        if not all(cursor_matches_sort(cursor, sort) for cursor in (after, before)):
+            return jsonify({
+                'success': False,
+                'message': 'O cursor não corresponde à ordenação pedida'
+            }), 400
+        
+        limit = max(1, min(limit, TRANSACTIONS_MAX_LIMIT))
+        
+        criteria = [month_filter(Expenses.create_date, year, month)]
+        serializer = get_serializer('transaction')
         
         if transaction_type:
-            query = query.filter(Expenses.transaction_type.ilike(f'%{transaction_type}%'))
-            
-        transactions = query.order_by(Expenses.create_date.desc()).all()
-        
-        transaction_list = []
-        for transaction in transactions:
-            transaction_list.append({
-                'id': transaction.id,
-                'transaction_type': transaction.transaction_type,
-                'description': transaction.description,
-                'gross_value': transaction.gross_value,
-                'iva_rate': transaction.iva_rate,
-                'iva_value': transaction.iva_value,
-                'net_value': transaction.net_value,
-                'create_date': transaction.create_date.strftime("%Y-%m-%d %H:%M:%S")
-            })
+            criteria.append(Expenses.transaction_type == transaction_type)
+        
+        pagination = keyset_paginate(
+            Expenses,
+            company_id,
+            criteria,
+            per_page=limit,
+            after=after,
+            before=before,
+            cache_key=(year, month, transaction_type),
+            sort_column=TRANSACTION_SORT_COLUMNS[sort],
+            columns=serializer.columns,
+            sort_name=sort
+        )
         
         return jsonify({
             'success': True,
-            'transactions': transaction_list
+            'transactions': serializer.dump_rows(pagination.items),
+            'next_cursor': pagination.next_cursor,
+            'prev_cursor': pagination.prev_cursor,
+            'total': pagination.total
         })
         
     except Exception as e:
@@ -1207,7 +1252,6 @@ def get_transactions():
 @login_required
 def simple_sales(company_id):
     company = Company.query.get_or_404(company_id)
-    page = request.args.get('page', 1, type=int)  
     per_page = 100
     user_type = current_user.type
     
@@ -1217,15 +1261,20 @@ def simple_sales(company_id):
     month = request.args.get('month', current_month, type=int)
     year = request.args.get('year', current_year, type=int)
     
-    query = SimpleExpenses.query.filter_by(company_id=company_id)
+    criteria = []
     
     if month and year:
-        query = query.filter(
-            db.extract('month', SimpleExpenses.create_date) == month,
-            db.extract('year', SimpleExpenses.create_date) == year
-        )
+        criteria.append(month_filter(SimpleExpenses.create_date, year, month))
     
-    pagination = query.order_by(SimpleExpenses.create_date.desc()).paginate(page=page, per_page=per_page, error_out=False)
+    pagination = keyset_paginate(
+        SimpleExpenses,
+        company_id,
+        criteria,
+        per_page=per_page,
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        cache_key=(year, month)
+    )
     all_expenses = pagination.items
     
     return render_template('simple_sales.html', 
@@ -1270,9 +1319,11 @@ def add_simple_expense():
         )
         
         db.session.add(new_expense)
-        db.session.commit()
+        db.session.flush()
         
         update_simple_monthly_summary(new_expense)
+        db.session.commit()
+        invalidate_counts(SimpleExpenses, new_expense.company_id)
         
         flash('✅ Transação adicionada com sucesso!', 'success')
         return redirect(url_for('simple_sales', company_id=company_id))
@@ -1289,34 +1340,14 @@ def add_simple_expense():
         
 def update_simple_monthly_summary(expense):
     transaction_date = expense.create_date
-    month = transaction_date.month
-    year = transaction_date.year
-    
-    summary = SimpleMonthlySummary.query.filter_by(
-        month=month, 
-        year=year,
-        company_id=expense.company_id
-    ).first()
-    
-    if not summary:
-        summary = SimpleMonthlySummary(
-            month=month,
-            year=year,
-            company_id=expense.company_id
-        )
-        db.session.add(summary)
     
-    if expense.transaction_type.lower() == 'ganho':
-        summary.total_sales += expense.gross_value
-        summary.total_sales_without_vat += expense.net_value
-        summary.total_vat += expense.iva_value
-    elif expense.transaction_type.lower() == 'despesa':
-        summary.total_costs += expense.gross_value
-    
-    summary.profit = summary.total_sales - summary.total_costs
-    summary.profit_without_vat = summary.total_sales_without_vat - summary.total_costs
-    
-    db.session.commit()
+    upsert_summary_delta(
+        SimpleMonthlySummary,
+        expense.company_id,
+        transaction_date.year,
+        transaction_date.month,
+        simple_ledger_deltas(expense.transaction_type, expense.gross_value, expense.net_value, expense.iva_value)
+    )
 
 @app.route('/delete-simple-expense/<int:expense_id>', methods=['POST'])
 @login_required
@@ -1335,7 +1366,6 @@ def delete_simple_expense(expense_id):
         transaction_date = expense.create_date
         
         db.session.delete(expense)
-        db.session.commit()
         
         remove_from_simple_monthly_summary(
             transaction_date,
@@ -1345,6 +1375,8 @@ def delete_simple_expense(expense_id):
             net_value,
             iva_value
         )
+        db.session.commit()
+        invalidate_counts(SimpleExpenses, company_id)
         
         return jsonify({'success': True, 'company_id': company_id}), 200
         
@@ -1353,27 +1385,13 @@ def delete_simple_expense(expense_id):
         return jsonify({'success': False, 'message': str(e)}), 500
 
 def remove_from_simple_monthly_summary(date, company_id, transaction_type, gross_value, net_value, iva_value):
-    month = date.month
-    year = date.year
-    
-    summary = SimpleMonthlySummary.query.filter_by(
-        month=month, 
-        year=year,
-        company_id=company_id
-    ).first()
-    
-    if summary:
-        if transaction_type.lower() == 'ganho':
-            summary.total_sales -= gross_value
-            summary.total_sales_without_vat -= net_value
-            summary.total_vat -= iva_value
-        elif transaction_type.lower() == 'despesa':
-            summary.total_costs -= gross_value
-        
-        summary.profit = summary.total_sales - summary.total_costs
-        summary.profit_without_vat = summary.total_sales_without_vat - summary.total_costs
-        
-        db.session.commit()
+    apply_summary_delta(
+        SimpleMonthlySummary,
+        company_id,
+        date.year,
+        date.month,
+        simple_ledger_deltas(transaction_type, gross_value, net_value, iva_value, sign=-1)
+    )
 
 @app.route('/get-simple-expense/<int:expense_id>')
 @login_required
@@ -1381,16 +1399,7 @@ def get_simple_expense(expense_id):
     try:
         expense = SimpleExpenses.query.get_or_404(expense_id)
         
-        expense_dict = {
-            'id': expense.id,
-            'transaction_type': expense.transaction_type,
-            'description': expense.description,
-            'gross_value': expense.gross_value,
-            'iva_rate': expense.iva_rate,
-            'iva_value': expense.iva_value,
-            'net_value': expense.net_value,
-            'company_id': expense.company_id 
-        }
+        expense_dict = get_serializer('simple_expense').dump(expense)
         
         return jsonify({'success': True, 'expense': expense_dict})
         
@@ -1423,8 +1432,6 @@ def update_simple_expense(expense_id):
         expense.iva_value = float(request.form.get('iva_value'))
         expense.net_value = float(request.form.get('net_value'))
         
-        db.session.commit()
-        
         adjust_simple_monthly_summary(
             expense,
             old_transaction_type,
@@ -1432,6 +1439,7 @@ def update_simple_expense(expense_id):
             old_net_value,
             old_iva_value
         )
+        db.session.commit()
         
         flash('✅ Transação atualizada com sucesso!', 'success')
         return redirect(url_for('simple_sales', company_id=company_id))
@@ -1452,48 +1460,17 @@ def update_simple_expense(expense_id):
 
 def adjust_simple_monthly_summary(expense, old_type, old_gross, old_net, old_iva):
     transaction_date = expense.create_date
-    month = transaction_date.month
-    year = transaction_date.year
-    
-    summary = SimpleMonthlySummary.query.filter_by(
-        month=month, 
-        year=year,
-        company_id=expense.company_id
-    ).first()
-    
-    if not summary:
-        summary = SimpleMonthlySummary(
-            month=month,
-            year=year,
-            company_id=expense.company_id
-        )
-        db.session.add(summary)
-        
-        if expense.transaction_type.lower() == 'ganho':
-            summary.total_sales += expense.gross_value
-            summary.total_sales_without_vat += expense.net_value
-            summary.total_vat += expense.iva_value
-        elif expense.transaction_type.lower() == 'despesa':
-            summary.total_costs += expense.gross_value
-    else:
-        if old_type.lower() == 'ganho':
-            summary.total_sales -= old_gross
-            summary.total_sales_without_vat -= old_net
-            summary.total_vat -= old_iva
-        elif old_type.lower() == 'despesa':
-            summary.total_costs -= old_gross
-        
-        if expense.transaction_type.lower() == 'ganho':
-            summary.total_sales += expense.gross_value
-            summary.total_sales_without_vat += expense.net_value
-            summary.total_vat += expense.iva_value
-        elif expense.transaction_type.lower() == 'despesa':
-            summary.total_costs += expense.gross_value
+    new_deltas = simple_ledger_deltas(expense.transaction_type, expense.gross_value, expense.net_value, expense.iva_value)
+    old_deltas = simple_ledger_deltas(old_type, old_gross, old_net, old_iva, sign=-1)
     
-    summary.profit = summary.total_sales - summary.total_costs
-    summary.profit_without_vat = summary.total_sales_without_vat - summary.total_costs
-    
-    db.session.commit()
+    upsert_summary_delta(
+        SimpleMonthlySummary,
+        expense.company_id,
+        transaction_date.year,
+        transaction_date.month,
+        combine_deltas(old_deltas, new_deltas),
+        initial=new_deltas
+    )
 
 @app.route('/api/simple-financial-summary')
 @login_required
@@ -1509,17 +1486,14 @@ def api_simple_financial_summary():
                 'message': 'Parâmetros inválidos'
             }), 400
             
-        summary = SimpleMonthlySummary.query.filter_by(
-            company_id=company_id,
-            month=month,
-            year=year
-        ).first()
+        prev_period = shift_month(year, month, -1)
+        summaries = summary_cache.get_summaries('simple', company_id, [prev_period, (year, month)])
+        summary = summaries[(year, month)]
         
         if not summary:
             expenses = SimpleExpenses.query.filter(
                 SimpleExpenses.company_id == company_id,
-                db.extract('month', SimpleExpenses.create_date) == month,
-                db.extract('year', SimpleExpenses.create_date) == year
+                month_filter(SimpleExpenses.create_date, year, month)
             ).all()
             
             total_sales = 0.0
@@ -1553,18 +1527,7 @@ def api_simple_financial_summary():
                 'profit_without_vat': summary.profit_without_vat
             }
         
-        prev_month = month - 1
-        prev_year = year
-        
-        if prev_month == 0:
-            prev_month = 12
-            prev_year -= 1
-            
-        prev_summary = SimpleMonthlySummary.query.filter_by(
-            company_id=company_id,
-            month=prev_month,
-            year=prev_year
-        ).first()
+        prev_summary = summaries[prev_period]
         
         if prev_summary:
             if prev_summary.total_sales > 0:
@@ -1593,42 +1556,42 @@ def api_simple_financial_summary():
 @app.route('/settings/<company_id>')
 @login_required
 def settings(company_id):    
-    settings_obj = Settings.query.filter_by(company_id=company_id).first()
+    settings_obj = config_cache.get_settings(company_id)
     
     is_admin = current_user.type == "Admin"
     
     return render_template('settings.html', company_id=company_id, settings=settings_obj, is_admin=is_admin)
 
+def serialize_settings(settings):
+    if not settings:
+        return {
+            'total_insurance_value': 0.0,
+            'rent_value': 0.0,
+            'employee_insurance_value': 0.0,
+            'preferred_salary_expense_day': 1
+        }
+    
+    return {
+        'total_insurance_value': settings.total_insurance_value,
+        'rent_value': settings.rent_value,
+        'employee_insurance_value': settings.employee_insurance_value,
+        'preferred_salary_expense_day': settings.preferred_salary_expense_day
+    }
+
 @app.route('/get-settings/<company_id>')
 @login_required
 def get_settings(company_id):
     try:
         company = Company.query.get_or_404(company_id)
         
-        settings = Settings.query.filter_by(company_id=company_id).first()
+        conditional = ConditionalResponse(row_state(Settings, Settings.company_id == company_id))
+        if conditional.is_fresh:
+            return conditional.not_modified()
         
-        if settings:
-            settings_data = {
-                'total_insurance_value': settings.total_insurance_value,
-                'rent_value': settings.rent_value,
-                'employee_insurance_value': settings.employee_insurance_value,
-                'preferred_salary_expense_day': settings.preferred_salary_expense_day
-            }
-            
-            return jsonify({
-                'success': True,
-                'settings': settings_data
-            })
-        else:
-            return jsonify({
-                'success': True,
-                'settings': {
-                    'total_insurance_value': 0.0,
-                    'rent_value': 0.0,
-                    'employee_insurance_value': 0.0,
-                    'preferred_salary_expense_day': 1
-                }
-            })
+        return conditional.finalize(jsonify({
+            'success': True,
+            'settings': serialize_settings(config_cache.get_settings(company_id))
+        }))
         
     except Exception as e:
         return jsonify({
@@ -1684,7 +1647,7 @@ def get_actual_salary_day(preferred_day, current_month, current_year):
 def get_info_settings():
     try:
         
-        info = Info.query.first()
+        info = config_cache.get_info()
         
         if info:
             info_data = {
@@ -1758,7 +1721,7 @@ def smodal():
         if session.get('expiration_warning_shown', False):
             return jsonify({'show': False})
         
-        info = Info.query.first()
+        info = config_cache.get_info()
         
         if not info or not info.payment_vps_date:
             return jsonify({'show': False})
@@ -1804,6 +1767,105 @@ def smodal():
         print(f"Erro ao verificar data de expiração: {str(e)}")
         return jsonify({'show': False})
 
+@app.route('/api/cache-stats')
+@login_required
+def api_cache_stats():
+    if current_user.type != "Admin":
+        return jsonify({
+            'success': False,
+            'message': 'Apenas administradores podem ver as estatísticas da cache.'
+        }), 403
+    
+    return jsonify({
+        'success': True,
+        'summary_cache': summary_cache.stats(),
+        'user_cache': user_cache.stats(),
+        'config_cache': config_cache.stats()
+    })
+
+def parse_month_option(ctx, param, value):
+    if value is None:
+        return None
+    try:
+        return parse_month(value)
+    except ValueError:
+        raise click.BadParameter('use o formato YYYY-MM')
+
+@app.cli.command('rebuild-summaries')
+@click.option('--company', 'company_id', type=int, help='Reconstruir apenas esta empresa.')
+@click.option('--from', 'start', callback=parse_month_option, help='Primeiro mês (YYYY-MM).')
+@click.option('--to', 'end', callback=parse_month_option, help='Último mês (YYYY-MM).')
+@click.option('--ledger', type=click.Choice(['all'] + list(LEDGERS)), default='all', help='Livro a reconstruir.')
+@click.option('--dry-run', is_flag=True, help='Mostrar as diferenças sem gravar.')
+def rebuild_summaries_command(company_id, start, end, ledger, dry_run):
+    """Recalcula MonthlySummary/SimpleMonthlySummary a partir dos lançamentos."""
+    if bool(start) != bool(end):
+        raise click.UsageError('--from e --to têm de ser usados em conjunto.')
+    if start and months_between(start, end) < 1:
+        raise click.UsageError('--from tem de ser anterior ou igual a --to.')
+    
+    ledger_names = list(LEDGERS) if ledger == 'all' else [ledger]
+    
+    for ledger_name in ledger_names:
+        changes = rebuild_summaries(ledger_name, company_id, start, end, dry_run=dry_run)
+        
+        for (row_company_id, year, month), changed in changes:
+            click.echo(f"[{ledger_name}] empresa {row_company_id} {year}-{month:02d}")
+            for column, (old_value, new_value) in changed.items():
+                click.echo(f"    {column}: {old_value} -> {new_value}")
+        
+        action = 'por corrigir' if dry_run else 'corrigidos'
+        click.echo(f"[{ledger_name}] {len(changes)} resumos {action}.")
+
+@app.cli.command('post-fixed-expenses')
+@click.option('--company', 'company_id', type=int, help='Lançar apenas para esta empresa.')
+@click.option('--from', 'start', callback=parse_month_option, required=True, help='Primeiro mês (YYYY-MM).')
+@click.option('--to', 'end', callback=parse_month_option, required=True, help='Último mês (YYYY-MM).')
+@click.option('--workers', type=click.IntRange(1, 32), default=4, show_default=True,
+              help='Threads em paralelo (sempre 1 com SQLite).')
+@click.option('--batch-size', type=click.IntRange(1), default=50, show_default=True, help='Empresas por lote.')
+def post_fixed_expenses_command(company_id, start, end, workers, batch_size):
+    """Lança salários e despesas fixas em falta num intervalo de meses."""
+    if months_between(start, end) < 1:
+        raise click.UsageError('--from tem de ser anterior ou igual a --to.')
+    
+    stats = backfill_fixed_expenses(app, start, end, company_id, workers=workers, batch_size=batch_size)
+    
+    company_months = stats['companies'] * stats['periods']
+    seconds = max(stats['seconds'], 1e-6)
+    click.echo(f"{stats['companies']} empresas x {stats['periods']} meses: {stats['rows']} lançamentos "
+               f"em {stats['seconds']:.2f}s ({company_months / seconds:.1f} empresa-meses/s, "
+               f"{stats['rows'] / seconds:.1f} lançamentos/s, workers: {stats['workers']}).")
+    
+    if stats['failures']:
+        raise click.ClickException(f"{stats['failures']} empresa-meses falharam; veja o log e repita o comando.")
+
+@app.cli.command('sqlite-checkpoint')
+@click.option('--mode', type=click.Choice(['passive', 'full', 'restart', 'truncate']), default='truncate',
+              show_default=True, help='Modo do PRAGMA wal_checkpoint.')
+def sqlite_checkpoint_command(mode):
+    """Copia o WAL do SQLite para a base de dados (antes de backups, ou por cron)."""
+    busy, wal_pages, checkpointed = checkpoint(db.engine, mode)
+    
+    if wal_pages < 0:
+        raise click.ClickException('A base de dados não está em modo WAL.')
+    
+    click.echo(f"WAL: {wal_pages} páginas, {checkpointed} copiadas" + (" (bloqueado por leitores)" if busy else "."))
+
+@app.cli.command('build-assets')
+@click.option('--prune', is_flag=True, help='Apagar de static/dist os ficheiros de builds anteriores.')
+def build_assets_command(prune):
+    """Gera cópias minificadas, com hash e pré-comprimidas de static/ e o manifesto."""
+    report = build_assets(app.static_folder, prune=prune)
+    
+    for source, output, original, minified, gzipped, brotli_size in report:
+        compressed = ', '.join(
+            f"{name} {size / 1024:.1f} KiB" for name, size in (('gzip', gzipped), ('br', brotli_size)) if size
+        )
+        click.echo(f"{source} -> {output}: {original / 1024:.1f} KiB -> {minified / 1024:.1f} KiB ({compressed})")
+    
+    click.echo(f"{len(report)} ficheiros; reinicie os workers para carregarem o novo manifesto.")
+
 if __name__ == '__main__':
     with app.app_context():
         db_path = os.path.join(basedir, 'instance', 'test.db')
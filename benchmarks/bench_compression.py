@@ -0,0 +1,135 @@
+"""
+Response Compression Benchmark
+==============================
+
+Requests a few JSON and HTML endpoints with each Accept-Encoding the app
+supports and reports the body size, the server time (rendering plus
+compression) and the estimated time to first paint of the body on slow
+links, modelled as one round trip plus size / bandwidth.
+
+Usage:
+    python benchmarks/bench_compression.py [employees] [transactions]
+"""
+
+import sys
+sys.dont_write_bytecode = True
+
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'bench.db')
+os.environ['DATABASE_URI'] = f'sqlite:///{DB_PATH}'
+os.environ['SCHEDULER_ENABLED'] = 'false'
+
+from app import app, limiter
+from compression import compression
+from extensions import db
+from instance.base import User, Company, Employee, Expenses
+
+YEAR, MONTH = 2025, 6
+
+# (nome, kbit/s, RTT em ms)
+LINKS = (
+    ('3G lento', 400, 400),
+    ('3G', 1600, 150),
+    ('4G', 9000, 60),
+)
+
+
+def seed(employees, transactions):
+    user = User(username='bench', password='bench', name='Bench', type='Admin', write_date=datetime.now())
+    db.session.add(user)
+    db.session.flush()
+    company = Company(name='Empresa Bench', location='', relationship_type='', user_id=user.id)
+    db.session.add(company)
+    db.session.flush()
+
+    db.session.execute(Employee.__table__.insert(), [{
+        'name': f'Colaborador {index}',
+        'position': random.choice(('Técnico', 'Administrativo', 'Gestor')),
+        'gross_salary': round(random.uniform(800, 3000), 2),
+        'social_security_rate': 11.0,
+        'employer_social_security_rate': 23.75,
+        'irs_rate': 12.5,
+        'extra_payment': 0.0,
+        'extra_payment_description': None,
+        'is_active': True,
+        'company_id': company.id,
+    } for index in range(employees)])
+
+    start = datetime(YEAR, MONTH, 1)
+    batch = []
+    for index in range(transactions):
+        value = round(random.uniform(1, 1000), 2)
+        batch.append({
+            'transaction_type': 'despesa' if index % 4 else 'ganho',
+            'description': f'Fatura {index}',
+            'gross_value': value,
+            'iva_rate': 23.0,
+            'iva_value': round(value - value / 1.23, 2),
+            'net_value': round(value / 1.23, 2),
+            'company_id': company.id,
+            'user_id': user.id,
+            'create_date': start + timedelta(seconds=random.randrange(27 * 86400)),
+        })
+    db.session.execute(Expenses.__table__.insert(), batch)
+    db.session.commit()
+    return user.id, company.id
+
+
+def timed(client, url, encoding, repeat=20):
+    headers = {'Accept-Encoding': encoding} if encoding else {}
+    client.get(url, headers=headers)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        response = client.get(url, headers=headers)
+    elapsed = (time.perf_counter() - started) / repeat * 1000
+    assert response.status_code == 200, url
+    return elapsed, response
+
+
+def main():
+    employees = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    transactions = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    limiter.enabled = False
+
+    with app.app_context():
+        db.create_all()
+        print(f"Seeding {employees} employees and {transactions} ledger rows...")
+        user_id, company_id = seed(employees, transactions)
+
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(user_id)
+            sess['_fresh'] = True
+
+        endpoints = (
+            ('GET /get-employees', f'/get-employees/{company_id}'),
+            ('GET /api/transactions (200)', f'/api/transactions?company_id={company_id}&month={MONTH}&year={YEAR}&limit=200'),
+            ('GET /api/chart-data (pie)', f'/api/chart-data?company_id={company_id}&type=pie&month={MONTH}&year={YEAR}'),
+            ('GET /dashboard (HTML)', f'/dashboard/{company_id}'),
+            ('GET /employee (HTML)', f'/employee/{company_id}'),
+        )
+        encodings = [None] + list(compression.encoders)
+
+        print("\n" + "=" * 78)
+        print(f"  {'':30s}{'enc':>9s}{'bytes':>9s}{'server':>10s}" + ''.join(f"{name:>10s}" for name, _, _ in LINKS))
+        for label, url in endpoints:
+            for encoding in encodings:
+                elapsed, response = timed(client, url, encoding)
+                size = len(response.data)
+                links = ''.join(
+                    f"{elapsed + rtt + size * 8 / kbits:8.0f}ms" for _, kbits, rtt in LINKS
+                )
+                print(f"  {label:30s}{encoding or 'identity':>9s}{size:9d}{elapsed:8.1f}ms{links}")
+                label = ''
+        print("=" * 78)
+        print("  tempo na ligação = servidor + RTT + bytes / largura de banda (sem slow start TCP)")
+
+
+if __name__ == '__main__':
+    main()
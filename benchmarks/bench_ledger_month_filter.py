@@ -0,0 +1,115 @@
+"""
+Ledger Month Filter Benchmark
+=============================
+
+Compares the old extract()-based month filter with the half-open
+create_date range served by the (company_id, create_date) indexes.
+Prints EXPLAIN QUERY PLAN for both forms and the average query time.
+
+Usage:
+    python benchmarks/bench_ledger_month_filter.py [rows] [companies]
+"""
+
+import sys
+sys.dont_write_bytecode = True
+
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'bench.db')
+os.environ['DATABASE_URI'] = f'sqlite:///{DB_PATH}'
+
+from sqlalchemy import func, select
+from app import app
+from extensions import db
+from instance.base import User, Company, Expenses
+from periods import month_filter
+
+
+def seed(rows, companies):
+    user = User(username='bench', password='bench', name='Bench', type='Admin', write_date=datetime.now())
+    db.session.add(user)
+    db.session.flush()
+    company_ids = []
+    for i in range(companies):
+        company = Company(name=f'Empresa {i}', location='', relationship_type='', user_id=user.id)
+        db.session.add(company)
+        db.session.flush()
+        company_ids.append(company.id)
+
+    start = datetime(2023, 1, 1)
+    span = int((datetime(2026, 1, 1) - start).total_seconds())
+    batch = []
+    for _ in range(rows):
+        value = round(random.uniform(1, 1000), 2)
+        batch.append({
+            'transaction_type': random.choice(['ganho', 'despesa']),
+            'description': 'Bench',
+            'gross_value': value,
+            'iva_rate': 23.0,
+            'iva_value': round(value - value / 1.23, 2),
+            'net_value': round(value / 1.23, 2),
+            'company_id': random.choice(company_ids),
+            'user_id': user.id,
+            'create_date': start + timedelta(seconds=random.randrange(span)),
+        })
+    db.session.execute(Expenses.__table__.insert(), batch)
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+    return company_ids
+
+
+def explain(statement):
+    compiled = statement.compile(db.engine, compile_kwargs={'literal_binds': True})
+    rows = db.session.execute(db.text(f'EXPLAIN QUERY PLAN {compiled}')).fetchall()
+    return [row[-1] for row in rows]
+
+
+def timed(statement, repeat=50):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        db.session.execute(statement).fetchall()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    companies = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    with app.app_context():
+        db.create_all()
+        print(f"Seeding {rows} expenses across {companies} companies...")
+        company_ids = seed(rows, companies)
+        company_id, year, month = company_ids[0], 2025, 6
+
+        extract_filter = [
+            Expenses.company_id == company_id,
+            db.extract('month', Expenses.create_date) == month,
+            db.extract('year', Expenses.create_date) == year,
+        ]
+        range_filter = [
+            Expenses.company_id == company_id,
+            month_filter(Expenses.create_date, year, month),
+        ]
+
+        cases = [
+            ('rows (extract)', select(Expenses).where(*extract_filter).order_by(Expenses.create_date.desc())),
+            ('rows (range)', select(Expenses).where(*range_filter).order_by(Expenses.create_date.desc())),
+            ('count (extract)', select(func.count()).select_from(Expenses).where(*extract_filter)),
+            ('count (range)', select(func.count()).select_from(Expenses).where(*range_filter)),
+        ]
+
+        for label, statement in cases:
+            print("\n" + "=" * 60)
+            print(f"  {label}: {timed(statement):.3f} ms/query")
+            print("=" * 60)
+            for line in explain(statement):
+                print(f"  {line}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Pie Chart Category Benchmark
+============================
+
+Compares the old pie-chart aggregation (load every 'despesa' row of the
+month as an Expenses object and group by description.split(' ')[0] in
+Python) with top_expense_categories(), which groups in SQL and returns one
+row per category.
+
+Usage:
+    python benchmarks/bench_pie_categories.py [rows_per_month] [categories]
+"""
+
+import sys
+sys.dont_write_bytecode = True
+
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'bench.db')
+os.environ['DATABASE_URI'] = f'sqlite:///{DB_PATH}'
+
+from app import app
+from extensions import db
+from instance.base import User, Company, Expenses
+from expense_categories import top_expense_categories
+from periods import month_filter
+
+
+def seed(rows, categories, year, month):
+    user = User(username='bench', password='bench', name='Bench', type='Admin', write_date=datetime.now())
+    db.session.add(user)
+    db.session.flush()
+    company = Company(name='Empresa Bench', location='', relationship_type='', user_id=user.id)
+    db.session.add(company)
+    db.session.flush()
+
+    start = datetime(year, month, 1)
+    batch = []
+    for index in range(rows):
+        value = round(random.uniform(1, 1000), 2)
+        batch.append({
+            'transaction_type': 'despesa' if index % 4 else 'ganho',
+            'description': f'Categoria{random.randrange(categories)} fatura {index}',
+            'gross_value': value,
+            'iva_rate': 23.0,
+            'iva_value': round(value - value / 1.23, 2),
+            'net_value': round(value / 1.23, 2),
+            'company_id': company.id,
+            'user_id': user.id,
+            'create_date': start + timedelta(seconds=random.randrange(27 * 86400)),
+        })
+    db.session.execute(Expenses.__table__.insert(), batch)
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+    return company.id
+
+
+def python_grouping(company_id, year, month):
+    expenses = Expenses.query.filter(
+        Expenses.company_id == company_id,
+        Expenses.transaction_type == 'despesa',
+        month_filter(Expenses.create_date, year, month)
+    ).all()
+
+    expense_categories = {}
+    for expense in expenses:
+        category = expense.description.split(' ')[0]
+        expense_categories[category] = expense_categories.get(category, 0.0) + expense.gross_value
+    return expense_categories
+
+
+def timed(function, repeat=5):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+        db.session.expunge_all()
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    categories = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    year, month = 2025, 6
+
+    with app.app_context():
+        db.create_all()
+        print(f"Seeding {rows} ledger rows in {month:02d}/{year} across {categories} categories...")
+        company_id = seed(rows, categories, year, month)
+
+        python_ms, python_result = timed(lambda: python_grouping(company_id, year, month))
+        sql_ms, sql_result = timed(lambda: top_expense_categories(company_id, year, month))
+
+        top = sorted(python_result.items(), key=lambda item: -item[1])[:8]
+        for label, total in top:
+            assert abs(sql_result[label] - total) < 0.01, label
+        assert abs(sum(sql_result.values()) - sum(python_result.values())) < 0.01
+
+        print("\n" + "=" * 60)
+        print(f"  ORM rows + Python grouping: {python_ms:10.1f} ms")
+        print(f"  SQL GROUP BY (top 8 + Outros):  {sql_ms:8.1f} ms")
+        print(f"  Speed-up: {python_ms / sql_ms:.1f}x")
+        print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
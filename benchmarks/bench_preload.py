@@ -0,0 +1,176 @@
+"""
+Gunicorn Preload Benchmark
+==========================
+
+Starts gunicorn with and without preload_app (GUNICORN_PRELOAD) and
+reports, for each mode:
+
+- boot: seconds from launching gunicorn to the first answered request,
+  with a single worker;
+- respawn: median seconds from stopping that worker (as max_requests
+  recycling does) to the first request answered by its replacement;
+- memory: RSS and PSS of the master and of each of N warmed-up workers.
+  RSS counts shared pages once per process; PSS splits them between the
+  processes that share them, so its total is the real footprint.
+
+Linux only (reads /proc).
+
+Usage:
+    python benchmarks/bench_preload.py [workers] [respawns]
+"""
+
+import sys
+sys.dont_write_bytecode = True
+
+import http.client
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PORT = 8766
+
+
+def environment(preload, workers):
+    return dict(
+        os.environ,
+        GUNICORN_PROFILE='sync',
+        GUNICORN_WORKERS=str(workers),
+        GUNICORN_PRELOAD='true' if preload else 'false',
+        PORT=str(PORT),
+        FLASK_ENV='production',
+        DATABASE_URI=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}",
+        SCHEDULER_ENABLED='false',
+        RATELIMIT_ENABLED='false',
+        PYTHONDONTWRITEBYTECODE='1',
+    )
+
+
+def start_server(preload, workers):
+    return subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_config.py', '--max-requests', '0',
+         '--access-logfile', '/dev/null', '--error-logfile', '/dev/null', 'wsgi:app'],
+        cwd=ROOT, env=environment(preload, workers), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def stop_server(server):
+    server.terminate()
+    server.wait(timeout=30)
+
+
+def answered():
+    try:
+        connection = http.client.HTTPConnection('127.0.0.1', PORT, timeout=5)
+        connection.request('GET', '/login')
+        status = connection.getresponse().status
+        connection.close()
+        return status == 200
+    except (OSError, http.client.HTTPException):
+        return False
+
+
+def wait_until_answered(timeout=60):
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if answered():
+            return time.perf_counter() - started
+        time.sleep(0.005)
+    raise RuntimeError("gunicorn não respondeu a tempo")
+
+
+def worker_pids(master_pid):
+    with open(f'/proc/{master_pid}/task/{master_pid}/children') as children:
+        return [int(pid) for pid in children.read().split()]
+
+
+def wait_for_workers(master_pid, count, exclude=(), timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        pids = [pid for pid in worker_pids(master_pid) if pid not in exclude]
+        if len(pids) == count:
+            return pids
+        time.sleep(0.005)
+    raise RuntimeError("workers não arrancaram a tempo")
+
+
+def memory_kib(pid):
+    """(RSS, PSS) of a process in KiB, from /proc/<pid>/smaps_rollup."""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as rollup:
+        for line in rollup:
+            name, _, rest = line.partition(':')
+            if name in ('Rss', 'Pss'):
+                values[name] = int(rest.split()[0])
+    return values['Rss'], values['Pss']
+
+
+def measure_spawn(preload, respawns):
+    launched = time.perf_counter()
+    server = start_server(preload, 1)
+    try:
+        wait_until_answered()
+        boot = time.perf_counter() - launched
+
+        samples = []
+        for _ in range(respawns):
+            [old_pid] = wait_for_workers(server.pid, 1)
+            stopped = time.perf_counter()
+            os.kill(old_pid, signal.SIGTERM)
+            wait_for_workers(server.pid, 1, exclude={old_pid})
+            wait_until_answered()
+            samples.append(time.perf_counter() - stopped)
+    finally:
+        stop_server(server)
+    return boot, statistics.median(samples)
+
+
+def measure_memory(preload, workers):
+    server = start_server(preload, workers)
+    try:
+        wait_until_answered()
+        pids = wait_for_workers(server.pid, workers)
+        # Pedidos suficientes para todos os workers renderizarem páginas e tocarem nas bibliotecas
+        for _ in range(workers * 50):
+            answered()
+        time.sleep(0.5)
+        master = memory_kib(server.pid)
+        per_worker = [memory_kib(pid) for pid in pids]
+    finally:
+        stop_server(server)
+    return master, per_worker
+
+
+def main():
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        print("Este benchmark requer Linux (/proc/<pid>/smaps_rollup).")
+        return
+
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    respawns = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    # Confirma que a porta está livre antes de começar
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', PORT))
+
+    print(f"perfil sync, {workers} workers para a memória, {respawns} respawns\n")
+    print("=" * 78)
+    print(f"  {'modo':12s}{'arranque':>10s}{'respawn':>10s}{'RSS master':>12s}"
+          f"{'RSS/worker':>12s}{'PSS/worker':>12s}{'PSS total':>10s}")
+    for label, preload in (('sem preload', False), ('com preload', True)):
+        boot, respawn = measure_spawn(preload, respawns)
+        master, per_worker = measure_memory(preload, workers)
+        rss = statistics.mean(value[0] for value in per_worker) / 1024
+        pss = statistics.mean(value[1] for value in per_worker) / 1024
+        total = (master[1] + sum(value[1] for value in per_worker)) / 1024
+        print(f"  {label:12s}{boot:9.2f}s{respawn:9.3f}s{master[0] / 1024:10.1f}MB"
+              f"{rss:10.1f}MB{pss:10.1f}MB{total:8.1f}MB")
+    print("=" * 78)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""
+JSON Serialization Benchmark
+============================
+
+Compares the old response path (ORM objects, hand-built dicts and the
+stdlib JSON provider) with the serializer registry (Core rows zipped into
+dicts) and the orjson provider, for get_employees and get_transactions
+with 10k rows, then times the real /get-employees endpoint with each
+provider.
+
+Usage:
+    python benchmarks/bench_serialization.py [rows]
+"""
+
+import sys
+sys.dont_write_bytecode = True
+
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'bench.db')
+os.environ['DATABASE_URI'] = f'sqlite:///{DB_PATH}'
+os.environ['SCHEDULER_ENABLED'] = 'false'
+
+from flask.json.provider import DefaultJSONProvider
+
+from app import app
+from extensions import db
+from instance.base import User, Company, Employee, Expenses
+from json_provider import OrjsonProvider, orjson
+from periods import month_filter
+from serializers import get_serializer
+
+YEAR, MONTH = 2025, 6
+
+
+def seed(rows):
+    user = User(username='bench', password='bench', name='Bench', type='Admin', write_date=datetime.now())
+    db.session.add(user)
+    db.session.flush()
+    company = Company(name='Empresa Bench', location='', relationship_type='', user_id=user.id)
+    db.session.add(company)
+    db.session.flush()
+
+    db.session.execute(Employee.__table__.insert(), [{
+        'name': f'Colaborador {index}',
+        'position': 'Técnico',
+        'gross_salary': round(random.uniform(800, 3000), 2),
+        'social_security_rate': 11.0,
+        'employer_social_security_rate': 23.75,
+        'irs_rate': 12.5,
+        'extra_payment': 0.0,
+        'extra_payment_description': None,
+        'is_active': True,
+        'company_id': company.id,
+    } for index in range(rows)])
+
+    start = datetime(YEAR, MONTH, 1)
+    batch = []
+    for index in range(rows):
+        value = round(random.uniform(1, 1000), 2)
+        batch.append({
+            'transaction_type': 'despesa' if index % 4 else 'ganho',
+            'description': f'Fatura {index}',
+            'gross_value': value,
+            'iva_rate': 23.0,
+            'iva_value': round(value - value / 1.23, 2),
+            'net_value': round(value / 1.23, 2),
+            'company_id': company.id,
+            'user_id': user.id,
+            'create_date': start + timedelta(seconds=random.randrange(27 * 86400)),
+        })
+    db.session.execute(Expenses.__table__.insert(), batch)
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+    return user.id, company.id
+
+
+def old_employees(company_id, provider):
+    employees_list = []
+    for emp in Employee.query.filter_by(company_id=company_id).all():
+        employees_list.append({
+            'id': emp.id,
+            'name': emp.name,
+            'position': emp.position,
+            'gross_salary': emp.gross_salary,
+            'social_security_rate': emp.social_security_rate,
+            'employer_social_security_rate': emp.employer_social_security_rate,
+            'irs_rate': emp.irs_rate,
+            'extra_payment': emp.extra_payment,
+            'extra_payment_description': emp.extra_payment_description,
+            'is_active': emp.is_active,
+            'company_id': emp.company_id
+        })
+    return provider.dumps({'success': True, 'employees': employees_list})
+
+
+def new_employees(company_id, provider):
+    serializer = get_serializer('employee')
+    rows = db.session.execute(serializer.select().where(Employee.company_id == company_id)).all()
+    return provider.dumps({'success': True, 'employees': serializer.dump_rows(rows)})
+
+
+def transaction_criteria(company_id):
+    return (Expenses.company_id == company_id, month_filter(Expenses.create_date, YEAR, MONTH))
+
+
+def old_transactions(company_id, provider):
+    transaction_list = []
+    for transaction in Expenses.query.filter(*transaction_criteria(company_id)).order_by(Expenses.create_date.desc()).all():
+        transaction_list.append({
+            'id': transaction.id,
+            'transaction_type': transaction.transaction_type,
+            'description': transaction.description,
+            'gross_value': transaction.gross_value,
+            'iva_rate': transaction.iva_rate,
+            'iva_value': transaction.iva_value,
+            'net_value': transaction.net_value,
+            'create_date': transaction.create_date.strftime("%Y-%m-%d %H:%M:%S")
+        })
+    return provider.dumps({'success': True, 'transactions': transaction_list})
+
+
+def new_transactions(company_id, provider):
+    serializer = get_serializer('transaction')
+    rows = db.session.execute(
+        serializer.select().where(*transaction_criteria(company_id)).order_by(Expenses.create_date.desc())
+    ).all()
+    return provider.dumps({'success': True, 'transactions': serializer.dump_rows(rows)})
+
+
+def timed(function, repeat=5):
+    function()
+    db.session.expunge_all()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+        db.session.expunge_all()
+    return (time.perf_counter() - started) / repeat * 1000, result
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    with app.app_context():
+        db.create_all()
+        print(f"Seeding {rows} employees and {rows} ledger rows...")
+        user_id, company_id = seed(rows)
+
+        stdlib = DefaultJSONProvider(app)
+        fast = OrjsonProvider(app) if orjson else stdlib
+        if orjson is None:
+            print("orjson não está instalado: a comparar só o registo de serializers.")
+
+        print("\n" + "=" * 64)
+        for label, old, new in (
+            ('get_employees', old_employees, new_employees),
+            ('get_transactions', old_transactions, new_transactions),
+        ):
+            old_ms, old_body = timed(lambda: old(company_id, stdlib))
+            core_ms, core_body = timed(lambda: new(company_id, stdlib))
+            new_ms, new_body = timed(lambda: new(company_id, fast))
+            assert stdlib.loads(old_body) == stdlib.loads(core_body) == stdlib.loads(new_body)
+
+            print(f"  {label} ({rows} rows)")
+            print(f"    {'ORM + dicts + json':34s}{old_ms:8.1f} ms")
+            print(f"    {'Core rows + serializer + json':34s}{core_ms:8.1f} ms")
+            print(f"    {'Core rows + serializer + orjson':34s}{new_ms:8.1f} ms   ({old_ms / new_ms:.1f}x)")
+
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(user_id)
+            sess['_fresh'] = True
+
+        print(f"\n  GET /get-employees/{company_id} ({rows} rows)")
+        for name, provider in (('json', stdlib), ('orjson', fast)):
+            app.json = provider
+            elapsed, response = timed(lambda: client.get(f'/get-employees/{company_id}'))
+            assert response.status_code == 200
+            print(f"    {name:8s} {elapsed:8.1f} ms   {len(response.data) / 1024:.0f} KiB")
+        print("=" * 64)
+
+
+if __name__ == '__main__':
+    main()
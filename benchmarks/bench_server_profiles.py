@@ -0,0 +1,199 @@
+"""
+Gunicorn Profile Load Test
+==========================
+
+Starts gunicorn once per GUNICORN_PROFILE (sync, gthread, gevent) against
+a seeded SQLite database and drives the dashboard endpoints with
+concurrent keep-alive clients, reporting requests/s, p50 and p99 for each
+profile. Profiles whose worker class is not installed (gevent) are
+skipped.
+
+Usage:
+    python benchmarks/bench_server_profiles.py [seconds] [clients] [profile ...]
+"""
+
+import sys
+sys.dont_write_bytecode = True
+
+import http.client
+import importlib.util
+import os
+import random
+import socket
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'bench.db')
+os.environ['DATABASE_URI'] = f'sqlite:///{DB_PATH}'
+os.environ['SCHEDULER_ENABLED'] = 'false'
+os.environ['RATELIMIT_ENABLED'] = 'false'
+
+from app import app
+from extensions import db
+from instance.base import User, Company, Employee, Expenses, MonthlySummary, Settings
+from server_profiles import PROFILES, worker_settings
+
+YEAR, MONTH = 2026, 6
+PORT = 8765
+
+# Módulo de que cada worker_class depende
+WORKER_MODULES = {'gevent': 'gevent', 'gthread': None, 'sync': None}
+
+
+def seed():
+    user = User(username='bench', password='bench', name='Bench', type='Admin', write_date=datetime.now())
+    db.session.add(user)
+    db.session.flush()
+    company = Company(name='Empresa Bench', location='', relationship_type='', user_id=user.id)
+    db.session.add(company)
+    db.session.flush()
+
+    db.session.add(Settings(company.id, rent_value=800.0, total_insurance_value=120.0))
+    db.session.add_all(
+        Employee(f'Colaborador {index}', round(random.uniform(900, 3000), 2), 'Técnico', company.id,
+                 social_security_rate=11.0, employer_social_security_rate=23.75, irs_rate=12.5)
+        for index in range(40)
+    )
+    for offset in range(24):
+        month_index = YEAR * 12 + MONTH - 1 - offset
+        sales = random.uniform(5000, 20000)
+        costs = random.uniform(2000, 8000)
+        summary = MonthlySummary(month=month_index % 12 + 1, year=month_index // 12, company_id=company.id,
+                                 total_sales=sales, total_vat=sales * 0.19, total_costs=costs, profit=sales - costs)
+        db.session.add(summary)
+
+    start = datetime(YEAR, MONTH, 1)
+    db.session.execute(Expenses.__table__.insert(), [{
+        'transaction_type': 'despesa' if index % 4 else 'ganho',
+        'description': f'Fatura {index}',
+        'gross_value': 100.0,
+        'iva_rate': 23.0,
+        'iva_value': 18.7,
+        'net_value': 81.3,
+        'company_id': company.id,
+        'user_id': user.id,
+        'create_date': start + timedelta(minutes=index),
+    } for index in range(5000)])
+    db.session.commit()
+    return user.id, company.id
+
+
+def session_cookie(user_id):
+    serializer = app.session_interface.get_signing_serializer(app)
+    return f"{app.config['SESSION_COOKIE_NAME']}={serializer.dumps({'_user_id': str(user_id), '_fresh': True})}"
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def client_loop(urls, cookie, stop_at, latencies, errors):
+    connection = http.client.HTTPConnection('127.0.0.1', PORT, timeout=30)
+    headers = {'Cookie': cookie}
+    index = random.randrange(len(urls))
+    while time.monotonic() < stop_at:
+        url = urls[index % len(urls)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            connection.request('GET', url, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+            latencies.append(time.perf_counter() - started)
+        except (OSError, http.client.HTTPException):
+            errors.append('conn')
+            connection.close()
+            connection = http.client.HTTPConnection('127.0.0.1', PORT, timeout=30)
+
+
+def run_profile(profile, urls, cookie, seconds, clients):
+    env = dict(os.environ, GUNICORN_PROFILE=profile, PORT=str(PORT), FLASK_ENV='production')
+    server = subprocess.Popen(
+        # --max-requests 0: sem reciclagem de workers a meio da medição
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_config.py', '--max-requests', '0',
+         '--access-logfile', '/dev/null', '--error-logfile', '/dev/null', 'wsgi:app'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        if not wait_for_port(PORT):
+            raise RuntimeError(f"gunicorn ({profile}) não arrancou")
+        time.sleep(2)  # todos os workers prontos
+
+        # Aquecimento: preenche as caches de cada worker
+        warm_latencies, warm_errors = [], []
+        client_loop(urls, cookie, time.monotonic() + 1, warm_latencies, warm_errors)
+
+        latencies, errors = [], []
+        stop_at = time.monotonic() + seconds
+        threads = [
+            threading.Thread(target=client_loop, args=(urls, cookie, stop_at, latencies, errors))
+            for _ in range(clients)
+        ]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    if errors:
+        print(f"  {profile}: erros {sorted(set(map(str, errors)))}")
+    return len(latencies) / elapsed, statistics.median(latencies) * 1000, p99, len(errors)
+
+
+def main():
+    seconds = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    profiles = sys.argv[3:] or list(PROFILES)
+
+    with app.app_context():
+        db.create_all()
+        user_id, company_id = seed()
+        db.engine.dispose()
+
+    cookie = session_cookie(user_id)
+    urls = [
+        f'/api/dashboard/{company_id}?month={MONTH}&year={YEAR}',
+        f'/api/financial-summary?company_id={company_id}&month={MONTH}&year={YEAR}',
+        f'/api/chart-data?company_id={company_id}&type=bar&month={MONTH}&year={YEAR}',
+        f'/api/transactions?company_id={company_id}&month={MONTH}&year={YEAR}&limit=50',
+    ]
+
+    print(f"{os.cpu_count()} CPUs, {clients} clientes, {seconds}s por perfil\n")
+    print("=" * 64)
+    print(f"  {'perfil':10s}{'workers':>14s}{'req/s':>10s}{'p50':>10s}{'p99':>10s}{'erros':>8s}")
+    for profile in profiles:
+        module = WORKER_MODULES.get(PROFILES[profile]['worker_class'])
+        if module and importlib.util.find_spec(module) is None:
+            print(f"  {profile:10s}  (sem o pacote {module}; ignorado)")
+            continue
+
+        settings = worker_settings(profile)
+        shape = f"{settings['workers']} x {settings['threads']}"
+        rps, p50, p99, errors = run_profile(profile, urls, cookie, seconds, clients)
+        print(f"  {profile:10s}{shape:>14s}{rps:10.1f}{p50:8.1f}ms{p99:8.1f}ms{errors:8d}")
+    print("=" * 64)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""
+SQLite Journal Mode Benchmark
+=============================
+
+Runs reader and writer processes against the same SQLite file for a fixed
+time, first with the old settings (rollback journal, synchronous=FULL,
+default cache) and then with the Config pragmas (WAL, synchronous=NORMAL,
+larger cache and mmap). Readers run the dashboard queries (a summary range
+and a page of the month's transactions); writers insert a ledger row and
+upsert its monthly summary in one transaction, as add_expense does.
+Reports operations/s, p99 latency and "database is locked" errors.
+
+Usage:
+    python benchmarks/bench_sqlite_wal.py [seconds] [readers] [writers]
+"""
+
+import sys
+sys.dont_write_bytecode = True
+
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import OperationalError
+
+from extensions import db
+from instance.base import User, Company, Expenses, MonthlySummary
+from sqlite_pragmas import checkpoint, configure_sqlite
+
+YEAR, MONTH = 2026, 6
+
+MODES = (
+    ('rollback journal', {
+        'SQLITE_JOURNAL_MODE': 'DELETE', 'SQLITE_SYNCHRONOUS': 'FULL', 'SQLITE_BUSY_TIMEOUT': 5,
+        'SQLITE_CACHE_SIZE_KB': 2000, 'SQLITE_MMAP_SIZE': 0,
+    }),
+    ('WAL (Config)', {
+        'SQLITE_JOURNAL_MODE': 'WAL', 'SQLITE_SYNCHRONOUS': 'NORMAL', 'SQLITE_BUSY_TIMEOUT': 5,
+        'SQLITE_CACHE_SIZE_KB': 20000, 'SQLITE_MMAP_SIZE': 256 * 1024 * 1024,
+    }),
+)
+
+
+def open_engine(path, settings):
+    engine = create_engine(f'sqlite:///{path}')
+    configure_sqlite(engine, settings)
+    return engine
+
+
+def seed(path, settings):
+    engine = open_engine(path, settings)
+    db.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(User.__table__.insert(), [{
+            'id': 1, 'username': 'bench', 'password': 'bench', 'name': 'Bench', 'type': 'Admin',
+            'write_date': datetime.now(),
+        }])
+        connection.execute(Company.__table__.insert(), [
+            {'id': company_id, 'name': f'Empresa {company_id}', 'location': '', 'relationship_type': '', 'user_id': 1}
+            for company_id in range(1, 21)
+        ])
+        connection.execute(Expenses.__table__.insert(), [{
+            'transaction_type': 'despesa' if index % 4 else 'ganho',
+            'description': f'Fatura {index}',
+            'gross_value': 100.0, 'iva_rate': 23.0, 'iva_value': 18.7, 'net_value': 81.3,
+            'company_id': index % 20 + 1, 'user_id': 1,
+            'create_date': datetime(YEAR, MONTH, 1) + timedelta(minutes=index),
+        } for index in range(20000)])
+    engine.dispose()
+
+
+def read_once(connection, company_id):
+    connection.execute(
+        select(MonthlySummary).where(MonthlySummary.company_id == company_id, MonthlySummary.year == YEAR)
+    ).all()
+    connection.execute(
+        select(Expenses.id, Expenses.description, Expenses.gross_value, Expenses.create_date)
+        .where(Expenses.company_id == company_id)
+        .order_by(Expenses.create_date.desc())
+        .limit(50)
+    ).all()
+    connection.rollback()
+
+
+def write_once(connection, company_id):
+    connection.execute(Expenses.__table__.insert(), [{
+        'transaction_type': 'despesa', 'description': 'Compra', 'gross_value': 12.3, 'iva_rate': 23.0,
+        'iva_value': 2.3, 'net_value': 10.0, 'company_id': company_id, 'user_id': 1,
+        'create_date': datetime(YEAR, MONTH, 15),
+    }])
+    statement = insert(MonthlySummary.__table__).values(
+        company_id=company_id, year=YEAR, month=MONTH, total_costs=12.3, total_costs_without_vat=10.0,
+        total_sales=0.0, total_vat=0.0, profit=-12.3,
+    )
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=['month', 'year', 'company_id'],
+        set_={'total_costs': MonthlySummary.__table__.c.total_costs + 12.3},
+    ))
+    connection.commit()
+
+
+def worker(kind, path, settings, stop_at, results):
+    engine = open_engine(path, settings)
+    operation = read_once if kind == 'reader' else write_once
+    latencies, locked = [], 0
+    with engine.connect() as connection:
+        while time.time() < stop_at:
+            started = time.perf_counter()
+            try:
+                operation(connection, random.randint(1, 20))
+                latencies.append(time.perf_counter() - started)
+            except OperationalError as error:
+                connection.rollback()
+                if 'locked' not in str(error):
+                    raise
+                locked += 1
+    engine.dispose()
+    results.put((kind, latencies, locked))
+
+
+def run_mode(settings, seconds, readers, writers):
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    seed(path, settings)
+
+    # Uma ligação aberta até ao fim, para o WAL não ser apagado quando os workers saem
+    observer = open_engine(path, settings)
+    held = observer.connect()
+
+    results = multiprocessing.Queue()
+    stop_at = time.time() + 1 + seconds
+    processes = [
+        multiprocessing.Process(target=worker, args=(kind, path, settings, stop_at, results))
+        for kind in ['reader'] * readers + ['writer'] * writers
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    summary = {}
+    for kind in ('reader', 'writer'):
+        latencies = sorted(value for name, values, _ in collected if name == kind for value in values)
+        locked = sum(count for name, _, count in collected if name == kind)
+        p99 = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0.0
+        summary[kind] = (len(latencies) / seconds, p99, locked)
+
+    if settings['SQLITE_JOURNAL_MODE'] == 'WAL':
+        wal_size = os.path.getsize(path + '-wal') / 1024
+        checkpoint(observer, 'TRUNCATE')
+        summary['wal'] = (wal_size, os.path.getsize(path + '-wal') / 1024)
+    held.close()
+    observer.dispose()
+    return summary
+
+
+def main():
+    seconds = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    writers = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+
+    print(f"{readers} leitores + {writers} escritores, {seconds}s por modo\n")
+    print("=" * 72)
+    print(f"  {'modo':18s}{'leituras/s':>12s}{'p99':>10s}{'escritas/s':>12s}{'p99':>10s}{'locked':>9s}")
+    for label, settings in MODES:
+        summary = run_mode(settings, seconds, readers, writers)
+        reads, read_p99, read_locked = summary['reader']
+        writes, write_p99, write_locked = summary['writer']
+        print(f"  {label:18s}{reads:12.1f}{read_p99:8.1f}ms{writes:12.1f}{write_p99:8.1f}ms"
+              f"{read_locked + write_locked:9d}")
+        if 'wal' in summary:
+            before, after = summary['wal']
+            print(f"  {'':18s}WAL no fim: {before:.0f} KiB -> {after:.0f} KiB após checkpoint(TRUNCATE)")
+    print("=" * 72)
+
+
+if __name__ == '__main__':
+    main()
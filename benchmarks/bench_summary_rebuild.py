@@ -0,0 +1,100 @@
+"""
+Summary Rebuild Benchmark
+=========================
+
+Seeds a ledger (one million rows by default) and times the set-based
+rebuild of MonthlySummary against replaying a sample of rows through the
+per-row summary update used by the ledger routes.
+
+Usage:
+    python benchmarks/bench_summary_rebuild.py [rows] [companies] [replay_sample]
+"""
+
+import sys
+sys.dont_write_bytecode = True
+
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'bench.db')
+os.environ['DATABASE_URI'] = f'sqlite:///{DB_PATH}'
+
+from app import app, update_monthly_summary
+from extensions import db
+from instance.base import User, Company, Expenses, MonthlySummary
+from summary_rebuild import rebuild_summaries
+
+
+def seed(rows, companies):
+    user = User(username='bench', password='bench', name='Bench', type='Admin', write_date=datetime.now())
+    db.session.add(user)
+    db.session.flush()
+    company_ids = []
+    for i in range(companies):
+        company = Company(name=f'Empresa {i}', location='', relationship_type='', user_id=user.id)
+        db.session.add(company)
+        db.session.flush()
+        company_ids.append(company.id)
+
+    start = datetime(2023, 1, 1)
+    span = int((datetime(2026, 1, 1) - start).total_seconds())
+    for offset in range(0, rows, 50000):
+        batch = []
+        for _ in range(min(50000, rows - offset)):
+            value = round(random.uniform(1, 1000), 2)
+            batch.append({
+                'transaction_type': random.choice(['ganho', 'despesa']),
+                'description': random.choice(['Material', 'Serviço', 'Salário: Bench - Teste']),
+                'gross_value': value,
+                'iva_rate': 23.0,
+                'iva_value': round(value - value / 1.23, 2),
+                'net_value': round(value / 1.23, 2),
+                'company_id': random.choice(company_ids),
+                'user_id': user.id,
+                'create_date': start + timedelta(seconds=random.randrange(span)),
+            })
+        db.session.execute(Expenses.__table__.insert(), batch)
+    db.session.commit()
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    companies = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    sample = int(sys.argv[3]) if len(sys.argv) > 3 else 20000
+
+    with app.app_context():
+        db.create_all()
+        print(f"Seeding {rows} expenses across {companies} companies...")
+        seed(rows, companies)
+
+        started = time.perf_counter()
+        rebuild_summaries('expenses')
+        rebuild_elapsed = time.perf_counter() - started
+        summaries = MonthlySummary.query.count()
+
+        started = time.perf_counter()
+        rebuild_summaries('expenses')
+        noop_elapsed = time.perf_counter() - started
+
+        db.session.execute(MonthlySummary.__table__.delete())
+        db.session.commit()
+        started = time.perf_counter()
+        for expense in Expenses.query.limit(sample).yield_per(1000):
+            update_monthly_summary(expense)
+        db.session.commit()
+        replay_elapsed = time.perf_counter() - started
+
+        print("\n" + "=" * 60)
+        print(f"  Set-based rebuild:       {rebuild_elapsed:8.2f} s ({summaries} summary rows)")
+        print(f"  Rebuild with no changes: {noop_elapsed:8.2f} s")
+        print(f"  ORM replay ({sample} rows): {replay_elapsed:8.2f} s "
+              f"-> ~{replay_elapsed * rows / sample:.1f} s extrapolated to {rows} rows")
+        print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
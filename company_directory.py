@@ -0,0 +1,66 @@
+from sqlalchemy import and_, or_, tuple_
+from extensions import db
+from instance.base import Company
+from pagination import KeysetPagination, decode_cursor, encode_cursor
+from serializers import get_serializer
+
+
+def escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def name_prefix_filter(prefix):
+    """
+    Case-insensitive prefix match on Company.name that the name index can range-scan.
+
+    The index bounds the scan to names starting with either case of the first
+    character; ILIKE then checks the whole prefix on that slice only. The
+    bounds are only used for ASCII first characters: 'ß'.upper() is 'SS', and
+    SQLite's lower()/LIKE fold ASCII only, so other prefixes use ILIKE alone.
+    """
+    match = Company.name.ilike(escape_like(prefix) + '%', escape='\\')
+    cases = {prefix[0].upper(), prefix[0].lower()}
+    if not all(len(char) == 1 and char.isascii() for char in cases):
+        return match
+
+    ranges = [
+        and_(Company.name >= char, Company.name < chr(ord(char) + 1))
+        for char in sorted(cases)
+    ]
+    return and_(or_(*ranges), match)
+
+
+def company_page(user, prefix=None, after=None, per_page=50):
+    """
+    One page of the companies visible to `user`, ordered by (name, id).
+
+    Admins see every company; other users only the ones they own. Only the
+    'company_directory' serializer columns are loaded, and `after` is a
+    cursor from a previous page's next_cursor. Returns a KeysetPagination
+    of Core rows with no total.
+    """
+    criteria = []
+    if user.type != 'Admin':
+        criteria.append(Company.user_id == user.id)
+
+    prefix = (prefix or '').strip()
+    if prefix:
+        criteria.append(name_prefix_filter(prefix))
+
+    after = decode_cursor(after)
+    if after:
+        criteria.append(tuple_(Company.name, Company.id) > after)
+
+    rows = db.session.execute(
+        get_serializer('company_directory').select()
+        .where(*criteria)
+        .order_by(Company.name, Company.id)
+        .limit(per_page + 1)
+    ).all()
+
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    next_cursor = encode_cursor(rows[-1].name, rows[-1].id) if has_next else None
+
+    return KeysetPagination(rows, bool(after), has_next, None, next_cursor, None)
+
@@ -0,0 +1,157 @@
+import logging
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # dependência opcional; sem ela só se usa gzip
+    brotli = None
+
+logger = logging.getLogger('compression')
+logger.setLevel(logging.INFO)
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+handler = logging.StreamHandler()
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+
+COMPRESSIBLE_MIMETYPES = (
+    'application/json',
+    'application/javascript',
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/javascript',
+    'image/svg+xml',
+)
+
+# Respostas sem corpo ou com intervalos de bytes ficam como estão
+SKIP_STATUS_CODES = {204, 206, 304}
+
+
+class GzipEncoder:
+    name = 'gzip'
+
+    def __init__(self, level=6):
+        self.level = level
+
+    def compressor(self):
+        # wbits=31: cabeçalho gzip com mtime 0, a mesma resposta dá sempre os mesmos bytes
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+    def compress(self, data):
+        compress, _, finish = self.compressor()
+        return compress(data) + finish()
+
+
+class BrotliEncoder:
+    name = 'br'
+
+    def __init__(self, level=4):
+        self.level = level
+
+    def compressor(self):
+        compressor = brotli.Compressor(quality=self.level)
+        return compressor.process, compressor.flush, compressor.finish
+
+    def compress(self, data):
+        return brotli.compress(data, quality=self.level)
+
+
+class Compression:
+    """
+    after_request hook that gzip/brotli-encodes text responses.
+
+    Only the content types in COMPRESS_MIMETYPES are touched, buffered bodies
+    below COMPRESS_MIN_SIZE bytes are sent as they are, and streamed bodies are
+    compressed chunk by chunk with a sync flush so each chunk still reaches the
+    client when it is yielded. File responses (direct_passthrough) are left to
+    the static pipeline. Strong ETags are downgraded to weak ones, since the
+    encoded bytes differ from the identity representation.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.min_size = 500
+        self.mimetypes = frozenset(COMPRESSIBLE_MIMETYPES)
+        self.encoders = {}
+
+    def configure(self, app):
+        self.enabled = app.config.get('COMPRESS_ENABLED', True)
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', 500)
+        self.mimetypes = frozenset(app.config.get('COMPRESS_MIMETYPES') or COMPRESSIBLE_MIMETYPES)
+
+        self.encoders = {'gzip': GzipEncoder(app.config.get('COMPRESS_LEVEL', 6))}
+        if brotli is not None:
+            self.encoders['br'] = BrotliEncoder(app.config.get('COMPRESS_BR_LEVEL', 4))
+
+        if self.enabled:
+            app.after_request(self.after_request)
+        logger.info(f"Compressão: {'ativa' if self.enabled else 'desativada'} ({', '.join(self.encoders)})")
+
+    def choose_encoder(self):
+        """Encoder with the highest Accept-Encoding quality; brotli wins ties."""
+        accepted = request.accept_encodings
+        best, best_quality = None, 0
+        for name in ('br', 'gzip'):
+            encoder = self.encoders.get(name)
+            quality = accepted[name] if encoder else 0
+            if quality > best_quality:
+                best, best_quality = encoder, quality
+        return best
+
+    def after_request(self, response):
+        if response.status_code == 304:
+            response.vary.add('Accept-Encoding')
+            return response
+        if response.mimetype not in self.mimetypes:
+            return response
+
+        response.vary.add('Accept-Encoding')
+
+        if (
+            request.method == 'HEAD'
+            or response.status_code < 200
+            or response.status_code in SKIP_STATUS_CODES
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or 'no-transform' in response.headers.get('Cache-Control', '')
+        ):
+            return response
+
+        encoder = self.choose_encoder()
+        if encoder is None:
+            return response
+
+        if response.is_streamed:
+            response.response = _stream(response.response, encoder)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            response.set_data(encoder.compress(data))
+
+        response.headers['Content-Encoding'] = encoder.name
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+
+def _stream(chunks, encoder):
+    compress, flush, finish = encoder.compressor()
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compress(chunk) + flush()
+            if data:
+                yield data
+        yield finish()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+compression = Compression()
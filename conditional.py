@@ -0,0 +1,82 @@
+import datetime
+import hashlib
+from flask import request, current_app
+from sqlalchemy import func, select
+from extensions import db
+
+# O CURRENT_TIMESTAMP do SQLite tem resolução de um segundo: uma linha alterada
+# há menos de RACY_WINDOW ainda pode mudar sem que o write_date avance
+RACY_WINDOW = datetime.timedelta(seconds=1)
+
+
+def row_state(model, *criteria):
+    """
+    (row count, max(write_date), database now) of the `model` rows matching `criteria`.
+
+    A single aggregate query, served by the same index as the route's own
+    read, so checking whether a response changed costs one index probe.
+    """
+    return db.session.execute(
+        select(func.count(), func.max(model.write_date), func.current_timestamp())
+        .select_from(model)
+        .where(*criteria)
+    ).one()
+
+
+def is_racy(state):
+    """Whether the rows behind `state` were written within RACY_WINDOW, so a further write could keep the same state."""
+    count, last_write, now = state
+    return last_write is not None and now is not None and _naive(now) - _naive(last_write) < RACY_WINDOW
+
+
+class ConditionalResponse:
+    """
+    Weak ETag and Last-Modified for a JSON response built from the rows behind `states`.
+
+    The ETag hashes the request path and query with the count and latest
+    write_date of every row set, so inserts, updates and deletes all change
+    it. When a row set was written within RACY_WINDOW no validator is sent,
+    since a second write in the same second would keep the same ETag.
+    Only If-None-Match is honoured: If-Modified-Since alone cannot see
+    deleted rows. `resolved` holds whatever else the body depends on that is
+    not in the URL, such as a period defaulted from the clock.
+    """
+
+    def __init__(self, *states, resolved=None):
+        self.last_modified = None
+
+        for count, last_write, now in states:
+            if last_write is None:
+                continue
+            last_write = _naive(last_write)
+            if self.last_modified is None or last_write > self.last_modified:
+                self.last_modified = last_write
+
+        if any(is_racy(state) for state in states):
+            self.etag = None
+        else:
+            digest = hashlib.sha1(request.full_path.encode('utf-8'))
+            for count, last_write, _ in states:
+                digest.update(f"|{count}:{last_write}".encode('utf-8'))
+            if resolved is not None:
+                digest.update(f"|{resolved}".encode('utf-8'))
+            self.etag = digest.hexdigest()[:20]
+
+    @property
+    def is_fresh(self):
+        return self.etag is not None and request.if_none_match.contains_weak(self.etag)
+
+    def not_modified(self):
+        return self.finalize(current_app.response_class(status=304))
+
+    def finalize(self, response):
+        response.headers['Cache-Control'] = 'private, no-cache'
+        if self.etag is not None:
+            response.set_etag(self.etag, weak=True)
+        if self.last_modified is not None:
+            response.last_modified = self.last_modified.replace(tzinfo=datetime.timezone.utc)
+        return response
+
+
+def _naive(value):
+    return value.replace(tzinfo=None)
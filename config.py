@@ -1,6 +1,7 @@
 import os
 from dotenv import load_dotenv
 from datetime import timedelta
+from server_profiles import engine_options, profile_name
 
 # Load environment variables from .env file
 load_dotenv()
@@ -30,6 +31,58 @@ class Config:
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Connection pool sized for the gunicorn profile (GUNICORN_PROFILE: sync, gthread or gevent)
+    GUNICORN_PROFILE = profile_name()
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 15))  # seconds waiting for a write lock
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI, GUNICORN_PROFILE, SQLITE_BUSY_TIMEOUT)
+
+    # SQLite pragmas applied to every new connection (sqlite_pragmas.py). WAL lets readers
+    # carry on during a write; the checkpoint policy copies the WAL back every
+    # SQLITE_WAL_AUTOCHECKPOINT pages and trims the file to SQLITE_JOURNAL_SIZE_LIMIT bytes
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 20000))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_WAL_AUTOCHECKPOINT = int(os.environ.get('SQLITE_WAL_AUTOCHECKPOINT', 1000))
+    SQLITE_JOURNAL_SIZE_LIMIT = int(os.environ.get('SQLITE_JOURNAL_SIZE_LIMIT', 64 * 1024 * 1024))
+
+    # Ledger pages: total row count mode ('exact', 'cached' or 'skip'). 'cached'
+    # keeps totals per worker and only the worker that wrote drops them, so the
+    # other workers can show a total up to LEDGER_COUNT_CACHE_SECONDS old.
+    LEDGER_COUNT_MODE = os.environ.get('LEDGER_COUNT_MODE', 'cached')
+    LEDGER_COUNT_CACHE_SECONDS = int(os.environ.get('LEDGER_COUNT_CACHE_SECONDS', 60))
+    LEDGER_COUNT_CACHE_MAX_ENTRIES = int(os.environ.get('LEDGER_COUNT_CACHE_MAX_ENTRIES', 1024))
+
+    # Monthly summary cache: 'memory' (per worker), 'redis' (shared) or 'none'.
+    # Entries are checked against the company's summary counter in config_version
+    # on every read, so writes from other workers are never served stale; the TTL
+    # only bounds how long unused entries are kept.
+    SUMMARY_CACHE_BACKEND = os.environ.get('SUMMARY_CACHE_BACKEND', 'memory')
+    SUMMARY_CACHE_URL = os.environ.get('SUMMARY_CACHE_URL', 'redis://localhost:6379/1')
+    SUMMARY_CACHE_TTL = int(os.environ.get('SUMMARY_CACHE_TTL', 300))
+    SUMMARY_CACHE_MAX_ENTRIES = int(os.environ.get('SUMMARY_CACHE_MAX_ENTRIES', 2048))
+
+    # JSON responses: 'auto' (orjson when installed), 'orjson' or 'stdlib'
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'auto')
+
+    # gzip/brotli compression of JSON and HTML responses (brotli only when the package is installed)
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'True').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 500))
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 6))
+    COMPRESS_BR_LEVEL = int(os.environ.get('COMPRESS_BR_LEVEL', 4))
+
+    # Dashboard viewer: inline the current month's /api/dashboard payload in the HTML
+    DASHBOARD_EMBED_INITIAL_DATA = os.environ.get('DASHBOARD_EMBED_INITIAL_DATA', 'True').lower() == 'true'
+
+    # Flask-Login user loader cache (per worker); every hit is checked against the user's counter in config_version
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 30))
+
+    # Fixed-expense scheduler: one leader per database via the scheduler_state lease
+    SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', 'True').lower() == 'true'
+    SCHEDULER_RUN_TIME = os.environ.get('SCHEDULER_RUN_TIME', '06:00')
+    SCHEDULER_LEASE_SECONDS = int(os.environ.get('SCHEDULER_LEASE_SECONDS', 900))
+    SCHEDULER_MAX_CATCH_UP_DAYS = int(os.environ.get('SCHEDULER_MAX_CATCH_UP_DAYS', 31))
+
     # Session Configuration (HTTP only - no SSL required)
     PERMANENT_SESSION_LIFETIME = timedelta(seconds=int(os.environ.get('PERMANENT_SESSION_LIFETIME', 3600)))
     SESSION_COOKIE_SECURE = False  # Always False - HTTP only environment
@@ -43,10 +96,13 @@ class Config:
 
     # Rate Limiting Configuration
     RATELIMIT_STORAGE_URL = os.environ.get('RATELIMIT_STORAGE_URL', 'memory://')
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'True').lower() == 'true'
     RATELIMIT_DEFAULT = "200 per day, 50 per hour"
 
-    # Security Headers
-    SEND_FILE_MAX_AGE_DEFAULT = 31536000  # 1 year for static files
+    # Static files: fingerprinted copies from `flask build-assets` are cached for a year;
+    # the original files (no manifest yet) only for a few minutes, so deploys show up
+    STATIC_MANIFEST_ENABLED = os.environ.get('STATIC_MANIFEST_ENABLED', 'True').lower() == 'true'
+    SEND_FILE_MAX_AGE_DEFAULT = 300
 
 
 class DevelopmentConfig(Config):
@@ -54,6 +110,7 @@ class DevelopmentConfig(Config):
     DEBUG = True
     FLASK_ENV = 'development'
     SESSION_COOKIE_SECURE = False  # Allow HTTP in development
+    STATIC_MANIFEST_ENABLED = False  # Edits to static/ show up without rebuilding
 
 
 class ProductionConfig(Config):
@@ -71,7 +128,10 @@ class TestingConfig(Config):
     TESTING = True
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {}
     WTF_CSRF_ENABLED = False  # Disable CSRF for testing
+    RATELIMIT_ENABLED = False  # Test clients all share one address
+    SCHEDULER_ENABLED = False
     SESSION_COOKIE_SECURE = False
 
 
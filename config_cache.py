@@ -0,0 +1,112 @@
+import threading
+from types import SimpleNamespace
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+from extensions import db
+from instance.base import ConfigVersion, Info, Settings
+from summary_updates import dialect_insert
+
+# Contador em config_version incrementado sempre que estas tabelas mudam
+CONFIG_VERSION_NAMES = {
+    Info: 'info',
+    Settings: 'settings',
+}
+
+
+def snapshot(row):
+    """Detached copy of every column of `row`, safe to share between requests and threads."""
+    if row is None:
+        return None
+    return SimpleNamespace(**{column.name: getattr(row, column.name) for column in row.__table__.columns})
+
+
+def current_version(name):
+    version = db.session.execute(select(ConfigVersion.version).where(ConfigVersion.name == name)).scalar()
+    return version or 0
+
+
+def bump_config_version(name, session=None):
+    """Increment the `name` counter inside the current transaction of `session` (db.session by default)."""
+    table = ConfigVersion.__table__
+    (session or db.session).execute(
+        dialect_insert(table)
+        .values(name=name, version=1)
+        .on_conflict_do_update(
+            index_elements=['name'],
+            set_={'version': table.c.version + 1, 'write_date': func.current_timestamp()}
+        )
+    )
+
+
+class ConfigCache:
+    """
+    Process-wide cache of the Info row and of each company's Settings row.
+
+    Every lookup reads one integer from config_version and reuses the cached
+    row while that counter is unchanged. Any ORM write to Info or Settings
+    bumps the counter in the same transaction, so every gunicorn worker
+    reloads on its next lookup. Missing rows are cached as None.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name, key, load):
+        version = current_version(name)
+        with self._lock:
+            entry = self._entries.get((name, key))
+            if entry is not None and entry[0] == version:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = snapshot(load())
+        with self._lock:
+            self._entries[(name, key)] = (version, value)
+        return value
+
+    def get_info(self):
+        return self._get('info', None, lambda: Info.query.first())
+
+    def get_settings(self, company_id):
+        company_id = int(company_id)
+        return self._get('settings', company_id, lambda: Settings.query.filter_by(company_id=company_id).first())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+config_cache = ConfigCache()
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_flushed_config(session, flush_context):
+    names = {
+        CONFIG_VERSION_NAMES[type(obj)]
+        for obj in (session.new | session.dirty | session.deleted)
+        if type(obj) in CONFIG_VERSION_NAMES and (obj in session.new or obj in session.deleted or session.is_modified(obj))
+    }
+    for name in sorted(names):
+        bump_config_version(name, session)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _bump_bulk_config_writes(orm_execute_state):
+    # update(Settings)/delete(Info) em massa não passam pelo flush
+    mapper = orm_execute_state.bind_mapper
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and mapper is not None and mapper.class_ in CONFIG_VERSION_NAMES:
+        bump_config_version(CONFIG_VERSION_NAMES[mapper.class_], orm_execute_state.session)
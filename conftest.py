@@ -0,0 +1,75 @@
+"""
+Pytest Fixtures
+===============
+
+Shared fixtures for the application tests. The app is imported with the
+testing configuration, which uses an in-memory SQLite database.
+"""
+
+import sys
+sys.dont_write_bytecode = True
+
+import os
+os.environ['FLASK_ENV'] = 'testing'
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from app import app as flask_app
+from extensions import db
+from instance.base import User, Company
+from config_cache import config_cache
+from summary_cache import summary_cache
+from user_cache import user_cache
+
+
+@pytest.fixture
+def app():
+    with flask_app.app_context():
+        db.create_all()
+        summary_cache.clear()
+        user_cache.clear()
+        config_cache.clear()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def user(app):
+    user = User(username='tester', password='tester', name='Tester', type='Admin', write_date=datetime.now())
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def company(user):
+    company = Company(name='Empresa Teste', location='Lisboa', relationship_type='cliente', user_id=user.id)
+    db.session.add(company)
+    db.session.commit()
+    return company
+
+
+@pytest.fixture
+def client(app, user):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user.id)
+        sess['_fresh'] = True
+    return client
+
+
+@pytest.fixture
+def queries(app):
+    """Record every SQL statement sent to the engine while the test runs."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    yield statements
+    event.remove(db.engine, 'before_cursor_execute', record)
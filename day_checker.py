@@ -2,7 +2,13 @@ import threading
 import time
 import datetime
 import logging
+import os
+import socket
+from sqlalchemy import or_, update
+from extensions import db
+from instance.base import SchedulerState
 from salary_automation import check_and_process_salaries
+from summary_updates import dialect_insert
 
 logger = logging.getLogger('day_checker')
 logger.setLevel(logging.INFO)
@@ -11,30 +17,176 @@ handler = logging.StreamHandler()
 handler.setFormatter(formatter)
 logger.addHandler(handler)
 
-def print_current_day_loop(app=None):
-    
+JOB_NAME = 'fixed_expenses'
+
+# Intervalo máximo entre verificações do relógio, para acompanhar mudanças de hora
+MAX_SLEEP_SECONDS = 300
+
+
+def holder_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def parse_run_time(value):
+    return datetime.datetime.strptime(value, '%H:%M').time()
+
+
+def next_run_at(now, run_time):
+    """Next wall-clock occurrence of `run_time` strictly after `now`."""
+    candidate = datetime.datetime.combine(now.date(), run_time)
+    if candidate <= now:
+        candidate += datetime.timedelta(days=1)
+    return candidate
+
+
+def pending_run_dates(last_run_date, due_until, max_catch_up_days):
+    """Days after the last-run marker up to `due_until`, capped to the most recent `max_catch_up_days`."""
+    if last_run_date is None:
+        return [due_until]
+
+    first = max(last_run_date + datetime.timedelta(days=1), due_until - datetime.timedelta(days=max_catch_up_days - 1))
+    return [first + datetime.timedelta(days=offset) for offset in range((due_until - first).days + 1)]
+
+
+def lease_now():
+    # Os leases são em UTC, como o CURRENT_TIMESTAMP da base de dados, e não na hora local do processo
+    return datetime.datetime.utcnow()
+
+
+def acquire_lease(name, holder, now, lease_seconds):
+    """
+    Take the scheduler lease row if it is free, expired or already ours.
+
+    `now` is UTC (see lease_now). The conditional UPDATE is atomic, so of
+    several processes racing for the same row exactly one sees rowcount == 1.
+    """
+    db.session.execute(
+        dialect_insert(SchedulerState.__table__)
+        .values(name=name)
+        .on_conflict_do_nothing(index_elements=['name'])
+    )
+    result = db.session.execute(
+        update(SchedulerState)
+        .where(
+            SchedulerState.name == name,
+            or_(
+                SchedulerState.holder.is_(None),
+                SchedulerState.holder == holder,
+                SchedulerState.lease_expires_at < now
+            )
+        )
+        .values(holder=holder, lease_expires_at=now + datetime.timedelta(seconds=lease_seconds))
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def renew_lease(name, holder, lease_seconds):
+    """Push our lease's expiry lease_seconds past now; False if another process has taken it meanwhile."""
+    result = db.session.execute(
+        update(SchedulerState)
+        .where(SchedulerState.name == name, SchedulerState.holder == holder)
+        .values(lease_expires_at=lease_now() + datetime.timedelta(seconds=lease_seconds))
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def release_lease(name, holder):
+    db.session.execute(
+        update(SchedulerState)
+        .where(SchedulerState.name == name, SchedulerState.holder == holder)
+        .values(holder=None, lease_expires_at=None)
+    )
+    db.session.commit()
+
+
+def run_due_jobs(app, now=None):
+    """
+    Run the fixed-expense automation for every day since the last-run marker.
+
+    Only the process holding the lease runs; the others return immediately.
+    The lease is renewed before each company of each day, so a long catch-up
+    keeps it, and the run stops if another process took it meanwhile. The
+    marker advances one day at a time and stops at the first day with a
+    failed company, so that day is retried on the next tick. Returns the
+    dates that were processed.
+    """
+    with app.app_context():
+        now = now or datetime.datetime.now()
+        run_time = parse_run_time(app.config.get('SCHEDULER_RUN_TIME', '06:00'))
+        lease_seconds = app.config.get('SCHEDULER_LEASE_SECONDS', 900)
+        holder = holder_id()
+
+        if not acquire_lease(JOB_NAME, holder, lease_now(), lease_seconds):
+            logger.info(f"Lançamento de despesas fixas já em curso noutro processo; {holder} não vai executar.")
+            return []
+
+        def keep_lease():
+            if not renew_lease(JOB_NAME, holder, lease_seconds):
+                raise RuntimeError(f"{holder} perdeu o lease de {JOB_NAME}; execução interrompida.")
+
+        processed = []
+        try:
+            state = db.session.get(SchedulerState, JOB_NAME)
+            due_until = now.date() if now.time() >= run_time else now.date() - datetime.timedelta(days=1)
+
+            for run_date in pending_run_dates(state.last_run_date, due_until, app.config.get('SCHEDULER_MAX_CATCH_UP_DAYS', 31)):
+                run_at = now if run_date == now.date() else datetime.datetime.combine(run_date, run_time)
+                logger.info(f"Executando lançamento de despesas fixas de {run_date.strftime('%d/%m/%Y')}")
+
+                if check_and_process_salaries(app, run_at, heartbeat=keep_lease):
+                    logger.warning(f"Falhas no dia {run_date.strftime('%d/%m/%Y')}; será repetido na próxima execução.")
+                    break
+
+                state.last_run_date = run_date
+                db.session.commit()
+                processed.append(run_date)
+        finally:
+            db.session.rollback()
+            release_lease(JOB_NAME, holder)
+
+        return processed
+
+
+def scheduler_loop(app):
+    """Catch up on start-up, then run at SCHEDULER_RUN_TIME every day by the wall clock."""
+    run_time = parse_run_time(app.config.get('SCHEDULER_RUN_TIME', '06:00'))
+    next_run = datetime.datetime.now()
+
     while True:
-        current_date = datetime.datetime.now()
-        print(f"\nData atual: {current_date.strftime('%d/%m/%Y %H:%M:%S')}")
-        print(f"Dia do mês: {current_date.day}")
-        
-        if app:
-            check_and_process_salaries(app)
-        
-        time.sleep(82800) 
+        remaining = (next_run - datetime.datetime.now()).total_seconds()
+        if remaining > 0:
+            time.sleep(min(remaining, MAX_SLEEP_SECONDS))
+            continue
+
+        try:
+            run_due_jobs(app)
+        except Exception as e:
+            logger.error(f"Erro no agendador de despesas fixas: {str(e)}")
+
+        next_run = next_run_at(datetime.datetime.now(), run_time)
+        logger.info(f"Próxima execução do agendador: {next_run.strftime('%d/%m/%Y %H:%M')}")
+
 
 def start_day_checker(app=None):
-    day_checker_thread = threading.Thread(target=print_current_day_loop, args=(app,))
+    if app is None or not app.config.get('SCHEDULER_ENABLED', True):
+        logger.info("Agendador de despesas fixas desativado.")
+        return None
+
+    day_checker_thread = threading.Thread(target=scheduler_loop, args=(app,), name='day_checker')
     day_checker_thread.daemon = True
     day_checker_thread.start()
-    logger.info("Verificador de data iniciado em segundo plano.")
+    logger.info(f"Agendador de despesas fixas iniciado em segundo plano ({holder_id()}).")
     return day_checker_thread
 
 if __name__ == "__main__":
-    print("Executando verificador de data no modo independente.")
+    from app import app
+
+    print("Executando agendador de despesas fixas no modo independente.")
     print("Pressione Ctrl+C para encerrar.")
-    
+
     try:
-        print_current_day_loop()
+        scheduler_loop(app)
     except KeyboardInterrupt:
-        print("\nVerificador de data encerrado pelo usuário.")
\ No newline at end of file
+        print("\nAgendador de despesas fixas encerrado pelo usuário.")
@@ -0,0 +1,49 @@
+from sqlalchemy import case, func, select
+from extensions import db
+from instance.base import Expenses
+from periods import month_filter
+
+OTHERS_LABEL = 'Outros'
+
+
+def category_key(column):
+    """
+    SQL expression for the first word of `column`, matching str.split(' ')[0].
+
+    Chosen per dialect like dialect_insert(): SQLite has no split function,
+    PostgreSQL has no instr().
+    """
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return func.split_part(column, ' ', 1)
+    space = func.instr(column, ' ')
+    return case((space > 0, func.substr(column, 1, space - 1)), else_=column)
+
+
+def top_expense_categories(company_id, year, month, limit=8):
+    """
+    Expense totals of one month grouped by category, largest first.
+
+    The grouping runs in the database, so only one row per category reaches
+    Python. Categories beyond the first `limit` are folded into 'Outros'.
+    Returns a {label: total} dict in display order.
+    """
+    category = category_key(Expenses.description).label('category')
+    total = func.sum(Expenses.gross_value).label('total')
+
+    rows = db.session.execute(
+        select(category, total)
+        .where(
+            Expenses.company_id == company_id,
+            Expenses.transaction_type == 'despesa',
+            month_filter(Expenses.create_date, year, month)
+        )
+        .group_by(category)
+        .order_by(total.desc(), category)
+    ).all()
+
+    categories = {row.category: row.total for row in rows[:limit]}
+    remainder = sum(row.total for row in rows[limit:])
+    if remainder:
+        categories[OTHERS_LABEL] = categories.get(OTHERS_LABEL, 0.0) + remainder
+
+    return categories
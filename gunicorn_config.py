@@ -6,19 +6,34 @@ Production WSGI server configuration for Flask application.
 
 Usage:
     gunicorn -c gunicorn_config.py app:app
+    GUNICORN_PROFILE=gthread gunicorn -c gunicorn_config.py app:app
+
+Profiles (see server_profiles.py):
+    sync     one request per process, 2 x CPU + 1 processes (default)
+    gthread  CPU + 1 processes with GUNICORN_THREADS (4) threads each
+    gevent   CPU processes with greenlets; requires the gevent package
+
+sync and gthread preload the app in the master (GUNICORN_PRELOAD=false to
+turn it off); code changes then need a restart, not a HUP reload.
 """
 
 import os
-import multiprocessing
+import threading
+from server_profiles import dispose_engines, preload_enabled, profile_name, worker_settings
 
 # Server socket
 bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
 backlog = 2048
 
-# Worker processes
-workers = multiprocessing.cpu_count() * 2 + 1
-worker_class = 'sync'
-worker_connections = 1000
+# Worker processes (GUNICORN_PROFILE; GUNICORN_WORKERS / GUNICORN_THREADS override)
+profile = profile_name()
+_settings = worker_settings(profile)
+workers = _settings['workers']
+worker_class = _settings['worker_class']
+threads = _settings['threads']
+worker_connections = _settings['worker_connections']
+# Importar a aplicação uma vez no master; os workers são forks que partilham essa memória
+preload_app = preload_enabled(profile)
 timeout = 30
 keepalive = 2
 
@@ -58,7 +73,9 @@ def on_starting(server):
     print("=" * 60)
     print("Starting Cadete Application with Gunicorn")
     print("=" * 60)
-    print(f"Workers: {workers}")
+    print(f"Profile: {profile} ({worker_class})")
+    print(f"Workers: {workers} x {threads} threads")
+    print(f"Preload: {'yes' if preload_app else 'no'}")
     print(f"Bind: {bind}")
     print(f"Timeout: {timeout}s")
     print("=" * 60)
@@ -67,6 +84,26 @@ def on_reload(server):
     """Called to recycle workers during a reload."""
     print("Reloading workers...")
 
+def when_ready(server):
+    """Called just after the server is started."""
+    # Threads do master não sobrevivem ao fork: os workers herdariam apenas os seus locks
+    extra_threads = [thread.name for thread in threading.enumerate() if thread is not threading.main_thread()]
+    if preload_app and extra_threads:
+        server.log.warning(f"Threads a correr no master antes do fork: {', '.join(extra_threads)}")
+
+def post_fork(server, worker):
+    """Called just after a worker has been forked."""
+    # Com preload, o pool de ligações veio do master; cada worker abre as suas
+    if preload_app:
+        dispose_engines(server.app.wsgi())
+
+def post_worker_init(worker):
+    """Called just after a worker has loaded the application."""
+    # Todos os workers arrancam o agendador (nunca o master, mesmo com preload); o
+    # lease em scheduler_state garante que só um deles lança as despesas fixas de cada dia.
+    from day_checker import start_day_checker
+    start_day_checker(worker.wsgi)
+
 def worker_int(worker):
     """Called when a worker receives the SIGINT or SIGQUIT signal."""
     print(f"Worker {worker.pid} received SIGINT/SIGQUIT")
@@ -49,6 +49,12 @@ class Expenses(db.Model):
     create_date = db.Column(db.DateTime, default=db.func.current_timestamp())
     write_date = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
     
+    __table_args__ = (
+        db.Index('ix_expenses_company_create_date', 'company_id', 'create_date'),
+        db.Index('ix_expenses_company_type_create_date', 'company_id', 'transaction_type', 'create_date'),
+        db.Index('ix_expenses_company_gross_value', 'company_id', 'gross_value', 'id'),
+    )
+    
     def __init__(self, transaction_type, description, gross_value, iva_rate, iva_value, net_value, user_id, company_id):
         self.transaction_type = transaction_type
         self.description = description
@@ -110,6 +116,7 @@ class MonthlySummary(db.Model):
     
     __table_args__ = (
         db.UniqueConstraint('month', 'year', 'company_id', name='_month_year_company_uc'),
+        db.Index('ix_monthly_summary_company_period', 'company_id', 'year', 'month'),
     )
     
     def __init__(self, month, year, company_id, total_sales=0.0, total_sales_without_vat=0.0, 
@@ -168,6 +175,10 @@ class SimpleExpenses(db.Model):
     create_date = db.Column(db.DateTime, default=db.func.current_timestamp())
     write_date = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
     
+    __table_args__ = (
+        db.Index('ix_simple_expenses_company_create_date', 'company_id', 'create_date'),
+    )
+    
     def __init__(self, transaction_type, description, gross_value, iva_rate, iva_value, net_value, user_id, company_id):
         self.transaction_type = transaction_type
         self.description = description
@@ -246,4 +257,44 @@ class Info(db.Model):
     
     def __init__(self, payment_vps_date=None, subscription_type_vps=None):
         self.payment_vps_date = payment_vps_date
-        self.subscription_type_vps = subscription_type_vps
\ No newline at end of file
+        self.subscription_type_vps = subscription_type_vps
+class SchedulerState(db.Model):
+    name = db.Column(db.String(50), primary_key=True)
+    holder = db.Column(db.String(255), nullable=True)
+    lease_expires_at = db.Column(db.DateTime, nullable=True)
+    last_run_date = db.Column(db.Date, nullable=True)
+    create_date = db.Column(db.DateTime, default=db.func.current_timestamp())
+    write_date = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
+    
+    def __init__(self, name, last_run_date=None):
+        self.name = name
+        self.last_run_date = last_run_date
+
+class AutomatedPosting(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    company_id = db.Column(db.Integer, db.ForeignKey('company.id'), nullable=False)
+    period = db.Column(db.String(7), nullable=False)  # 'YYYY-MM'
+    kind = db.Column(db.String(30), nullable=False)
+    employee_id = db.Column(db.Integer, nullable=False, default=0)  # 0 para lançamentos da empresa (renda, seguros, ...)
+    amount = db.Column(db.Float, nullable=False)
+    create_date = db.Column(db.DateTime, default=db.func.current_timestamp())
+    
+    __table_args__ = (
+        db.UniqueConstraint('company_id', 'period', 'kind', 'employee_id', name='_automated_posting_uc'),
+    )
+    
+    def __init__(self, company_id, period, kind, amount, employee_id=0):
+        self.company_id = company_id
+        self.period = period
+        self.kind = kind
+        self.amount = amount
+        self.employee_id = employee_id
+
+class ConfigVersion(db.Model):
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    write_date = db.Column(db.DateTime, default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
+    
+    def __init__(self, name, version=0):
+        self.name = name
+        self.version = version
@@ -0,0 +1,63 @@
+import logging
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # dependência opcional; sem ela fica o provider json da stdlib
+    orjson = None
+
+logger = logging.getLogger('json_provider')
+logger.setLevel(logging.INFO)
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+handler = logging.StreamHandler()
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that serializes with orjson.
+
+    Output matches DefaultJSONProvider: keys are sorted when sort_keys is
+    set, and dates still go through Flask's default (HTTP date strings).
+    Calls with extra json.dumps keyword arguments, such as the session
+    serializer's separators, are left to the stdlib provider.
+    """
+
+    def _options(self, indent=False):
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(obj, default=self.default, option=self._options(indent)) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def configure_json(app):
+    """Install the JSON provider chosen by JSON_PROVIDER ('auto', 'orjson' or 'stdlib')."""
+    choice = app.config.get('JSON_PROVIDER', 'auto')
+
+    if choice == 'stdlib' or (choice == 'auto' and orjson is None):
+        app.json = DefaultJSONProvider(app)
+    elif orjson is None:
+        raise RuntimeError("JSON_PROVIDER=orjson requer o pacote orjson (pip install orjson).")
+    else:
+        app.json = OrjsonProvider(app)
+
+    logger.info(f"Provider JSON: {type(app.json).__name__}")
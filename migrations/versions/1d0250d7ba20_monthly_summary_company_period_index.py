@@ -0,0 +1,25 @@
+"""monthly_summary (company_id, year, month) index
+
+Revision ID: 1d0250d7ba20
+Revises: 56ef0359937f
+Create Date: 2026-10-18 10:03:27.519630
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1d0250d7ba20'
+down_revision = '56ef0359937f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_monthly_summary_company_period', 'monthly_summary',
+                    ['company_id', 'year', 'month'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_monthly_summary_company_period', table_name='monthly_summary', if_exists=True)
@@ -0,0 +1,25 @@
+"""expenses (company_id, gross_value, id) index
+
+Revision ID: 3c9e2f6a81d4
+Revises: ebdf8ef4b4ac
+Create Date: 2026-10-18 14:12:05.418327
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9e2f6a81d4'
+down_revision = 'ebdf8ef4b4ac'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_expenses_company_gross_value', 'expenses',
+                    ['company_id', 'gross_value', 'id'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_expenses_company_gross_value', table_name='expenses', if_exists=True)
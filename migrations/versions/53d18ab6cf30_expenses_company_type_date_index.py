@@ -0,0 +1,25 @@
+"""expenses (company_id, transaction_type, create_date) index
+
+Revision ID: 53d18ab6cf30
+Revises: 1d0250d7ba20
+Create Date: 2026-10-18 00:40:37.994875
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '53d18ab6cf30'
+down_revision = '1d0250d7ba20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_expenses_company_type_create_date', 'expenses',
+                    ['company_id', 'transaction_type', 'create_date'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_expenses_company_type_create_date', table_name='expenses', if_exists=True)
@@ -0,0 +1,28 @@
+"""ledger (company_id, create_date) indexes
+
+Revision ID: 56ef0359937f
+Revises: 
+Create Date: 2026-10-18 09:12:44.318207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '56ef0359937f'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_expenses_company_create_date', 'expenses',
+                    ['company_id', 'create_date'], unique=False, if_not_exists=True)
+    op.create_index('ix_simple_expenses_company_create_date', 'simple_expenses',
+                    ['company_id', 'create_date'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_simple_expenses_company_create_date', table_name='simple_expenses', if_exists=True)
+    op.drop_index('ix_expenses_company_create_date', table_name='expenses', if_exists=True)
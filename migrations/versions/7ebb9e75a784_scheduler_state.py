@@ -0,0 +1,36 @@
+"""scheduler_state lease and last-run marker
+
+Revision ID: 7ebb9e75a784
+Revises: 53d18ab6cf30
+Create Date: 2026-10-18 00:44:45.260406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7ebb9e75a784'
+down_revision = '53d18ab6cf30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # db.create_all() pode já ter criado a tabela
+    if sa.inspect(op.get_bind()).has_table('scheduler_state'):
+        return
+
+    op.create_table('scheduler_state',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('holder', sa.String(length=255), nullable=True),
+        sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+        sa.Column('last_run_date', sa.Date(), nullable=True),
+        sa.Column('create_date', sa.DateTime(), nullable=True),
+        sa.Column('write_date', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('scheduler_state')
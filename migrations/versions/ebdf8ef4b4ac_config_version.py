@@ -0,0 +1,33 @@
+"""config_version counters for the Info/Settings cache
+
+Revision ID: ebdf8ef4b4ac
+Revises: faeaea6172b6
+Create Date: 2026-10-18 01:01:00.718604
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ebdf8ef4b4ac'
+down_revision = 'faeaea6172b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # db.create_all() pode já ter criado a tabela
+    if sa.inspect(op.get_bind()).has_table('config_version'):
+        return
+
+    op.create_table('config_version',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('write_date', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('config_version')
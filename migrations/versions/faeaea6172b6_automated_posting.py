@@ -0,0 +1,73 @@
+"""automated_posting run ledger for fixed-expense automation
+
+Revision ID: faeaea6172b6
+Revises: 7ebb9e75a784
+Create Date: 2026-10-18 00:47:49.918701
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'faeaea6172b6'
+down_revision = '7ebb9e75a784'
+branch_labels = None
+depends_on = None
+
+# Lançamentos automáticos já existentes, reconhecidos pela descrição
+FIXED_EXPENSES = {
+    'rent': "Renda mensal do espaço",
+    'employee_insurance': "Seguros dos Empregados",
+    'company_insurance': "Seguros da Empresa",
+    'other_expenses': "Outras Despesas Fixas",
+}
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    # db.create_all() pode já ter criado a tabela
+    if not sa.inspect(bind).has_table('automated_posting'):
+        op.create_table('automated_posting',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('company_id', sa.Integer(), nullable=False),
+            sa.Column('period', sa.String(length=7), nullable=False),
+            sa.Column('kind', sa.String(length=30), nullable=False),
+            sa.Column('employee_id', sa.Integer(), nullable=False),
+            sa.Column('amount', sa.Float(), nullable=False),
+            sa.Column('create_date', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['company_id'], ['company.id'], ),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('company_id', 'period', 'kind', 'employee_id', name='_automated_posting_uc')
+        )
+
+    # Registar o que a automação já lançou, para não voltar a lançar esses meses
+    if bind.dialect.name == 'postgresql':
+        period = "to_char(e.create_date, 'YYYY-MM')"
+    else:
+        period = "strftime('%Y-%m', e.create_date)"
+
+    for kind, description in FIXED_EXPENSES.items():
+        bind.execute(sa.text(f"""
+            INSERT INTO automated_posting (company_id, period, kind, employee_id, amount, create_date)
+            SELECT e.company_id, {period}, :kind, 0, SUM(e.gross_value), CURRENT_TIMESTAMP
+            FROM expenses e
+            WHERE e.description = :description
+            GROUP BY e.company_id, {period}
+            ON CONFLICT DO NOTHING
+        """), {'kind': kind, 'description': description})
+
+    bind.execute(sa.text(f"""
+        INSERT INTO automated_posting (company_id, period, kind, employee_id, amount, create_date)
+        SELECT e.company_id, {period}, 'salary', emp.id, SUM(e.gross_value), CURRENT_TIMESTAMP
+        FROM expenses e, employee emp
+        WHERE emp.company_id = e.company_id
+          AND e.description LIKE 'Salário: ' || emp.name || ' - %'
+        GROUP BY e.company_id, {period}, emp.id
+        ON CONFLICT DO NOTHING
+    """))
+
+
+def downgrade():
+    op.drop_table('automated_posting')
@@ -0,0 +1,165 @@
+import base64
+import json
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy import func, select, tuple_, type_coerce, String
+from extensions import db
+
+# (tabela, company_id, filtro) -> (expira_em, total), por ordem de inserção: com o mesmo
+# LEDGER_COUNT_CACHE_SECONDS para todas, as primeiras são também as primeiras a expirar
+_count_cache = OrderedDict()
+_count_lock = threading.Lock()
+
+
+def encode_cursor(sort_key, row_id, sort_name=None):
+    values = [sort_key, row_id] if sort_name is None else [sort_key, row_id, sort_name]
+    raw = json.dumps(values).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _cursor_values(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    if not isinstance(values, list) or len(values) not in (2, 3):
+        raise ValueError(cursor)
+    return values
+
+
+def decode_cursor(cursor):
+    """Return the (sort_key, id) pair stored in `cursor`, or None if it is missing or malformed."""
+    if not cursor:
+        return None
+    try:
+        sort_key, row_id = _cursor_values(cursor)[:2]
+        if not isinstance(sort_key, (str, int, float)):
+            return None
+        return sort_key, int(row_id)
+    except (ValueError, TypeError):
+        return None
+
+
+def cursor_matches_sort(cursor, sort_name):
+    """
+    Whether `cursor` was issued for the `sort_name` ordering.
+
+    A date cursor compared against amounts (or the reverse) would silently
+    skip or repeat rows. Missing and malformed cursors match, since those
+    fall back to the first page.
+    """
+    if decode_cursor(cursor) is None:
+        return True
+    values = _cursor_values(cursor)
+    return len(values) == 3 and values[2] == sort_name
+
+
+class KeysetPagination:
+    """
+    One page of a ledger ordered by (create_date, id) descending.
+
+    Mirrors the attributes the templates used from Flask-SQLAlchemy's
+    Pagination (items, has_prev, has_next, total) but navigates with opaque
+    cursors instead of page numbers, so every page costs one index range scan.
+    `total` is None when counting is disabled.
+    """
+
+    def __init__(self, items, has_prev, has_next, prev_cursor, next_cursor, total):
+        self.items = items
+        self.has_prev = has_prev
+        self.has_next = has_next
+        self.prev_cursor = prev_cursor
+        self.next_cursor = next_cursor
+        self.total = total
+
+
+def count_rows(model, company_id, criteria, cache_key):
+    """Total rows matching `criteria`, honouring LEDGER_COUNT_MODE (exact, cached or skip)."""
+    mode = current_app.config.get('LEDGER_COUNT_MODE', 'cached')
+    if mode == 'skip':
+        return None
+
+    key = (model.__tablename__, company_id, cache_key)
+    now = time.monotonic()
+    if mode == 'cached':
+        cached = _count_cache.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+
+    total = db.session.execute(select(func.count()).select_from(model).where(*criteria)).scalar()
+
+    if mode == 'cached':
+        store_count(key, now + current_app.config.get('LEDGER_COUNT_CACHE_SECONDS', 60), total,
+                    current_app.config.get('LEDGER_COUNT_CACHE_MAX_ENTRIES', 1024))
+    return total
+
+
+def store_count(key, expires_at, total, max_entries):
+    """Cache one total, first dropping the expired entries and then the oldest ones above `max_entries`."""
+    now = time.monotonic()
+    with _count_lock:
+        _count_cache.pop(key, None)
+        _count_cache[key] = (expires_at, total)
+        while _count_cache:
+            oldest_key, (oldest_expires_at, _) = next(iter(_count_cache.items()))
+            if oldest_expires_at > now and len(_count_cache) <= max_entries:
+                break
+            del _count_cache[oldest_key]
+
+
+def invalidate_counts(model, company_id):
+    """Drop this process's cached totals for one company's ledger after a write."""
+    with _count_lock:
+        for key in [key for key in _count_cache if key[:2] == (model.__tablename__, company_id)]:
+            del _count_cache[key]
+
+
+def keyset_paginate(model, company_id, criteria=(), per_page=100, after=None, before=None, cache_key=None, sort_column=None, columns=None, sort_name=None):
+    """
+    Fetch the page after cursor `after` (older rows) or before cursor `before` (newer rows).
+
+    The default sort key is create_date as stored text, so cursors compare
+    exactly against what SQLite holds; the ordering matches ORDER BY
+    create_date. `sort_column` orders by another column instead, with id as
+    the tie-breaker. With `columns` (which must include id) the items are
+    Core rows of those columns instead of ORM objects. `sort_name` is stored
+    in the cursors so callers can reject one issued for another ordering.
+    """
+    sort_key = type_coerce(model.create_date, String) if sort_column is None else sort_column
+    scoped_criteria = [model.company_id == company_id, *criteria]
+    after, before = decode_cursor(after), decode_cursor(before)
+
+    selected = (model,) if columns is None else tuple(columns)
+    statement = select(*selected, sort_key.label('sort_key')).where(*scoped_criteria)
+
+    if before:
+        statement = statement.where(tuple_(sort_key, model.id) > before)
+        statement = statement.order_by(sort_key.asc(), model.id.asc())
+    else:
+        if after:
+            statement = statement.where(tuple_(sort_key, model.id) < after)
+        statement = statement.order_by(sort_key.desc(), model.id.desc())
+
+    rows = db.session.execute(statement.limit(per_page + 1)).all()
+
+    if not rows and (after or before):
+        # O cursor ficou sem linhas (ex.: lançamentos apagados): voltar à primeira página
+        return keyset_paginate(model, company_id, criteria, per_page, cache_key=cache_key, sort_column=sort_column,
+                              columns=columns, sort_name=sort_name)
+
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+
+    if before:
+        rows.reverse()
+        has_prev, has_next = has_more, True
+    else:
+        has_prev, has_next = bool(after), has_more
+
+    items = [row[0] for row in rows] if columns is None else rows
+    prev_cursor = encode_cursor(rows[0].sort_key, items[0].id, sort_name) if rows and has_prev else None
+    next_cursor = encode_cursor(rows[-1].sort_key, items[-1].id, sort_name) if rows and has_next else None
+
+    total = count_rows(model, company_id, scoped_criteria, cache_key)
+
+    return KeysetPagination(items, has_prev, has_next, prev_cursor, next_cursor, total)
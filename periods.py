@@ -0,0 +1,68 @@
+import datetime
+from sqlalchemy import and_, tuple_, type_coerce, String
+
+
+def shift_month(year, month, delta):
+    """Return the (year, month) pair `delta` months away from year/month."""
+    index = year * 12 + (month - 1) + delta
+    return index // 12, index % 12 + 1
+
+
+def month_bounds(year, month):
+    """Return the half-open [start, end) datetimes covering year/month."""
+    start = datetime.datetime(year, month, 1)
+    next_year, next_month = shift_month(year, month, 1)
+    return start, datetime.datetime(next_year, next_month, 1)
+
+
+def date_range_filter(column, start, end):
+    """
+    Half-open range filter on a DateTime column that an index on the column can serve.
+
+    SQLite keeps DateTime values as ISO text, written either with or without
+    microseconds depending on whether the ORM or CURRENT_TIMESTAMP produced
+    them. Comparing against bare ISO date strings orders both forms correctly,
+    whereas a bound datetime ('... 00:00:00.000000') would skip rows stamped
+    exactly at midnight.
+    """
+    text_column = type_coerce(column, String)
+    return and_(
+        text_column >= start.strftime('%Y-%m-%d'),
+        text_column < end.strftime('%Y-%m-%d')
+    )
+
+
+def month_filter(column, year, month):
+    """Filter `column` to the given month without wrapping it in extract()."""
+    start, end = month_bounds(year, month)
+    return date_range_filter(column, start, end)
+
+
+def parse_month(value):
+    """Parse a 'YYYY-MM' string into a (year, month) pair, raising ValueError if malformed."""
+    parsed = datetime.datetime.strptime(value or '', '%Y-%m')
+    return parsed.year, parsed.month
+
+
+def format_month(year, month):
+    """Format a (year, month) pair as 'YYYY-MM', the inverse of parse_month()."""
+    return f"{year:04d}-{month:02d}"
+
+
+def months_between(start, end):
+    """Number of months from the (year, month) pair `start` to `end`, inclusive."""
+    return (end[0] * 12 + end[1]) - (start[0] * 12 + start[1]) + 1
+
+
+def period_range_filter(year_column, month_column, start, end):
+    """
+    Inclusive (year, month) range filter for tables keyed by separate year/month columns.
+
+    The BETWEEN on year lets an index led by (company_id, year, month) bound the
+    scan; the row-value comparisons trim the partial years at each edge.
+    """
+    return and_(
+        year_column.between(start[0], end[0]),
+        tuple_(year_column, month_column) >= start,
+        tuple_(year_column, month_column) <= end
+    )
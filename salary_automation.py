@@ -1,10 +1,15 @@
 import logging
 import datetime
 import calendar
-from sqlalchemy import extract, and_
-from instance.base import Company, Settings, Employee, Expenses, MonthlySummary
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import select
+from instance.base import Company, Settings, Employee, Expenses, MonthlySummary, AutomatedPosting
 from flask import current_app
 from extensions import db
+from periods import format_month, shift_month, months_between
+from summary_updates import ledger_deltas, combine_deltas, upsert_summary_delta, dialect_insert
+from config_cache import config_cache
 
 logger = logging.getLogger('salary_automation')
 logger.setLevel(logging.INFO)
@@ -13,10 +18,27 @@ handler = logging.StreamHandler()
 handler.setFormatter(formatter)
 logger.addHandler(handler)
 
-def check_and_process_salaries(app):
+def company_salary_day(settings, year, month):
+    """Day of year/month on which the company's salaries and fixed expenses are posted."""
+    preferred_day = settings.preferred_salary_expense_day
+    
+    if preferred_day == 99:
+        return calendar.monthrange(year, month)[1]
+    return min(preferred_day, 28)
+
+def check_and_process_salaries(app, current_date=None, heartbeat=None):
+    """
+    Post fixed expenses for every active company whose salary day is `current_date` (default: now).
+
+    `heartbeat`, if given, is called before each company (the scheduler
+    renews its lease there); an exception from it stops the run. Returns the
+    number of companies that failed, so the scheduler can retry the day.
+    """
+    failures = 0
+    
     with app.app_context():
         
-        current_date = datetime.datetime.now()
+        current_date = current_date or datetime.datetime.now()
         current_day = current_date.day
         current_month = current_date.month
         current_year = current_date.year
@@ -27,22 +49,20 @@ def check_and_process_salaries(app):
         
         if not companies:
             logger.info("Nenhuma empresa ativa encontrada para processar despesas fixas.")
-            return
+            return failures
         
         for company in companies:
+            if heartbeat:
+                heartbeat()
+            
             try:
-                settings = Settings.query.filter_by(company_id=company.id).first()
+                settings = config_cache.get_settings(company.id)
                 
                 if not settings:
                     logger.warning(f"Empresa {company.id} ({company.name}) não possui configurações definidas.")
                     continue
                 
-                preferred_day = settings.preferred_salary_expense_day
-                
-                if preferred_day == 99:
-                    salary_day = calendar.monthrange(current_year, current_month)[1]
-                else:
-                    salary_day = min(preferred_day, 28)
+                salary_day = company_salary_day(settings, current_year, current_month)
                 
                 if current_day == salary_day:
                     logger.info(f"Hoje é dia de lançamento de despesas fixas para empresa {company.id} ({company.name})")
@@ -52,351 +72,284 @@ def check_and_process_salaries(app):
                                 f"Configurado para dia {salary_day}, hoje é dia {current_day}.")
             
             except Exception as e:
+                failures += 1
                 logger.error(f"Erro ao processar despesas fixas da empresa {company.id}: {str(e)}")
-
-def process_company_expenses(company, settings, current_date, db):
-    
-    logger.info(f"Processando despesas fixas para empresa {company.id} ({company.name})")
-    
-    current_month = current_date.month
-    current_year = current_date.year
-    
-    monthly_summary = MonthlySummary.query.filter_by(
-        month=current_month, 
-        year=current_year,
-        company_id=company.id
-    ).first()
-    
-    if not monthly_summary:
-        monthly_summary = MonthlySummary(
-            month=current_month,
-            year=current_year,
-            company_id=company.id
-        )
-        db.session.add(monthly_summary)
-        db.session.flush()
-    
-    process_company_salaries(company, current_date, monthly_summary, db)
-    
-    process_company_rent(company, settings, current_date, monthly_summary, db)
-    
-    process_employee_insurance(company, settings, current_date, monthly_summary, db)
-    
-    process_company_insurance(company, settings, current_date, monthly_summary, db)
     
-    process_other_expenses(company, settings, current_date, monthly_summary, db)
-    
-    try:
-        db.session.commit()
-    except Exception as e:
-        db.session.rollback()
-        logger.error(f"Erro ao finalizar processamento de despesas fixas: {str(e)}")
+    return failures
 
-def process_company_salaries(company, current_date, monthly_summary, db):
-    
-    logger.info(f"Processando salários para empresa {company.id} ({company.name})")
-    
-    active_employees = Employee.query.filter_by(company_id=company.id, is_active=True).all()
-    
-    if not active_employees:
-        logger.info(f"Empresa {company.id} não tem funcionários ativos.")
-        return
-    
-    logger.info(f"Encontrados {len(active_employees)} funcionários ativos na empresa {company.id}")
-    
-    current_month = current_date.month
-    current_year = current_date.year
-    
-    salary_count = Expenses.query.filter(
-        and_(
-            Expenses.company_id == company.id,
-            Expenses.description.like("Salário:%"),
-            extract('month', Expenses.create_date) == current_month,
-            extract('year', Expenses.create_date) == current_year
+SALARY_KIND = 'salary'
+
+# Tipo de lançamento automático -> (descrição, campo de Settings com o valor, taxa de IVA, coluna marcada no resumo)
+FIXED_EXPENSES = {
+    'rent': ("Renda mensal do espaço", 'rent_value', 23.0, None),
+    'employee_insurance': ("Seguros dos Empregados", 'employee_insurance_value', 0.0, 'total_employee_insurance'),
+    'company_insurance': ("Seguros da Empresa", 'total_insurance_value', 0.0, None),
+    'other_expenses': ("Outras Despesas Fixas", 'other_expenses', 0.0, None),
+}
+
+SALARY_PREFIX = "Salário: "
+
+POSTING_KEY = ['company_id', 'period', 'kind', 'employee_id']
+
+
+class PendingPosting:
+    """One automated ledger row waiting to be posted, with its run-ledger key and summary deltas."""
+
+    def __init__(self, kind, employee_id, row, deltas):
+        self.kind = kind
+        self.employee_id = employee_id
+        self.row = row
+        self.deltas = deltas
+
+    @property
+    def key(self):
+        return self.kind, self.employee_id
+
+
+def posted_items(company_id, period):
+    """(kind, employee_id) pairs already in the run ledger for the company and period."""
+    rows = db.session.execute(
+        select(AutomatedPosting.kind, AutomatedPosting.employee_id).where(
+            AutomatedPosting.company_id == company_id,
+            AutomatedPosting.period == period
         )
-    ).count()
-    
-    if salary_count >= len(active_employees):
-        logger.info(f"Salários já foram processados para todos os {len(active_employees)} funcionários ativos da empresa {company.id} neste mês.")
-        return
-    
-    newly_added_salaries = 0
-    expenses_created = []  
+    ).all()
+    return {tuple(row) for row in rows}
+
+
+def claim_postings(company_id, period, pending):
+    """
+    Insert the run-ledger rows for `pending` and return the keys this run claimed.
+
+    Keys that already exist are skipped by ON CONFLICT DO NOTHING on the
+    unique (company_id, period, kind, employee_id) index, so two runs racing
+    on the same month never both post an item.
+    """
+    statement = (
+        dialect_insert(AutomatedPosting.__table__)
+        .on_conflict_do_nothing(index_elements=POSTING_KEY)
+        .returning(AutomatedPosting.kind, AutomatedPosting.employee_id)
+    )
+    rows = db.session.execute(statement, [
+        {
+            'company_id': company_id,
+            'period': period,
+            'kind': posting.kind,
+            'employee_id': posting.employee_id,
+            'amount': posting.row['gross_value'],
+        }
+        for posting in pending
+    ]).all()
+    return {tuple(row) for row in rows}
+
+
+def expense_row(company, description, gross_value, iva_rate, iva_value, net_value, create_date):
+    return {
+        'transaction_type': 'despesa',
+        'description': description,
+        'gross_value': gross_value,
+        'iva_rate': iva_rate,
+        'iva_value': iva_value,
+        'net_value': net_value,
+        'user_id': company.user_id,
+        'company_id': company.id,
+        'create_date': create_date,
+    }
+
+
+def build_salary_postings(company, employees, posted, create_date):
+    """Salary postings for the active employees that have none this period."""
+    pending = []
     
-    for employee in active_employees:
-        try:
-            existing_salary = Expenses.query.filter(
-                and_(
-                    Expenses.company_id == company.id,
-                    Expenses.description.like(f"Salário: {employee.name}%"),
-                    extract('month', Expenses.create_date) == current_month,
-                    extract('year', Expenses.create_date) == current_year
-                )
-            ).first()
-            
-            if existing_salary:
-                logger.info(f"Salário já registrado este mês para {employee.name} (ID: {employee.id})")
-                continue  
-            
-            gross_value = employee.gross_salary
-            
-            if employee.extra_payment > 0:
-                gross_value += employee.extra_payment
-                extra_info = f" + {employee.extra_payment}€ ({employee.extra_payment_description})" if employee.extra_payment_description else f" + {employee.extra_payment}€"
-            else:
-                extra_info = ""
-            
-            newly_added_salaries += gross_value
-            
-            description = f"Salário: {employee.name} - {employee.position}{extra_info}"
-            
-            new_expense = Expenses(
-                transaction_type="despesa",
-                description=description,
-                gross_value=gross_value,
-                iva_rate=0,  
-                iva_value=0,
-                net_value=gross_value,
-                user_id=company.user_id,  
-                company_id=company.id
-            )
-            
-            db.session.add(new_expense)
-            expenses_created.append(new_expense)
-            logger.info(f"Criado registro de salário para {employee.name}: {gross_value}€")
-            
-        except Exception as e:
-            logger.error(f"Erro ao processar salário do funcionário {employee.id}: {str(e)}")
+    for employee in employees:
+        if (SALARY_KIND, employee.id) in posted:
+            logger.info(f"Salário já registrado este mês para {employee.name} (ID: {employee.id})")
             continue
-    
-    if newly_added_salaries > 0:
-        monthly_summary.total_employee_salaries += newly_added_salaries
-        monthly_summary.total_costs += newly_added_salaries
         
-        monthly_summary.profit = monthly_summary.total_sales - monthly_summary.total_costs
-        monthly_summary.profit_without_vat = monthly_summary.total_sales_without_vat - monthly_summary.total_costs
+        gross_value = employee.gross_salary
         
-        logger.info(f"Adicionado {newly_added_salaries}€ em novos salários ao resumo mensal.")
-    else:
-        logger.info("Nenhum novo salário para adicionar ao resumo mensal.")
-    
-    try:
-        db.session.commit()
-        if expenses_created:
-            logger.info(f"Processados {len(expenses_created)} novos salários para a empresa {company.id}")
-            logger.info(f"Total de novos salários adicionados: {newly_added_salaries}€")
+        if employee.extra_payment > 0:
+            gross_value += employee.extra_payment
+            extra_info = f" + {employee.extra_payment}€ ({employee.extra_payment_description})" if employee.extra_payment_description else f" + {employee.extra_payment}€"
         else:
-            logger.info("Nenhum novo registro de salário criado.")
-    except Exception as e:
-        db.session.rollback()
-        logger.error(f"Erro ao salvar os registros de salários: {str(e)}")
+            extra_info = ""
+        
+        description = f"{SALARY_PREFIX}{employee.name} - {employee.position}{extra_info}"
+        pending.append(PendingPosting(
+            SALARY_KIND,
+            employee.id,
+            expense_row(company, description, gross_value, 0, 0, gross_value, create_date),
+            combine_deltas(ledger_deltas('despesa', gross_value, gross_value, 0), {'total_employee_salaries': gross_value})
+        ))
+    
+    return pending
 
-def process_company_rent(company, settings, current_date, monthly_summary, db):
-    logger.info(f"Processando renda para empresa {company.id} ({company.name})")
-    
-    if settings.rent_value <= 0:
-        logger.info(f"Empresa {company.id} não tem valor de renda configurado.")
-        return
-    
-    current_month = current_date.month
-    current_year = current_date.year
-    
-    existing_rent = Expenses.query.filter(
-        and_(
-            Expenses.company_id == company.id,
-            Expenses.description == "Renda mensal do espaço",
-            extract('month', Expenses.create_date) == current_month,
-            extract('year', Expenses.create_date) == current_year
-        )
-    ).first()
-    
-    if existing_rent:
-        logger.info(f"Renda já registrada este mês para a empresa {company.id}")
-        return
-    
-    rent_value = settings.rent_value
-    iva_rate = 23.0  # Taxa de IVA de 23% para renda
-    
-    # Cálculo correto do IVA e valor líquido
-    net_value = round(rent_value / 1.23, 2)  # Valor líquido (sem IVA)
-    iva_value = round(rent_value - net_value, 2)  # Valor do IVA
-    
-    new_expense = Expenses(
-        transaction_type="despesa",
-        description="Renda mensal do espaço",
-        gross_value=rent_value,
-        iva_rate=iva_rate,
-        iva_value=iva_value,
-        net_value=net_value,
-        user_id=company.user_id,  
-        company_id=company.id
-    )
-    
-    db.session.add(new_expense)
-    
-    # Atualizar os totais do resumo mensal
-    monthly_summary.total_costs += rent_value
-    monthly_summary.total_costs_without_vat += net_value
-    monthly_summary.total_vat -= iva_value  # Subtrair IVA (pois é uma despesa)
-    
-    monthly_summary.profit = monthly_summary.total_sales - monthly_summary.total_costs
-    monthly_summary.profit_without_vat = monthly_summary.total_sales_without_vat - monthly_summary.total_costs_without_vat
-    
-    try:
-        db.session.commit()
-        logger.info(f"Registrada renda mensal para empresa {company.id}: {rent_value}€ (IVA: {iva_value}€)")
-    except Exception as e:
-        db.session.rollback()
-        logger.error(f"Erro ao registrar renda mensal: {str(e)}")
 
-def process_employee_insurance(company, settings, current_date, monthly_summary, db):
-    logger.info(f"Processando seguros dos empregados para empresa {company.id} ({company.name})")
-    
-    if settings.employee_insurance_value <= 0:
-        logger.info(f"Empresa {company.id} não tem valor de seguros dos empregados configurado.")
-        return
-    
-    current_month = current_date.month
-    current_year = current_date.year
-    
-    existing_insurance = Expenses.query.filter(
-        and_(
-            Expenses.company_id == company.id,
-            Expenses.description == "Seguros dos Empregados",
-            extract('month', Expenses.create_date) == current_month,
-            extract('year', Expenses.create_date) == current_year
-        )
-    ).first()
-    
-    if existing_insurance:
-        logger.info(f"Seguros dos empregados já registrados este mês para a empresa {company.id}")
-        return
-    
-    insurance_value = settings.employee_insurance_value
-    
-    new_expense = Expenses(
-        transaction_type="despesa",
-        description="Seguros dos Empregados",
-        gross_value=insurance_value,
-        iva_rate=0,
-        iva_value=0,
-        net_value=insurance_value,
-        user_id=company.user_id,
-        company_id=company.id
-    )
-    
-    db.session.add(new_expense)
-    
-    monthly_summary.total_costs += insurance_value
-    monthly_summary.total_employee_insurance += insurance_value
+def build_fixed_expense_postings(company, settings, posted, create_date):
+    """Rent, insurance and other fixed-expense postings missing this period."""
+    pending = []
     
-    monthly_summary.profit = monthly_summary.total_sales - monthly_summary.total_costs
-    monthly_summary.profit_without_vat = monthly_summary.total_sales_without_vat - monthly_summary.total_costs
-    
-    try:
-        db.session.commit()
-        logger.info(f"Registrados seguros dos empregados para empresa {company.id}: {insurance_value}€")
-    except Exception as e:
-        db.session.rollback()
-        logger.error(f"Erro ao registrar seguros dos empregados: {str(e)}")
+    for kind, (description, settings_field, iva_rate, tagged_column) in FIXED_EXPENSES.items():
+        value = getattr(settings, settings_field) or 0
+        
+        if value <= 0:
+            logger.info(f"Empresa {company.id} não tem valor configurado para '{description}'.")
+            continue
+        
+        if (kind, 0) in posted:
+            logger.info(f"'{description}' já registrado este mês para a empresa {company.id}")
+            continue
+        
+        if iva_rate:
+            net_value = round(value / (1 + iva_rate / 100), 2)
+            iva_value = round(value - net_value, 2)
+        else:
+            net_value, iva_value = value, 0
+        
+        deltas = ledger_deltas('despesa', value, net_value, iva_value)
+        if tagged_column:
+            deltas = combine_deltas(deltas, {tagged_column: value})
+        
+        pending.append(PendingPosting(
+            kind,
+            0,
+            expense_row(company, description, value, iva_rate, iva_value, net_value, create_date),
+            deltas
+        ))
+    
+    return pending
 
-def process_company_insurance(company, settings, current_date, monthly_summary, db):
-    logger.info(f"Processando seguros da empresa {company.id} ({company.name})")
-    
-    if settings.total_insurance_value <= 0:
-        logger.info(f"Empresa {company.id} não tem valor de seguros configurado.")
-        return
+
+def process_company_expenses(company, settings, current_date, db):
+    """
+    Post the period's missing salaries and fixed expenses of one company in a single transaction.
+
+    The run ledger (automated_posting) says what is already posted; the
+    missing items are claimed in it, their rows bulk-inserted, and the
+    MonthlySummary receives one combined delta. Safe to re-run.
+    """
+    logger.info(f"Processando despesas fixas para empresa {company.id} ({company.name})")
     
     current_month = current_date.month
     current_year = current_date.year
+    period = format_month(current_year, current_month)
     
-    # CORREÇÃO AQUI: usar a mesma descrição na verificação e na criação
-    existing_insurance = Expenses.query.filter(
-        and_(
-            Expenses.company_id == company.id,
-            Expenses.description == "Seguros da Empresa",  # CORRIGIDO
-            extract('month', Expenses.create_date) == current_month,
-            extract('year', Expenses.create_date) == current_year
-        )
-    ).first()
-    
-    if existing_insurance:
-        logger.info(f"Seguros da empresa já registrados este mês para a empresa {company.id}")
-        return
-    
-    insurance_value = settings.total_insurance_value
-    
-    new_expense = Expenses(
-        transaction_type="despesa",
-        description="Seguros da Empresa",
-        gross_value=insurance_value,
-        iva_rate=0,
-        iva_value=0,
-        net_value=insurance_value,
-        user_id=company.user_id,
-        company_id=company.id
-    )
+    posted = posted_items(company.id, period)
+    active_employees = Employee.query.filter_by(company_id=company.id, is_active=True).all()
     
-    db.session.add(new_expense)
+    logger.info(f"Encontrados {len(active_employees)} funcionários ativos na empresa {company.id}")
     
-    monthly_summary.total_costs += insurance_value
+    pending = build_salary_postings(company, active_employees, posted, current_date)
+    pending += build_fixed_expense_postings(company, settings, posted, current_date)
     
-    monthly_summary.profit = monthly_summary.total_sales - monthly_summary.total_costs
-    monthly_summary.profit_without_vat = monthly_summary.total_sales_without_vat - monthly_summary.total_costs
+    if not pending:
+        logger.info(f"Despesas fixas já processadas este mês para a empresa {company.id}")
+        return 0
     
     try:
+        claimed = claim_postings(company.id, period, pending)
+        pending = [posting for posting in pending if posting.key in claimed]
+        
+        if pending:
+            db.session.execute(Expenses.__table__.insert(), [posting.row for posting in pending])
+            upsert_summary_delta(
+                MonthlySummary, company.id, current_year, current_month,
+                combine_deltas(*[posting.deltas for posting in pending])
+            )
         db.session.commit()
-        logger.info(f"Registrados seguros da empresa {company.id}: {insurance_value}€")
     except Exception as e:
         db.session.rollback()
-        logger.error(f"Erro ao registrar seguros da empresa: {str(e)}")
-
-def process_other_expenses(company, settings, current_date, monthly_summary, db):
-    logger.info(f"Processando outras despesas para empresa {company.id} ({company.name})")
-    
-    if settings.other_expenses <= 0:
-        logger.info(f"Empresa {company.id} não tem valor de outras despesas configurado.")
-        return
-    
-    current_month = current_date.month
-    current_year = current_date.year
-    
-    existing_expense = Expenses.query.filter(
-        and_(
-            Expenses.company_id == company.id,
-            Expenses.description == "Outras Despesas Fixas",
-            extract('month', Expenses.create_date) == current_month,
-            extract('year', Expenses.create_date) == current_year
-        )
-    ).first()
-    
-    if existing_expense:
-        logger.info(f"Outras despesas fixas já registradas este mês para a empresa {company.id}")
-        return
+        logger.error(f"Erro ao registrar despesas fixas da empresa {company.id}: {str(e)}")
+        raise
     
-    other_value = settings.other_expenses
-    
-    new_expense = Expenses(
-        transaction_type="despesa",
-        description="Outras Despesas Fixas",
-        gross_value=other_value,
-        iva_rate=0,
-        iva_value=0,
-        net_value=other_value,
-        user_id=company.user_id,
-        company_id=company.id
-    )
-    
-    db.session.add(new_expense)
-    
-    monthly_summary.total_costs += other_value
+    salaries = sum(1 for posting in pending if posting.kind == SALARY_KIND)
+    logger.info(f"Registrados {salaries} salários e {len(pending) - salaries} despesas fixas para a empresa {company.id}")
+    return len(pending)
+
+
+def post_company_periods(app, company_ids, periods, run_time, now):
+    """
+    Worker task: post every period of one batch of companies.
+
+    Each period is posted as of the company's salary day in that month, so
+    rows and summaries land in the right month. Days still in the future are
+    skipped. Returns (rows posted, failed company-months).
+    """
+    posted = failures = 0
     
-    monthly_summary.profit = monthly_summary.total_sales - monthly_summary.total_costs
-    monthly_summary.profit_without_vat = monthly_summary.total_sales_without_vat - monthly_summary.total_costs
+    with app.app_context():
+        companies = Company.query.filter(Company.id.in_(company_ids)).order_by(Company.id).all()
+        settings_by_company = {
+            settings.company_id: settings
+            for settings in Settings.query.filter(Settings.company_id.in_(company_ids))
+        }
+        
+        for company in companies:
+            settings = settings_by_company.get(company.id)
+            
+            if not settings:
+                logger.warning(f"Empresa {company.id} ({company.name}) não possui configurações definidas.")
+                continue
+            
+            for year, month in periods:
+                run_day = datetime.date(year, month, company_salary_day(settings, year, month))
+                run_at = datetime.datetime.combine(run_day, run_time)
+                
+                if run_at > now:
+                    continue
+                
+                try:
+                    posted += process_company_expenses(company, settings, run_at, db)
+                except Exception as e:
+                    failures += 1
+                    logger.error(f"Erro ao lançar despesas fixas da empresa {company.id} ({company.name}) "
+                                 f"em {month:02d}/{year}: {str(e)}")
+    
+    return posted, failures
+
+
+def backfill_fixed_expenses(app, start, end, company_id=None, workers=4, batch_size=50, now=None):
+    """
+    Post the missing salaries and fixed expenses of every month from `start` to `end` (inclusive).
+
+    Active companies (or only `company_id`) are split into batches of
+    `batch_size` and handed to a pool of `workers` threads; on SQLite, which
+    takes one writer at a time, the pool is capped at one thread. The run
+    ledger makes this safe to repeat and to run alongside the scheduler.
+    Returns a dict with the counts, the workers used and the elapsed time.
+    """
+    now = now or datetime.datetime.now()
+    run_time = datetime.datetime.strptime(app.config.get('SCHEDULER_RUN_TIME', '06:00'), '%H:%M').time()
+    periods = [shift_month(start[0], start[1], offset) for offset in range(months_between(start, end))]
     
-    try:
-        db.session.commit()
-        logger.info(f"Registradas outras despesas fixas para empresa {company.id}: {other_value}€")
-    except Exception as e:
-        db.session.rollback()
-        logger.error(f"Erro ao registrar outras despesas fixas: {str(e)}")
\ No newline at end of file
+    with app.app_context():
+        statement = select(Company.id).order_by(Company.id)
+        if company_id:
+            statement = statement.where(Company.id == company_id)
+        else:
+            statement = statement.where(Company.is_active == True)
+        company_ids = db.session.execute(statement).scalars().all()
+        
+        # O SQLite só aceita um escritor de cada vez: mais threads só disputam o lock
+        if db.engine.dialect.name == 'sqlite' and workers > 1:
+            logger.info(f"SQLite: lançamento retroativo com 1 worker em vez de {workers}.")
+            workers = 1
+    
+    batches = [company_ids[index:index + batch_size] for index in range(0, len(company_ids), batch_size)]
+    
+    logger.info(f"Lançamento retroativo: {len(company_ids)} empresas, {len(periods)} meses, "
+                f"{len(batches)} lotes, {workers} workers")
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda batch: post_company_periods(app, batch, periods, run_time, now), batches))
+    elapsed = time.perf_counter() - started
+    
+    return {
+        'companies': len(company_ids),
+        'periods': len(periods),
+        'rows': sum(posted for posted, _ in results),
+        'failures': sum(failures for _, failures in results),
+        'workers': workers,
+        'seconds': elapsed,
+    }
@@ -0,0 +1,71 @@
+from operator import attrgetter
+from sqlalchemy import select
+from instance.base import Company, Employee, Expenses, SimpleExpenses
+
+
+def format_datetime(value):
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+class Serializer:
+    """
+    Declarative mapping from one model's columns to a JSON-ready dict.
+
+    dump() reads attributes, so it accepts ORM objects and Core rows alike.
+    dump_rows() takes rows selected with select() (columns in `fields`
+    order, extra trailing columns ignored) and zips them by position, which
+    lets list endpoints skip hydrating ORM objects altogether.
+    """
+
+    def __init__(self, model, fields, formatters=None):
+        self.model = model
+        self.fields = tuple(fields)
+        self.columns = tuple(getattr(model, field) for field in self.fields)
+        self.formatters = formatters or {}
+        self._values = attrgetter(*self.fields)
+
+    def select(self, *extra_columns):
+        return select(*self.columns, *extra_columns)
+
+    def _format(self, data):
+        for field, formatter in self.formatters.items():
+            if data[field] is not None:
+                data[field] = formatter(data[field])
+        return data
+
+    def dump(self, obj):
+        return self._format(dict(zip(self.fields, self._values(obj))))
+
+    def dump_rows(self, rows):
+        fields = self.fields
+        if not self.formatters:
+            return [dict(zip(fields, row)) for row in rows]
+        return [self._format(dict(zip(fields, row))) for row in rows]
+
+
+SERIALIZERS = {}
+
+
+def register(name, model, fields, **formatters):
+    SERIALIZERS[name] = Serializer(model, fields, formatters)
+    return SERIALIZERS[name]
+
+
+def get_serializer(name):
+    return SERIALIZERS[name]
+
+
+EXPENSE_FIELDS = ('id', 'transaction_type', 'description', 'gross_value', 'iva_rate', 'iva_value', 'net_value')
+
+register('employee', Employee, (
+    'id', 'name', 'position', 'gross_salary', 'social_security_rate', 'employer_social_security_rate',
+    'irs_rate', 'extra_payment', 'extra_payment_description', 'is_active', 'company_id'
+))
+register('expense', Expenses, EXPENSE_FIELDS + ('company_id',))
+register('simple_expense', SimpleExpenses, EXPENSE_FIELDS + ('company_id',))
+register('transaction', Expenses, EXPENSE_FIELDS + ('create_date',), create_date=format_datetime)
+register('company', Company, (
+    'id', 'name', 'location', 'relationship_type', 'tax_id', 'phone', 'email', 'contact_person', 'notes', 'is_active'
+))
+# Lista de empresas: sem notes (TEXT) nem contactos
+register('company_directory', Company, ('id', 'name', 'location', 'relationship_type', 'tax_id', 'is_active'))
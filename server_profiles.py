@@ -0,0 +1,120 @@
+import multiprocessing
+import os
+
+# Ligações extra além das de pedidos: o agendador (day_checker) e a thread de backfill
+BACKGROUND_CONNECTIONS = 2
+
+# Perfis de workers do gunicorn (GUNICORN_PROFILE), partilhados por gunicorn_config.py e
+# config.py para que o pool de ligações de cada worker corresponda aos pedidos em simultâneo
+PROFILES = {
+    # Um pedido de cada vez por processo
+    'sync': {
+        'worker_class': 'sync',
+        'workers': lambda cpus: cpus * 2 + 1,
+        'threads': 1,
+        'preload': True,
+    },
+    # Threads por processo: menos processos, E/S (SQLite, Redis) sem bloquear o worker
+    'gthread': {
+        'worker_class': 'gthread',
+        'workers': lambda cpus: cpus + 1,
+        'threads': 4,
+        'preload': True,
+    },
+    # Greenlets: muitas ligações lentas por processo; requer o pacote gevent.
+    # Sem preload: o gevent tem de fazer monkey-patching antes de a aplicação ser importada.
+    'gevent': {
+        'worker_class': 'gevent',
+        'workers': lambda cpus: cpus,
+        'threads': 1,
+        'worker_connections': 200,
+        'pool_size': 10,
+        'preload': False,
+    },
+}
+
+DEFAULT_PROFILE = 'sync'
+
+
+def profile_name():
+    name = os.environ.get('GUNICORN_PROFILE', DEFAULT_PROFILE).lower()
+    if name not in PROFILES:
+        raise ValueError(f"GUNICORN_PROFILE deve ser um de: {', '.join(PROFILES)} (recebido '{name}')")
+    return name
+
+
+def worker_settings(name=None):
+    """Worker class, workers, threads and worker_connections of a profile; GUNICORN_WORKERS/THREADS override."""
+    profile = PROFILES[name or profile_name()]
+    cpus = multiprocessing.cpu_count()
+    return {
+        'worker_class': profile['worker_class'],
+        'workers': int(os.environ.get('GUNICORN_WORKERS') or profile['workers'](cpus)),
+        'threads': int(os.environ.get('GUNICORN_THREADS') or profile['threads']),
+        'worker_connections': profile.get('worker_connections', 1000),
+    }
+
+
+def preload_enabled(name=None):
+    """
+    Whether gunicorn should import the app once in the master (preload_app).
+
+    Workers are then forked with the app already loaded, sharing its memory
+    copy-on-write and booting without re-importing it. GUNICORN_PRELOAD
+    overrides the profile default, except for gevent.
+    """
+    name = name or profile_name()
+    value = os.environ.get('GUNICORN_PRELOAD', '').strip().lower()
+    if not value:
+        return PROFILES[name]['preload']
+
+    preload = value in ('true', '1', 'yes')
+    if preload and PROFILES[name]['worker_class'] == 'gevent':
+        raise ValueError("GUNICORN_PRELOAD não é compatível com o perfil gevent (monkey-patching depois do import)")
+    return preload
+
+
+def engine_options(database_uri, name=None, busy_timeout=15):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for a profile.
+
+    Each worker gets a pool sized to the requests it serves at once, plus
+    the background threads, with pool_pre_ping so connections dropped by the
+    server are replaced. For SQLite, check_same_thread is off (the pool hands
+    connections between threads) and `busy_timeout` seconds is how long a
+    connection waits for a write lock before "database is locked". In-memory
+    SQLite keeps Flask-SQLAlchemy's single shared connection.
+    """
+    name = name or profile_name()
+    if database_uri.startswith('sqlite') and (':memory:' in database_uri or database_uri.rstrip('/') == 'sqlite:'):
+        return {}
+
+    settings = worker_settings(name)
+    concurrency = PROFILES[name].get('pool_size', settings['threads'])
+    options = {
+        'pool_size': concurrency + BACKGROUND_CONNECTIONS,
+        'max_overflow': concurrency,
+        'pool_timeout': 30,
+        'pool_pre_ping': True,
+    }
+
+    if database_uri.startswith('sqlite'):
+        options['connect_args'] = {'check_same_thread': False, 'timeout': busy_timeout}
+    else:
+        options['pool_recycle'] = 1800
+
+    return options
+
+
+def dispose_engines(app):
+    """
+    Drop the SQLAlchemy pools inherited from the gunicorn master after fork.
+
+    close=False leaves the parent's connections open for the parent: the
+    child only forgets them and opens its own on first use.
+    """
+    from extensions import db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
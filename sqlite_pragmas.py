@@ -0,0 +1,86 @@
+import logging
+from sqlalchemy import event, text
+
+logger = logging.getLogger('sqlite_pragmas')
+logger.setLevel(logging.INFO)
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+handler = logging.StreamHandler()
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+
+JOURNAL_MODES = {'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'}
+SYNCHRONOUS_MODES = {'OFF', 'NORMAL', 'FULL', 'EXTRA'}
+CHECKPOINT_MODES = {'PASSIVE', 'FULL', 'RESTART', 'TRUNCATE'}
+
+
+def sqlite_pragmas(config):
+    """
+    PRAGMA statements for each new SQLite connection, from the SQLITE_* settings.
+
+    busy_timeout comes first so that switching the journal mode waits for
+    other processes' locks instead of failing. wal_autocheckpoint and
+    journal_size_limit are the checkpoint policy: SQLite copies the WAL back
+    into the database every N pages and truncates the file to the limit.
+    """
+    journal_mode = config.get('SQLITE_JOURNAL_MODE', 'WAL').upper()
+    synchronous = config.get('SQLITE_SYNCHRONOUS', 'NORMAL').upper()
+    if journal_mode not in JOURNAL_MODES:
+        raise ValueError(f"SQLITE_JOURNAL_MODE inválido: {journal_mode}")
+    if synchronous not in SYNCHRONOUS_MODES:
+        raise ValueError(f"SQLITE_SYNCHRONOUS inválido: {synchronous}")
+
+    pragmas = [
+        f"PRAGMA busy_timeout = {int(config.get('SQLITE_BUSY_TIMEOUT', 15) * 1000)}",
+        f"PRAGMA journal_mode = {journal_mode}",
+        f"PRAGMA synchronous = {synchronous}",
+        # Negativo = KiB em vez de páginas
+        f"PRAGMA cache_size = -{int(config.get('SQLITE_CACHE_SIZE_KB', 20000))}",
+        f"PRAGMA mmap_size = {int(config.get('SQLITE_MMAP_SIZE', 268435456))}",
+    ]
+    if journal_mode == 'WAL':
+        pragmas += [
+            f"PRAGMA wal_autocheckpoint = {int(config.get('SQLITE_WAL_AUTOCHECKPOINT', 1000))}",
+            f"PRAGMA journal_size_limit = {int(config.get('SQLITE_JOURNAL_SIZE_LIMIT', 67108864))}",
+        ]
+    return pragmas
+
+
+def is_file_database(engine):
+    return engine.dialect.name == 'sqlite' and engine.url.database not in (None, '', ':memory:')
+
+
+def configure_sqlite(engine, config):
+    """Run sqlite_pragmas(config) on every connection `engine` opens; other databases are left alone."""
+    if not is_file_database(engine):
+        return False
+
+    pragmas = sqlite_pragmas(config)
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    logger.info(f"SQLite: {'; '.join(pragma.replace('PRAGMA ', '') for pragma in pragmas)}")
+    return True
+
+
+def checkpoint(engine, mode='PASSIVE'):
+    """
+    Run `PRAGMA wal_checkpoint(mode)` and return (busy, wal_pages, checkpointed_pages).
+
+    PASSIVE copies what it can without waiting for readers; TRUNCATE waits
+    for them and then empties the WAL file, which is what backups want.
+    """
+    mode = mode.upper()
+    if mode not in CHECKPOINT_MODES:
+        raise ValueError(f"Modo de checkpoint inválido: {mode}")
+
+    with engine.connect() as connection:
+        busy, wal_pages, checkpointed = connection.execute(text(f"PRAGMA wal_checkpoint({mode})")).one()
+        connection.commit()
+    return busy, wal_pages, checkpointed
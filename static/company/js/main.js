@@ -6,8 +6,14 @@ const companyForm = document.getElementById("companyForm")
 const companiesGrid = document.querySelector(".companies-grid")
 const submitBtn = document.querySelector(".btn-primary")
 const modalTitle = document.querySelector(".modal-title")
+const companySearch = document.getElementById("companySearch")
+const loadMoreBtn = document.getElementById("loadMoreCompanies")
 
 let isEditing = false;
+let isLoadingCompanies = false;
+let searchTimeout = null;
+// Incrementado a cada nova pesquisa, para ignorar respostas de pesquisas anteriores
+let companyListVersion = 0;
 
 function openModal() {
   modalOverlay.classList.add("active")
@@ -184,23 +190,116 @@ function showErrorMessage(message) {
   }, 3000)
 }
 
-document.addEventListener('DOMContentLoaded', function() {
-  document.querySelectorAll(".company-card").forEach((card) => {
-    card.addEventListener("click", function(e) {
-      if (!e.target.closest('.edit-btn')) {
-        selectCompany(this);
+companiesGrid.addEventListener("click", (e) => {
+  const card = e.target.closest(".company-card")
+  if (!card) return
+
+  if (e.target.closest(".edit-btn")) {
+    editCompany(e, card.dataset.company)
+  } else {
+    selectCompany(card)
+  }
+})
+
+function createCompanyCard(company) {
+  const card = document.createElement("div")
+  card.className = "company-card"
+  card.dataset.company = company.id
+  card.innerHTML = `
+    <div class="company-icon">
+      <svg width="24" height="24" viewBox="0 0 24 24" fill="none">
+        <path d="M12 2L2 7L12 12L22 7L12 2Z" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+        <path d="M2 17L12 22L22 17" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+        <path d="M2 12L12 17L22 12" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"/>
+      </svg>
+    </div>
+    <div class="company-info">
+      <h3 class="company-name"></h3>
+      <p class="company-description"></p>
+    </div>
+    <button class="edit-btn">
+      <svg class="icon" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
+        <path d="M11 4H4a2 2 0 0 0-2 2v14a2 2 0 0 0 2 2h14a2 2 0 0 0 2-2v-7"/>
+        <path d="m18.5 2.5 3 3L12 15l-4 1 1-4 9.5-9.5z"/>
+      </svg>
+    </button>
+  `
+  card.querySelector(".company-name").textContent = company.name
+  card.querySelector(".company-description").textContent = `NIF: ${company.tax_id || ''} • ${company.location || ''}`
+  return card
+}
+
+function showEmptyState() {
+  companiesGrid.innerHTML = `
+    <div class="empty-state">
+      <p>Nenhuma empresa encontrada</p>
+    </div>
+  `
+}
+
+// Carrega a página seguinte (ou a primeira, com reset) e acrescenta os cartões à lista
+function loadCompanies(reset) {
+  if (isLoadingCompanies && !reset) return
+
+  const cursor = reset ? "" : loadMoreBtn.dataset.nextCursor
+  if (!reset && !cursor) return
+
+  const version = reset ? ++companyListVersion : companyListVersion
+  const params = new URLSearchParams({ q: companySearch.value.trim() })
+  if (cursor) {
+    params.set("after", cursor)
+  }
+
+  isLoadingCompanies = true
+  fetch(`/get-companies?${params.toString()}`)
+    .then(response => response.json())
+    .then(data => {
+      if (version !== companyListVersion) return
+      if (!data.success) {
+        showErrorMessage(data.message || "Erro ao carregar empresas")
+        return
+      }
+
+      if (reset) {
+        companiesGrid.innerHTML = ""
+      }
+
+      const fragment = document.createDocumentFragment()
+      data.companies.forEach(company => fragment.appendChild(createCompanyCard(company)))
+      companiesGrid.appendChild(fragment)
+
+      if (!companiesGrid.querySelector(".company-card")) {
+        showEmptyState()
+      }
+
+      loadMoreBtn.dataset.nextCursor = data.next_cursor || ""
+      loadMoreBtn.hidden = !data.next_cursor
+    })
+    .catch(error => {
+      showErrorMessage("Erro ao carregar empresas: " + error)
+    })
+    .finally(() => {
+      if (version === companyListVersion) {
+        isLoadingCompanies = false
       }
-    });
-  });
-
-  document.querySelectorAll(".edit-btn").forEach((btn) => {
-    btn.addEventListener("click", function(e) {
-      e.stopPropagation(); 
-      const companyId = this.closest('.company-card').dataset.company;
-      editCompany(e, companyId);
-    });
-  });
-});
+    })
+}
+
+companySearch.addEventListener("input", () => {
+  clearTimeout(searchTimeout)
+  searchTimeout = setTimeout(() => loadCompanies(true), 250)
+})
+
+loadMoreBtn.addEventListener("click", () => loadCompanies(false))
+
+if ("IntersectionObserver" in window) {
+  const observer = new IntersectionObserver((entries) => {
+    if (entries.some(entry => entry.isIntersecting) && !loadMoreBtn.hidden) {
+      loadCompanies(false)
+    }
+  }, { rootMargin: "200px" })
+  observer.observe(loadMoreBtn)
+}
 
 if ("ontouchstart" in window) {
   document.querySelectorAll(".company-card, .add-company-btn").forEach((element) => {
@@ -5,7 +5,9 @@ let currentTransactionType = "";
 let currentPage = 1;
 let totalPages = 1;
 let transactionsPerPage = 10;
-let allTransactions = [];
+// Cursor de cada página já visitada no modal de transações (a página 1 não tem cursor)
+let transactionPageCursors = [null];
+let nextTransactionsCursor = null;
 let profitChart = null;
 let vatAnalysisChart = null;
 let availableMonths = [];
@@ -14,6 +16,10 @@ let vatMonthlyData = [];
 // Variáveis para o modal de funcionários
 let employeeChart = null;
 let employeeData = [];
+// Última resposta (ETag + JSON) de cada URL, para pedidos condicionais
+const jsonResponseCache = new Map();
+// Dados de /api/dashboard do mês mostrado: cartões, gráficos, configurações e colaboradores
+let dashboardData = null;
 
 const months = [
   "Janeiro",
@@ -31,10 +37,21 @@ const months = [
 ];
 
 document.addEventListener("DOMContentLoaded", function () {
+  const initialData = readInitialDashboardData();
+  if (initialData) {
+    // O mês vem do servidor, para não divergir do relógio do browser na viragem do mês
+    currentMonth = initialData.month - 1;
+    currentYear = initialData.year;
+  }
+
   initializeMonthSelector();
   initializeChartSelector();
-  loadFinancialData();
-  loadChartData("bar");
+
+  if (initialData) {
+    showDashboard(initialData);
+  } else {
+    loadDashboard();
+  }
 
   if (document.getElementById("prevPage")) {
     document
@@ -88,10 +105,7 @@ function initializeMonthSelector() {
       currentMonth--;
     }
     updateMonthDisplay();
-    loadFinancialData();
-
-    const chartType = document.getElementById("chartType").value;
-    loadChartData(chartType);
+    loadDashboard();
   });
 
   nextBtn.addEventListener("click", () => {
@@ -102,10 +116,7 @@ function initializeMonthSelector() {
       currentMonth++;
     }
     updateMonthDisplay();
-    loadFinancialData();
-
-    const chartType = document.getElementById("chartType").value;
-    loadChartData(chartType);
+    loadDashboard();
   });
 }
 
@@ -114,34 +125,69 @@ function updateMonthDisplay() {
   currentMonthElement.textContent = `${months[currentMonth]} ${currentYear}`;
 }
 
-function loadFinancialData() {
+// Um só pedido por mês: cartões, gráficos de barras/linha, configurações e colaboradores
+function loadDashboard() {
   const company_id = getCompanyId();
 
   showLoading(true);
+  showChartLoading(true);
 
-  fetch(
-    `/api/financial-summary?company_id=${company_id}&month=${
-      currentMonth + 1
-    }&year=${currentYear}`
+  fetchJSON(
+    `/api/dashboard/${company_id}?month=${currentMonth + 1}&year=${currentYear}`
   )
-    .then((response) => response.json())
     .then((data) => {
       if (data.success) {
-        updateFinancialCards(data.summary);
+        showDashboard(data.dashboard);
       } else {
         console.error("Erro ao carregar dados:", data.message);
         resetFinancialCards();
+        showChartError();
       }
     })
     .catch((error) => {
       console.error("Erro na requisição:", error);
       resetFinancialCards();
+      showChartError();
     })
     .finally(() => {
       showLoading(false);
+      showChartLoading(false);
     });
 }
 
+function showDashboard(data) {
+  const chartType = document.getElementById("chartType").value;
+
+  dashboardData = data;
+  updateFinancialCards(data.summary);
+  createChart(chartType, data.charts[chartType]);
+}
+
+// Dados do mês atual embutidos pelo servidor em dashboard_viewer.html, se existirem
+function readInitialDashboardData() {
+  const element = document.getElementById("initialDashboardData");
+  if (!element) return null;
+
+  try {
+    return JSON.parse(element.textContent);
+  } catch (error) {
+    console.error("Erro ao ler dados iniciais do dashboard:", error);
+    return null;
+  }
+}
+
+// dashboardData, se corresponder ao mês mostrado
+function currentDashboardData() {
+  if (
+    dashboardData &&
+    dashboardData.month === currentMonth + 1 &&
+    dashboardData.year === currentYear
+  ) {
+    return dashboardData;
+  }
+  return null;
+}
+
 function getCompanyId() {
   const urlParams = new URLSearchParams(window.location.search);
   const pathParts = window.location.pathname.split("/");
@@ -155,6 +201,28 @@ function getCompanyId() {
   return companyId;
 }
 
+// GET de JSON com If-None-Match: um 304 reutiliza a resposta já recebida para o mesmo URL
+function fetchJSON(url) {
+  const cached = jsonResponseCache.get(url);
+  const headers = cached ? { "If-None-Match": cached.etag } : {};
+
+  return fetch(url, { headers }).then((response) => {
+    if (response.status === 304 && cached) {
+      return cached.data;
+    }
+
+    return response.json().then((data) => {
+      const etag = response.headers.get("ETag");
+      if (response.ok && etag) {
+        jsonResponseCache.set(url, { etag, data });
+      } else {
+        jsonResponseCache.delete(url);
+      }
+      return data;
+    });
+  });
+}
+
 function showLoading(isLoading) {
   const cards = document.querySelectorAll(".card-value, .card-change");
   if (isLoading) {
@@ -255,15 +323,20 @@ function initializeChartSelector() {
 
 function loadChartData(chartType) {
   const company_id = getCompanyId();
+  const dashboard = currentDashboardData();
+
+  if (dashboard && dashboard.charts[chartType]) {
+    createChart(chartType, dashboard.charts[chartType]);
+    return;
+  }
 
   showChartLoading(true);
 
-  fetch(
+  fetchJSON(
     `/api/chart-data?company_id=${company_id}&type=${chartType}&month=${
       currentMonth + 1
     }&year=${currentYear}`
   )
-    .then((response) => response.json())
     .then((data) => {
       if (data.success) {
         createChart(chartType, data.chartData);
@@ -402,26 +475,40 @@ function closeModal() {
 }
 
 function loadTransactions(transactionType) {
+  currentPage = 1;
+  transactionPageCursors = [null];
+  fetchTransactionsPage(transactionType);
+}
+
+function fetchTransactionsPage(transactionType) {
   const company_id = getCompanyId();
+  const cursor = transactionPageCursors[currentPage - 1];
 
   document.getElementById("loadingIndicator").style.display = "flex";
   document.getElementById("noTransactionsMessage").style.display = "none";
   document.getElementById("transactionsTableBody").innerHTML = "";
   document.getElementById("paginationContainer").style.display = "none";
 
-  fetch(
-    `/api/transactions?company_id=${company_id}&month=${
-      currentMonth + 1
-    }&year=${currentYear}&type=${transactionType}`
-  )
+  const params = new URLSearchParams({
+    company_id: company_id,
+    month: currentMonth + 1,
+    year: currentYear,
+    type: transactionType,
+    limit: transactionsPerPage,
+  });
+  if (cursor) params.set("cursor", cursor);
+
+  fetch(`/api/transactions?${params.toString()}`)
     .then((response) => response.json())
     .then((data) => {
       if (data.success && data.transactions && data.transactions.length > 0) {
-        allTransactions = data.transactions;
-
-        totalPages = Math.ceil(allTransactions.length / transactionsPerPage);
+        nextTransactionsCursor = data.next_cursor;
+        totalPages =
+          data.total !== null
+            ? Math.ceil(data.total / transactionsPerPage)
+            : null;
 
-        renderTransactionsTable();
+        renderTransactionsTable(data.transactions);
         renderPagination();
 
         document.getElementById("paginationContainer").style.display = "flex";
@@ -441,19 +528,11 @@ function loadTransactions(transactionType) {
     });
 }
 
-function renderTransactionsTable() {
+function renderTransactionsTable(transactions) {
   const tableBody = document.getElementById("transactionsTableBody");
   tableBody.innerHTML = "";
 
-  const startIndex = (currentPage - 1) * transactionsPerPage;
-  const endIndex = Math.min(
-    startIndex + transactionsPerPage,
-    allTransactions.length
-  );
-
-  const transactionsForPage = allTransactions.slice(startIndex, endIndex);
-
-  transactionsForPage.forEach((transaction) => {
+  transactions.forEach((transaction) => {
     const row = document.createElement("tr");
     row.className =
       transaction.transaction_type.toLowerCase() === "ganho"
@@ -486,76 +565,28 @@ function renderPagination() {
   pageNumbers.innerHTML = "";
 
   document.getElementById("prevPage").disabled = currentPage === 1;
-  document.getElementById("nextPage").disabled = currentPage === totalPages;
-
-  if (totalPages <= 7) {
-    for (let i = 1; i <= totalPages; i++) {
-      pageNumbers.appendChild(createPageNumberButton(i));
-    }
-    return;
-  }
-
-  if (currentPage <= 3) {
-    for (let i = 1; i <= 5; i++) {
-      pageNumbers.appendChild(createPageNumberButton(i));
-    }
-    pageNumbers.appendChild(createEllipsis());
-    pageNumbers.appendChild(createPageNumberButton(totalPages));
-  } else if (currentPage >= totalPages - 2) {
-    pageNumbers.appendChild(createPageNumberButton(1));
-    pageNumbers.appendChild(createEllipsis());
-    for (let i = totalPages - 4; i <= totalPages; i++) {
-      pageNumbers.appendChild(createPageNumberButton(i));
-    }
-  } else {
-    pageNumbers.appendChild(createPageNumberButton(1));
-    pageNumbers.appendChild(createEllipsis());
-    for (let i = currentPage - 1; i <= currentPage + 1; i++) {
-      pageNumbers.appendChild(createPageNumberButton(i));
-    }
-    pageNumbers.appendChild(createEllipsis());
-    pageNumbers.appendChild(createPageNumberButton(totalPages));
-  }
-}
-
-function createPageNumberButton(pageNum) {
-  const button = document.createElement("button");
-  button.className = "page-number";
-  button.textContent = pageNum;
-
-  if (pageNum === currentPage) {
-    button.classList.add("active");
-  }
-
-  button.addEventListener("click", () => {
-    currentPage = pageNum;
-    renderTransactionsTable();
-    renderPagination();
-  });
-
-  return button;
-}
-
-function createEllipsis() {
-  const span = document.createElement("span");
-  span.className = "page-ellipsis";
-  span.textContent = "...";
-  return span;
+  document.getElementById("nextPage").disabled = !nextTransactionsCursor;
+
+  const indicator = document.createElement("span");
+  indicator.className = "page-number active";
+  indicator.textContent = totalPages
+    ? `${currentPage} / ${totalPages}`
+    : `${currentPage}`;
+  pageNumbers.appendChild(indicator);
 }
 
 function goToPreviousPage() {
   if (currentPage > 1) {
     currentPage--;
-    renderTransactionsTable();
-    renderPagination();
+    fetchTransactionsPage(currentTransactionType);
   }
 }
 
 function goToNextPage() {
-  if (currentPage < totalPages) {
+  if (nextTransactionsCursor) {
+    transactionPageCursors[currentPage] = nextTransactionsCursor;
     currentPage++;
-    renderTransactionsTable();
-    renderPagination();
+    fetchTransactionsPage(currentTransactionType);
   }
 }
 
@@ -578,8 +609,7 @@ function deleteTransaction(id) {
       .then((data) => {
         if (data.success) {
           loadTransactions(currentTransactionType);
-          loadFinancialData();
-          loadChartData(document.getElementById("chartType").value);
+          loadDashboard();
         } else {
           alert(`Erro ao excluir: ${data.message}`);
         }
@@ -616,15 +646,18 @@ async function loadProfitDetails() {
   const company_id = getCompanyId();
 
   try {
-    const financialResponse = await fetch(
-      `/api/financial-summary?company_id=${company_id}&month=${
-        currentMonth + 1
-      }&year=${currentYear}`
-    );
-    const financialData = await financialResponse.json();
-
-    const settingsResponse = await fetch(`/get-settings/${company_id}`);
-    const settingsData = await settingsResponse.json();
+    const dashboard = currentDashboardData();
+    const financialData = dashboard
+      ? { success: true, summary: dashboard.summary }
+      : await fetchJSON(
+          `/api/financial-summary?company_id=${company_id}&month=${
+            currentMonth + 1
+          }&year=${currentYear}`
+        );
+
+    const settingsData = dashboard
+      ? { success: true, settings: dashboard.settings }
+      : await fetchJSON(`/get-settings/${company_id}`);
 
     if (financialData.success) {
       const summary = financialData.summary;
@@ -790,8 +823,20 @@ function fetchEmployeeData() {
   document.getElementById("employeeTableBody").innerHTML = "";
   document.getElementById("noEmployeesMessage").style.display = "none";
   
-  fetch(`/get-employees/${company_id}`)
-    .then(response => response.json())
+  // Os colaboradores ativos e os totais já vêm em /api/dashboard
+  if (dashboardData) {
+    employeeData = dashboardData.employees.active;
+    document.getElementById("employeeLoadingIndicator").style.display = "none";
+    if (employeeData.length > 0) {
+      renderEmployeeTable(dashboardData.employees.totals);
+      createEmployeeChart();
+    } else {
+      document.getElementById("noEmployeesMessage").style.display = "block";
+    }
+    return;
+  }
+  
+  fetchJSON(`/get-employees/${company_id}`)
     .then(data => {
       if (data.success && data.employees && data.employees.length > 0) {
         employeeData = data.employees.filter(emp => emp.is_active);
@@ -813,7 +858,8 @@ function fetchEmployeeData() {
 }
 
 // Função para renderizar a tabela de funcionários - CORRIGIDA
-function renderEmployeeTable() {
+// totals: totais calculados no servidor (/api/dashboard); sem eles, somam-se as linhas
+function renderEmployeeTable(totals) {
   const tableBody = document.getElementById("employeeTableBody");
   tableBody.innerHTML = "";
   
@@ -858,6 +904,14 @@ function renderEmployeeTable() {
     totalNetSalary += netSalary;
   });
   
+  if (totals) {
+    totalGrossSalary = totals.gross_salary;
+    totalEmployeeSS = totals.employee_social_security;
+    totalEmployerSS = totals.employer_social_security;
+    totalIRS = totals.irs;
+    totalNetSalary = totals.net_salary;
+  }
+  
   // Atualizar os totais no rodapé da tabela
   document.getElementById("totalGrossSalary").textContent = formatCurrency(totalGrossSalary);
   document.getElementById("totalEmployeeSS").textContent = formatCurrency(totalEmployeeSS);
@@ -1105,33 +1159,35 @@ function fetchVatData() {
   const company_id = getCompanyId();
   vatMonthlyData = [];
   
-  // CORREÇÃO AQUI: Usar financial-summary em vez de simple-financial-summary
-  const fetchPromises = selectedMonths.map(monthData => {
-    return fetch(`/api/financial-summary?company_id=${company_id}&month=${monthData.month}&year=${monthData.year}`)
-      .then(response => response.json())
-      .then(data => {
-        if (data.success) {
-          return {
-            month: monthData.month,
-            year: monthData.year,
-            label: monthData.label,
-            total_vat: data.summary.total_vat || 0,
-            total_sales: data.summary.total_sales || 0
-          };
-        }
-        return null;
-      })
-      .catch(error => {
-        console.error(`Erro ao buscar dados para ${monthData.label}:`, error);
-        return null;
+  // Um único pedido cobre todo o intervalo entre o mês mais antigo e o mais recente
+  const periodKey = (monthData) => monthData.year * 12 + monthData.month;
+  const sortedMonths = [...selectedMonths].sort((a, b) => periodKey(a) - periodKey(b));
+  const formatPeriod = (monthData) =>
+    `${monthData.year}-${String(monthData.month).padStart(2, "0")}`;
+  const from = formatPeriod(sortedMonths[0]);
+  const to = formatPeriod(sortedMonths[sortedMonths.length - 1]);
+
+  fetchJSON(`/api/financial-summary/range?company_id=${company_id}&from=${from}&to=${to}`)
+    .then(data => {
+      if (!data.success) {
+        throw new Error(data.message);
+      }
+
+      const summariesByPeriod = {};
+      data.months.forEach(monthData => {
+        summariesByPeriod[periodKey(monthData)] = monthData.summary;
+      });
+
+      vatMonthlyData = selectedMonths.map(monthData => {
+        const summary = summariesByPeriod[periodKey(monthData)] || {};
+        return {
+          month: monthData.month,
+          year: monthData.year,
+          label: monthData.label,
+          total_vat: summary.total_vat || 0,
+          total_sales: summary.total_sales || 0
+        };
       });
-  });
-  
-  // Processar todas as promessas
-  Promise.all(fetchPromises)
-    .then(results => {
-      // Filtrar resultados nulos
-      vatMonthlyData = results.filter(data => data !== null);
       
       // Verificar se temos pelo menos um resultado válido
       if (vatMonthlyData.length === 0) {
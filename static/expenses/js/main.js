@@ -131,10 +131,10 @@ function handleSubmit(e) {
   netValueInput.value = netValue.toFixed(2)
   
   if (isEditing) {
-    const currentPage = new URLSearchParams(window.location.search).get('page');
-    if (currentPage) {
+    const cursorParams = getCursorParams();
+    if (cursorParams && !form.action.includes(cursorParams)) {
       const separator = form.action.includes('?') ? '&' : '?';
-      form.action = `${form.action}${separator}page=${currentPage}`;
+      form.action = `${form.action}${separator}${cursorParams}`;
     }
   }
 }
@@ -203,7 +203,7 @@ function deleteTransaction(id) {
   }
   
   if (confirm("Tem certeza que deseja eliminar esta transação?")) {
-    const currentPage = new URLSearchParams(window.location.search).get('page') || 1;
+    const cursorParams = getCursorParams();
     const csrfToken = document.querySelector('input[name="csrf_token"]').value;
     const formData = new FormData();
     formData.append('csrf_token', csrfToken);
@@ -220,11 +220,11 @@ function deleteTransaction(id) {
           renderTransactions();
           
           const remainingRows = document.querySelectorAll("#transactions-tbody tr").length;
-          if (remainingRows === 0 && currentPage > 1) {
-            window.location.href = `/expenses?page=${parseInt(currentPage) - 1}`;
+          if (remainingRows === 0 && cursorParams) {
+            goToPage(null);
           }
         } else {
-          window.location.href = `/expenses?page=${currentPage}`;
+          window.location.reload();
         }
       } else {
         response.json().then(data => {
@@ -242,8 +242,18 @@ function deleteTransaction(id) {
   }
 }
 
-function goToPage(pageNum) {
-  window.location.href = `/expenses?page=${pageNum}`;
+// A paginação usa cursores (after/before) em vez de números de página
+function getCursorParams() {
+  const urlParams = new URLSearchParams(window.location.search);
+  const cursorParams = new URLSearchParams();
+  ['after', 'before'].forEach(name => {
+    if (urlParams.get(name)) cursorParams.set(name, urlParams.get(name));
+  });
+  return cursorParams.toString();
+}
+
+function goToPage(cursorParams) {
+  window.location.href = cursorParams ? `${window.location.pathname}?${cursorParams}` : window.location.pathname;
 }
 
 modal.addEventListener("click", (e) => {
@@ -207,10 +207,10 @@ function handleSubmit(e) {
   netValueInput.value = netValue.toFixed(2)
   
   if (isEditing) {
-    const currentPage = new URLSearchParams(window.location.search).get('page');
-    if (currentPage) {
+    const cursorParams = getCursorParams();
+    if (cursorParams && !form.action.includes(cursorParams)) {
       const separator = form.action.includes('?') ? '&' : '?';
-      form.action = `${form.action}${separator}page=${currentPage}`;
+      form.action = `${form.action}${separator}${cursorParams}`;
     }
   }
   
@@ -292,7 +292,7 @@ function deleteTransaction(id) {
   }
   
   if (confirm("Tem certeza que deseja eliminar esta transação?")) {
-    const currentPage = new URLSearchParams(window.location.search).get('page') || 1;
+    const cursorParams = getCursorParams();
     const csrfToken = document.querySelector('input[name="csrf_token"]').value;
     const formData = new FormData();
     formData.append('csrf_token', csrfToken);
@@ -310,13 +310,9 @@ function deleteTransaction(id) {
             renderTransactions();
             
             const remainingRows = document.querySelectorAll("#transactions-tbody tr").length;
-            if (remainingRows === 0 && currentPage > 1) {
-              // Manter os parâmetros de mês e ano ao redirecionar
-              const urlParams = new URLSearchParams(window.location.search);
-              const month = urlParams.get('month') || currentMonth;
-              const year = urlParams.get('year') || currentYear;
-              
-              window.location.href = `/simple-sales/${getCompanyIdFromUrl()}?page=${parseInt(currentPage) - 1}&month=${month}&year=${year}`;
+            if (remainingRows === 0 && cursorParams) {
+              // Página vazia: voltar à primeira página do mesmo mês
+              goToPage(null);
             } else {
               // Recarregar os dados financeiros após excluir uma transação
               loadFinancialData();
@@ -327,7 +323,7 @@ function deleteTransaction(id) {
             const month = urlParams.get('month') || currentMonth;
             const year = urlParams.get('year') || currentYear;
             
-            window.location.href = `/simple-sales/${data.company_id}?page=${currentPage}&month=${month}&year=${year}`;
+            window.location.href = `/simple-sales/${data.company_id}?month=${month}&year=${year}${cursorParams ? '&' + cursorParams : ''}`;
           }
         }).catch(error => {
           console.error('Erro ao processar resposta:', error);
@@ -350,13 +346,23 @@ function deleteTransaction(id) {
   }
 }
 
-function goToPage(pageNum) {
+// A paginação usa cursores (after/before) em vez de números de página
+function getCursorParams() {
+  const urlParams = new URLSearchParams(window.location.search);
+  const cursorParams = new URLSearchParams();
+  ['after', 'before'].forEach(name => {
+    if (urlParams.get(name)) cursorParams.set(name, urlParams.get(name));
+  });
+  return cursorParams.toString();
+}
+
+function goToPage(cursorParams) {
   // Manter os parâmetros de mês e ano ao navegar pelas páginas
   const urlParams = new URLSearchParams(window.location.search);
   const month = urlParams.get('month') || currentMonth;
   const year = urlParams.get('year') || currentYear;
   
-  window.location.href = `/simple-sales/${getCompanyIdFromUrl()}?page=${pageNum}&month=${month}&year=${year}`;
+  window.location.href = `/simple-sales/${getCompanyIdFromUrl()}?month=${month}&year=${year}${cursorParams ? '&' + cursorParams : ''}`;
 }
 
 modal.addEventListener("click", (e) => {
@@ -0,0 +1,187 @@
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+from flask import request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:  # dependência opcional; sem ela só se gera .gz
+    brotli = None
+
+try:
+    import rjsmin
+    import rcssmin
+except ImportError:  # dependências opcionais; sem elas os ficheiros são copiados sem minificar
+    rjsmin = rcssmin = None
+
+logger = logging.getLogger('static_assets')
+logger.setLevel(logging.INFO)
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+handler = logging.StreamHandler()
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+
+# Pasta (dentro de static/) onde ficam as cópias com hash e o manifesto
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+ASSET_EXTENSIONS = ('.js', '.css')
+
+# Ficheiros com hash nunca mudam de conteúdo: podem ficar um ano em cache
+IMMUTABLE_MAX_AGE = 31536000
+
+# Sufixo do ficheiro pré-comprimido por Content-Encoding, por ordem de preferência
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+
+def minify(path, text):
+    if path.endswith('.js') and rjsmin is not None:
+        return rjsmin.jsmin(text)
+    if path.endswith('.css') and rcssmin is not None:
+        return rcssmin.cssmin(text)
+    return text
+
+
+def fingerprint(path, data):
+    root, extension = os.path.splitext(path)
+    return f"{root}.{hashlib.sha256(data).hexdigest()[:10]}{extension}"
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as output:
+        output.write(data)
+
+
+def build_assets(static_folder, prune=False):
+    """
+    Minify, fingerprint and precompress every .js/.css under `static_folder`.
+
+    Each source `x/js/main.js` becomes `dist/x/js/main.<hash>.js` plus `.gz`
+    and `.br` siblings (brotli only when installed, and only when smaller),
+    and dist/manifest.json maps source paths to the fingerprinted ones. The
+    manifest is replaced atomically; files from earlier builds are kept for
+    pages still referencing them unless `prune` is set. Returns one
+    (source, output, original, minified, gzip, brotli) size tuple per asset.
+    """
+    dist_folder = os.path.join(static_folder, DIST_DIR)
+    manifest = {}
+    report = []
+
+    for root, dirs, files in os.walk(static_folder):
+        dirs[:] = sorted(name for name in dirs if os.path.join(root, name) != dist_folder)
+        for name in sorted(files):
+            if not name.endswith(ASSET_EXTENSIONS):
+                continue
+            source_path = os.path.join(root, name)
+            source = os.path.relpath(source_path, static_folder).replace(os.sep, '/')
+
+            with open(source_path, 'rb') as handle:
+                original = handle.read()
+            data = minify(source, original.decode('utf-8')).encode('utf-8')
+            output = fingerprint(f"{DIST_DIR}/{source}", data)
+            output_path = os.path.join(static_folder, output)
+            _write(output_path, data)
+
+            sizes = {'gzip': None, 'br': None}
+            variants = [('gzip', gzip.compress(data, 9, mtime=0))]
+            if brotli is not None:
+                variants.append(('br', brotli.compress(data, quality=11)))
+            for encoding, compressed in variants:
+                if len(compressed) < len(data):
+                    _write(output_path + dict(PRECOMPRESSED)[encoding], compressed)
+                    sizes[encoding] = len(compressed)
+
+            manifest[source] = output
+            report.append((source, output, len(original), len(data), sizes['gzip'], sizes['br']))
+
+    os.makedirs(dist_folder, exist_ok=True)
+    manifest_path = os.path.join(dist_folder, MANIFEST_NAME)
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+    if prune:
+        keep = {manifest_path}
+        for output in manifest.values():
+            output_path = os.path.join(static_folder, output)
+            keep.update(output_path + suffix for suffix in ('', '.gz', '.br'))
+        for root, _, files in os.walk(dist_folder):
+            for name in files:
+                path = os.path.join(root, name)
+                if path not in keep:
+                    os.remove(path)
+
+    return report
+
+
+class StaticAssets:
+    """
+    Serves fingerprinted copies of the static assets through url_for.
+
+    asset_url('company/js/main.js') resolves through dist/manifest.json when
+    the manifest exists (and STATIC_MANIFEST_ENABLED is on), falling back to
+    the source file otherwise. The static endpoint then serves fingerprinted
+    files with a one-year immutable Cache-Control, picking the .br or .gz
+    sibling that the client accepts.
+    """
+
+    def __init__(self):
+        self.static_folder = None
+        self.manifest = {}
+        self.encodings = {}
+
+    def configure(self, app):
+        self.static_folder = app.static_folder
+        if app.config.get('STATIC_MANIFEST_ENABLED', True):
+            self.load()
+        app.view_functions['static'] = self.serve
+        app.add_template_global(self.url, 'asset_url')
+
+    def load(self):
+        manifest_path = os.path.join(self.static_folder, DIST_DIR, MANIFEST_NAME)
+        try:
+            with open(manifest_path, encoding='utf-8') as handle:
+                manifest = json.load(handle)
+        except FileNotFoundError:
+            logger.info("Sem manifesto de assets; a servir os ficheiros originais (corra 'flask build-assets').")
+            manifest = {}
+
+        self.manifest = manifest
+        self.encodings = {
+            output: tuple(
+                (encoding, suffix) for encoding, suffix in PRECOMPRESSED
+                if os.path.isfile(os.path.join(self.static_folder, output + suffix))
+            )
+            for output in manifest.values()
+        }
+        if manifest:
+            logger.info(f"Manifesto de assets: {len(manifest)} ficheiros com hash")
+
+    def url(self, filename):
+        return url_for('static', filename=self.manifest.get(filename, filename))
+
+    def serve(self, filename):
+        encodings = self.encodings.get(filename)
+        if encodings is None:
+            return send_from_directory(self.static_folder, filename)
+
+        accepted = request.accept_encodings
+        encoding, suffix = next(
+            ((encoding, suffix) for encoding, suffix in encodings if accepted[encoding]), (None, '')
+        )
+        mimetype = mimetypes.guess_type(filename)[0]
+        response = send_from_directory(
+            self.static_folder, filename + suffix, mimetype=mimetype, max_age=IMMUTABLE_MAX_AGE
+        )
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+
+static_assets = StaticAssets()
@@ -0,0 +1,319 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from extensions import db
+from instance.base import ConfigVersion, MonthlySummary, SimpleMonthlySummary
+from periods import period_range_filter
+
+logger = logging.getLogger('summary_cache')
+logger.setLevel(logging.INFO)
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+handler = logging.StreamHandler()
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+
+SUMMARY_MODELS = {
+    'expenses': MonthlySummary,
+    'simple': SimpleMonthlySummary,
+}
+
+MODEL_LEDGERS = {model: ledger for ledger, model in SUMMARY_MODELS.items()}
+
+# Colunas que não fazem parte dos totais guardados em cache
+NON_CACHED_COLUMNS = {'id', 'company_id', 'year', 'month', 'create_date', 'write_date'}
+
+# Chaves alteradas na transação atual; invalidadas só depois do commit
+PENDING_KEYS = 'summary_cache_keys'
+
+
+class MemoryBackend:
+    """Per-process LRU dict whose entries also expire after `ttl` seconds."""
+
+    name = 'memory'
+
+    def __init__(self, max_entries=2048, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                expires_at, value = entry
+                if expires_at <= now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = value
+        return found
+
+    def set_many(self, items):
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            for key, value in items.items():
+                self._entries[key] = (expires_at, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisBackend:
+    """
+    Cache shared by every worker through a Redis-compatible server (Redis, Valkey, KeyDB).
+
+    Entries expire with SETEX; LRU eviction is the server's job, so run it
+    with maxmemory-policy allkeys-lru.
+    """
+
+    name = 'redis'
+
+    def __init__(self, url, ttl=300, prefix='cadete:summary:'):
+        import redis  # dependência opcional, só necessária com SUMMARY_CACHE_BACKEND=redis
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _key(self, key):
+        return self.prefix + ':'.join(str(part) for part in key)
+
+    def get_many(self, keys):
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = self.client.mget([self._key(key) for key in keys])
+        return {key: json.loads(value) for key, value in zip(keys, values) if value is not None}
+
+    def set_many(self, items):
+        pipeline = self.client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipeline.setex(self._key(key), self.ttl, json.dumps(value))
+        pipeline.execute()
+
+    def delete_many(self, keys):
+        keys = [self._key(key) for key in keys]
+        if keys:
+            self.client.delete(*keys)
+
+    def clear(self):
+        for key in self.client.scan_iter(match=f'{self.prefix}*'):
+            self.client.delete(key)
+
+    def __len__(self):
+        return sum(1 for _ in self.client.scan_iter(match=f'{self.prefix}*'))
+
+
+class NullBackend:
+    name = 'none'
+
+    def get_many(self, keys):
+        return {}
+
+    def set_many(self, items):
+        pass
+
+    def delete_many(self, keys):
+        pass
+
+    def clear(self):
+        pass
+
+    def __len__(self):
+        return 0
+
+
+class SummaryCache:
+    """
+    Read-through cache of monthly summary rows keyed by (ledger, company_id, year, month).
+
+    Values are plain dicts of the summary totals, or {} when the row does not
+    exist, so missing months are not re-queried either. Each entry is stored
+    with the company's summary version (see state()) and only served while
+    config_version still holds that version, so a write committed by another
+    worker is seen on the next read. Hit/miss counters are kept per process.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or MemoryBackend()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def configure(self, app):
+        backend_name = app.config.get('SUMMARY_CACHE_BACKEND', 'memory')
+        ttl = app.config.get('SUMMARY_CACHE_TTL', 300)
+
+        if backend_name == 'redis':
+            self.backend = RedisBackend(app.config['SUMMARY_CACHE_URL'], ttl=ttl)
+        elif backend_name == 'none':
+            self.backend = NullBackend()
+        else:
+            self.backend = MemoryBackend(app.config.get('SUMMARY_CACHE_MAX_ENTRIES', 2048), ttl)
+
+        logger.info(f"Cache de resumos: backend '{self.backend.name}', TTL {ttl}s")
+
+    def state(self, ledger, company_id):
+        """
+        (version, last write, None) of a company's `ledger` summaries, shaped like row_state().
+
+        One primary-key read of config_version: the company's counter, bumped
+        by every commit that wrote a row marked with mark_summary_changed(),
+        and the ledger-wide one, bumped by bulk ORM updates. The counters only
+        grow, so unlike write_date the state is never racy.
+        """
+        names = version_names(ledger, company_id)
+        rows = db.session.execute(
+            select(ConfigVersion.name, ConfigVersion.version, ConfigVersion.write_date)
+            .where(ConfigVersion.name.in_(names))
+        ).all()
+        versions = {row.name: row.version for row in rows}
+        last_write = max((row.write_date for row in rows if row.write_date is not None), default=None)
+        return '.'.join(str(versions.get(name, 0)) for name in names), last_write, None
+
+    def get_summaries(self, ledger, company_id, periods, state=None):
+        """
+        Summary rows of `periods` as {(year, month): row or None}.
+
+        `state` is self.state(ledger, company_id), read here when not given;
+        routes pass the one their ETag was built from. Cached periods stored
+        under that version are served from the backend without touching the
+        summary table; the rest are loaded with a single range query and
+        stored, including the months without a row.
+        """
+        periods = list(dict.fromkeys(periods))
+        keys = {period: (ledger, company_id) + tuple(period) for period in periods}
+        version = (state or self.state(ledger, company_id))[0]
+
+        cached = {
+            key: entry[1]
+            for key, entry in self.backend.get_many(keys.values()).items()
+            if entry[0] == version
+        }
+
+        missing = [period for period in periods if keys[period] not in cached]
+        with self._lock:
+            self.hits += len(periods) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            loaded = load_summary_rows(ledger, company_id, missing)
+            values = {keys[period]: loaded.get(period, {}) for period in missing}
+            self.backend.set_many({key: [version, value] for key, value in values.items()})
+            cached.update(values)
+
+        return {
+            period: SimpleNamespace(**cached[keys[period]]) if cached[keys[period]] else None
+            for period in periods
+        }
+
+    def get_summary(self, ledger, company_id, year, month):
+        return self.get_summaries(ledger, company_id, [(year, month)])[(year, month)]
+
+    def invalidate_many(self, keys):
+        self.backend.delete_many(keys)
+
+    def clear(self):
+        self.backend.clear()
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': self.backend.name,
+            'entries': len(self.backend),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+def version_names(ledger, company_id=None):
+    """config_version counters of a ledger's summaries: the ledger-wide one, then the company's."""
+    if company_id is None:
+        return (f'summary:{ledger}',)
+    return f'summary:{ledger}', f'summary:{ledger}:{int(company_id)}'
+
+
+def load_summary_rows(ledger, company_id, periods):
+    """Load the summary totals of `periods` with one (company_id, year, month) range query."""
+    model = SUMMARY_MODELS[ledger]
+    table = model.__table__
+    columns = [column for column in table.columns if column.name not in NON_CACHED_COLUMNS]
+
+    rows = db.session.execute(
+        select(table.c.year, table.c.month, *columns).where(
+            table.c.company_id == company_id,
+            period_range_filter(table.c.year, table.c.month, min(periods), max(periods))
+        )
+    ).all()
+
+    wanted = set(periods)
+    return {
+        (row.year, row.month): {column.name: getattr(row, column.name) for column in columns}
+        for row in rows
+        if (row.year, row.month) in wanted
+    }
+
+
+summary_cache = SummaryCache()
+
+
+def mark_summary_changed(model, company_id, year, month):
+    """Queue the cache entry of a summary row written in the current transaction for invalidation on commit."""
+    db.session.info.setdefault(PENDING_KEYS, set()).add((MODEL_LEDGERS[model], int(company_id), int(year), int(month)))
+
+
+@event.listens_for(Session, 'before_commit')
+def _bump_committed_summaries(session):
+    # Na mesma transação das escritas: os outros workers veem a versão nova com os dados novos
+    from config_cache import bump_config_version  # config_cache -> summary_updates -> este módulo
+
+    companies = {(ledger, company_id) for ledger, company_id, year, month in session.info.get(PENDING_KEYS, ())}
+    for ledger, company_id in sorted(companies):
+        bump_config_version(version_names(ledger, company_id)[1], session)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _bump_bulk_summary_writes(orm_execute_state):
+    # update(MonthlySummary)/delete(...) em massa não dizem que empresas alteram: sobe a versão do ledger
+    mapper = orm_execute_state.bind_mapper
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and mapper is not None and mapper.class_ in MODEL_LEDGERS:
+        from config_cache import bump_config_version
+
+        bump_config_version(version_names(MODEL_LEDGERS[mapper.class_])[0], orm_execute_state.session)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_summaries(session):
+    keys = session.info.pop(PENDING_KEYS, None)
+    if keys:
+        summary_cache.invalidate_many(keys)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending_summaries(session):
+    session.info.pop(PENDING_KEYS, None)
@@ -0,0 +1,184 @@
+import logging
+from sqlalchemy import case, func, select
+from extensions import db
+from instance.base import Expenses, SimpleExpenses, MonthlySummary, SimpleMonthlySummary
+from periods import month_bounds, date_range_filter, period_range_filter
+from summary_cache import mark_summary_changed
+from summary_updates import PROFIT_COLUMNS, CONFLICT_COLUMNS, ledger_deltas, simple_ledger_deltas, combine_deltas, dialect_insert
+
+logger = logging.getLogger('summary_rebuild')
+logger.setLevel(logging.INFO)
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+handler = logging.StreamHandler()
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+
+# Diferenças abaixo deste valor são ruído de arredondamento de floats
+TOLERANCE = 0.005
+
+
+def _employee_salary_filter(ledger):
+    return ledger.description.like('Salário:%')
+
+
+def _employee_insurance_filter(ledger):
+    return ledger.description == 'Seguros dos Empregados'
+
+
+# ledger -> (tabela de lançamentos, tabela de resumo, deltas por lançamento, colunas marcadas por descrição)
+LEDGERS = {
+    'expenses': (Expenses, MonthlySummary, ledger_deltas, {
+        'total_employee_salaries': _employee_salary_filter,
+        'total_employee_insurance': _employee_insurance_filter,
+    }),
+    'simple': (SimpleExpenses, SimpleMonthlySummary, simple_ledger_deltas, {}),
+}
+
+
+def summary_columns(ledger_name):
+    """Columns of the summary table that the rebuild recomputes."""
+    ledger, summary, deltas, tagged = LEDGERS[ledger_name]
+    columns = set(deltas('ganho', 0.0, 0.0, 0.0)) | set(deltas('despesa', 0.0, 0.0, 0.0))
+    columns |= set(PROFIT_COLUMNS[summary]) | set(tagged)
+    return sorted(columns)
+
+
+def aggregate_ledger(ledger_name, company_id=None, start=None, end=None):
+    """
+    Recompute summary values from the ledger with one GROUP BY statement.
+
+    Returns {(company_id, year, month): {column: value}} for every month that
+    has ledger rows in scope. `start`/`end` are inclusive (year, month) pairs.
+    """
+    ledger, summary, deltas, tagged = LEDGERS[ledger_name]
+    year = db.extract('year', ledger.create_date)
+    month = db.extract('month', ledger.create_date)
+    transaction_type = func.lower(ledger.transaction_type)
+
+    tagged_sums = [
+        func.sum(case((tag_filter(ledger), ledger.gross_value), else_=0.0)).label(column)
+        for column, tag_filter in tagged.items()
+    ]
+
+    statement = select(
+        ledger.company_id,
+        year.label('year'),
+        month.label('month'),
+        transaction_type.label('transaction_type'),
+        func.sum(ledger.gross_value).label('gross_value'),
+        func.sum(ledger.net_value).label('net_value'),
+        func.sum(ledger.iva_value).label('iva_value'),
+        *tagged_sums
+    ).group_by(ledger.company_id, year, month, transaction_type)
+
+    if company_id:
+        statement = statement.where(ledger.company_id == company_id)
+    if start and end:
+        statement = statement.where(date_range_filter(
+            ledger.create_date,
+            month_bounds(*start)[0],
+            month_bounds(*end)[1]
+        ))
+
+    grouped = {}
+    for row in db.session.execute(statement):
+        key = (row.company_id, int(row.year), int(row.month))
+        row_deltas = deltas(row.transaction_type, row.gross_value or 0.0, row.net_value or 0.0, row.iva_value or 0.0)
+        if row.transaction_type == 'despesa':
+            row_deltas.update({column: getattr(row, column) or 0.0 for column in tagged})
+        grouped[key] = combine_deltas(grouped.get(key, {}), row_deltas)
+
+    columns = summary_columns(ledger_name)
+    results = {}
+    for key, values in grouped.items():
+        values = {column: values.get(column, 0.0) for column in columns}
+        for profit_column, (sales_column, costs_column) in PROFIT_COLUMNS[summary].items():
+            values[profit_column] = values[sales_column] - values[costs_column]
+        results[key] = values
+    return results
+
+
+def load_summaries(ledger_name, company_id=None, start=None, end=None):
+    """Current summary rows in scope, keyed like aggregate_ledger()."""
+    ledger, summary, deltas, tagged = LEDGERS[ledger_name]
+    table = summary.__table__
+    columns = summary_columns(ledger_name)
+
+    statement = select(table.c.company_id, table.c.year, table.c.month, *[table.c[column] for column in columns])
+    if company_id:
+        statement = statement.where(table.c.company_id == company_id)
+    if start and end:
+        statement = statement.where(period_range_filter(table.c.year, table.c.month, start, end))
+
+    return {
+        (row.company_id, row.year, row.month): {column: getattr(row, column) for column in columns}
+        for row in db.session.execute(statement)
+    }
+
+
+def diff_summaries(current, rebuilt, columns):
+    """List of (key, {column: (current, rebuilt)}) for rows that differ beyond TOLERANCE."""
+    changes = []
+    for key in sorted(set(current) | set(rebuilt)):
+        old = current.get(key, {})
+        new = rebuilt.get(key, {column: 0.0 for column in columns})
+        changed = {
+            column: (old.get(column), new[column])
+            for column in columns
+            if old.get(column) is None or abs(old[column] - new[column]) > TOLERANCE
+        }
+        if changed:
+            changes.append((key, changed))
+    return changes
+
+
+def write_summaries(ledger_name, rows):
+    """Upsert absolute summary values in a single executemany statement."""
+    ledger, summary, deltas, tagged = LEDGERS[ledger_name]
+    if not rows:
+        return
+
+    statement = dialect_insert(summary.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=CONFLICT_COLUMNS,
+        set_={
+            **{column: statement.excluded[column] for column in summary_columns(ledger_name)},
+            'write_date': func.current_timestamp()
+        }
+    )
+    db.session.execute(statement, rows)
+    for row in rows:
+        mark_summary_changed(summary, row['company_id'], row['year'], row['month'])
+
+
+def rebuild_summaries(ledger_name, company_id=None, start=None, end=None, dry_run=False):
+    """
+    Recompute the summaries of one ledger and write back only the rows that changed.
+
+    Summary rows in scope with no ledger rows are reset to zero. With
+    dry_run=True nothing is written. Returns the diff_summaries() list.
+    """
+    columns = summary_columns(ledger_name)
+    current = load_summaries(ledger_name, company_id, start, end)
+    rebuilt = aggregate_ledger(ledger_name, company_id, start, end)
+    changes = diff_summaries(current, rebuilt, columns)
+
+    logger.info(f"Resumos '{ledger_name}': {len(current)} existentes, {len(rebuilt)} recalculados, {len(changes)} com diferenças")
+
+    if dry_run or not changes:
+        return changes
+
+    rows = []
+    for (row_company_id, year, month), changed in changes:
+        values = rebuilt.get((row_company_id, year, month), {column: 0.0 for column in columns})
+        rows.append({'company_id': row_company_id, 'year': year, 'month': month, **values})
+
+    try:
+        write_summaries(ledger_name, rows)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Erro ao reconstruir resumos '{ledger_name}': {str(e)}")
+        raise
+
+    return changes
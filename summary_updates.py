@@ -0,0 +1,123 @@
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from extensions import db
+from instance.base import MonthlySummary, SimpleMonthlySummary
+from summary_cache import mark_summary_changed
+
+# Campos derivados recalculados a partir dos totais em cada atualização
+PROFIT_COLUMNS = {
+    MonthlySummary: {
+        'profit': ('total_sales', 'total_costs'),
+        'profit_without_vat': ('total_sales_without_vat', 'total_costs_without_vat'),
+    },
+    SimpleMonthlySummary: {
+        'profit': ('total_sales', 'total_costs'),
+        'profit_without_vat': ('total_sales_without_vat', 'total_costs'),
+    },
+}
+
+CONFLICT_COLUMNS = ['month', 'year', 'company_id']
+
+
+def ledger_deltas(transaction_type, gross_value, net_value, iva_value, sign=1):
+    """MonthlySummary column deltas produced by one Expenses row (sign=-1 to remove it)."""
+    transaction_type = (transaction_type or '').lower()
+
+    if transaction_type == 'ganho':
+        return {
+            'total_sales': sign * gross_value,
+            'total_sales_without_vat': sign * net_value,
+            'total_vat': sign * iva_value,
+        }
+    elif transaction_type == 'despesa':
+        return {
+            'total_costs': sign * gross_value,
+            'total_costs_without_vat': sign * net_value,
+            'total_vat': -sign * iva_value,
+        }
+    return {}
+
+
+def simple_ledger_deltas(transaction_type, gross_value, net_value, iva_value, sign=1):
+    """SimpleMonthlySummary column deltas produced by one SimpleExpenses row."""
+    transaction_type = (transaction_type or '').lower()
+
+    if transaction_type == 'ganho':
+        return {
+            'total_sales': sign * gross_value,
+            'total_sales_without_vat': sign * net_value,
+            'total_vat': sign * iva_value,
+        }
+    elif transaction_type == 'despesa':
+        return {
+            'total_costs': sign * gross_value,
+        }
+    return {}
+
+
+def combine_deltas(*deltas):
+    combined = {}
+    for delta in deltas:
+        for column, value in delta.items():
+            combined[column] = combined.get(column, 0.0) + value
+    return combined
+
+
+def _incremented(table, column, deltas):
+    return func.coalesce(table.c[column], 0.0) + deltas.get(column, 0.0)
+
+
+def _increment_values(model, deltas):
+    """SET clause adding `deltas` in SQL and recomputing profit from the new totals."""
+    table = model.__table__
+    values = {column: _incremented(table, column, deltas) for column in deltas}
+
+    for profit_column, (sales_column, costs_column) in PROFIT_COLUMNS[model].items():
+        values[profit_column] = _incremented(table, sales_column, deltas) - _incremented(table, costs_column, deltas)
+
+    values['write_date'] = func.current_timestamp()
+    return values
+
+
+def dialect_insert(table):
+    """INSERT construct supporting on_conflict_do_update() for the active database."""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
+def upsert_summary_delta(model, company_id, year, month, deltas, initial=None):
+    """
+    Add `deltas` to the summary row of company/year/month in a single statement.
+
+    Missing rows are created with `initial` (defaults to `deltas`) through
+    INSERT ... ON CONFLICT on the month/year/company unique constraint, so
+    concurrent workers never overwrite each other's increments. Runs inside
+    the caller's transaction; the caller commits.
+    """
+    if initial is None:
+        initial = deltas
+
+    row = {column: 0.0 for columns in PROFIT_COLUMNS[model].values() for column in columns}
+    row.update(initial)
+    for profit_column, (sales_column, costs_column) in PROFIT_COLUMNS[model].items():
+        row[profit_column] = row[sales_column] - row[costs_column]
+
+    statement = dialect_insert(model.__table__).values(month=month, year=year, company_id=company_id, **row)
+    statement = statement.on_conflict_do_update(
+        index_elements=CONFLICT_COLUMNS,
+        set_=_increment_values(model, deltas)
+    )
+    db.session.execute(statement)
+    mark_summary_changed(model, company_id, year, month)
+
+
+def apply_summary_delta(model, company_id, year, month, deltas):
+    """Add `deltas` to an existing summary row; does nothing if the row is missing."""
+    table = model.__table__
+    db.session.execute(
+        table.update()
+        .where(table.c.company_id == company_id, table.c.year == year, table.c.month == month)
+        .values(_increment_values(model, deltas))
+    )
+    mark_summary_changed(model, company_id, year, month)
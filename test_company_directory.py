@@ -0,0 +1,110 @@
+"""
+Company Directory Tests
+=======================
+
+Tests for the projected, user-scoped and keyset-paginated company listing.
+
+Usage:
+    python -m pytest test_company_directory.py
+"""
+
+import sys
+sys.dont_write_bytecode = True
+
+import re
+from datetime import datetime
+
+from flask import g
+
+from extensions import db
+from instance.base import Company, User
+from company_directory import name_prefix_filter
+from pagination import decode_cursor
+
+
+def add_companies(user_id, *names):
+    db.session.add_all([Company(name, 'Lisboa', 'cliente', user_id, notes='x' * 1000) for name in names])
+    db.session.commit()
+
+
+def other_user():
+    user = User(username='outro', password='outro', name='Outro', type='User', write_date=datetime.now())
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def list_names(client, **params):
+    data = client.get('/get-companies', query_string=params).get_json()
+    return [company['name'] for company in data['companies']], data['next_cursor']
+
+
+def test_pages_follow_name_order_without_gaps(client, user, queries):
+    names = [f'Empresa {index:02d}' for index in range(25)]
+    add_companies(user.id, *reversed(names))
+
+    seen, cursor = [], None
+    queries.clear()
+    while True:
+        page, cursor = list_names(client, limit=10, **({'after': cursor} if cursor else {}))
+        seen += page
+        if not cursor:
+            break
+
+    assert seen == names
+    company_selects = [statement for statement in queries if 'FROM company' in statement]
+    assert len(company_selects) == 3
+    assert all('notes' not in statement for statement in company_selects)
+
+
+def test_prefix_search_is_case_insensitive_and_escaped(client, user):
+    add_companies(user.id, 'Alfa Lda', 'alfama', 'Beta', '100% Digital', '100 Euros', 'Al_fa')
+
+    assert list_names(client, q='alf')[0] == ['Alfa Lda', 'alfama']
+    assert list_names(client, q='ALFA ')[0] == ['Alfa Lda', 'alfama']
+    assert list_names(client, q='100%')[0] == ['100% Digital']
+    assert list_names(client, q='al_')[0] == ['Al_fa']
+
+
+def test_prefix_search_with_non_ascii_first_character(client, user):
+    add_companies(user.id, 'Ébano Lda', 'Evora Tintas', 'ßeta Werke', 'Straße Bau', 'ǆungla')
+
+    # 'ß'.upper() == 'SS' e 'ǅ' tem três formas de maiúscula/minúscula: sem limites no índice
+    for prefix in ('ß', 'ǅ', 'É', 'é'):
+        assert 'company.name >=' not in str(name_prefix_filter(prefix))
+    assert 'company.name >=' in str(name_prefix_filter('e'))
+
+    assert list_names(client, q='ßet')[0] == ['ßeta Werke']
+    assert list_names(client, q='Éb')[0] == ['Ébano Lda']
+    assert list_names(client, q='ǆun')[0] == ['ǆungla']
+    assert list_names(client, q='stra')[0] == ['Straße Bau']
+    assert list_names(client, q='e')[0] == ['Evora Tintas']
+
+
+def test_regular_users_only_see_their_companies(client, user):
+    owner = other_user()
+    add_companies(user.id, 'Da Casa')
+    add_companies(owner.id, 'Do Outro')
+
+    assert list_names(client)[0] == ['Da Casa', 'Do Outro']
+
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(owner.id)
+    g.pop('_login_user', None)
+    assert list_names(client)[0] == ['Do Outro']
+
+
+def test_company_page_renders_first_page_with_cursor(client, user, monkeypatch):
+    import app as app_module
+
+    monkeypatch.setattr(app_module, 'COMPANY_PAGE_SIZE', 2)
+    add_companies(user.id, 'Gama', 'Alfa', 'Beta')
+
+    html = client.get('/company').get_data(as_text=True)
+    assert 'Alfa' in html and 'Beta' in html and 'Gama' not in html
+    cursor = re.search(r'data-next-cursor="([^"]*)"', html).group(1)
+    assert decode_cursor(cursor)[0] == 'Beta'
+
+    html = client.get('/company?q=ga').get_data(as_text=True)
+    assert 'Gama' in html and 'Alfa' not in html
+    assert 'value="ga"' in html
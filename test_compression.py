@@ -0,0 +1,85 @@
+"""
+Compression Tests
+=================
+
+Tests for the gzip/brotli after_request hook: thresholds, content types,
+streamed bodies and the Vary header.
+
+Usage:
+    python -m pytest test_compression.py
+"""
+
+import sys
+sys.dont_write_bytecode = True
+
+import gzip
+import zlib
+from datetime import datetime, timedelta
+
+from flask import Response
+from sqlalchemy import update
+
+from compression import compression
+from extensions import db
+from instance.base import Employee
+
+
+def add_employees(company, count):
+    db.session.add_all(Employee(f'Colaborador {index}', 1000.0, 'Técnico', company.id) for index in range(count))
+    db.session.commit()
+    # Fora da janela de um segundo, para a resposta levar ETag
+    db.session.execute(update(Employee).values(write_date=datetime.utcnow() - timedelta(hours=1)))
+    db.session.commit()
+
+
+def test_json_is_gzipped_when_accepted(client, company):
+    add_employees(company, 20)
+    url = f'/get-employees/{company.id}'
+
+    plain = client.get(url)
+    encoded = client.get(url, headers={'Accept-Encoding': 'gzip, deflate'})
+
+    assert 'Content-Encoding' not in plain.headers
+    assert encoded.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in encoded.headers['Vary']
+    assert int(encoded.headers['Content-Length']) == len(encoded.data) < len(plain.data)
+    assert gzip.decompress(encoded.data) == plain.data
+    assert encoded.headers['ETag'] == plain.headers['ETag']
+
+
+def test_small_and_refused_responses_are_sent_as_is(client, company):
+    small = client.get(f'/get-employees/{company.id}', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+    assert 'Accept-Encoding' in small.headers['Vary']
+
+    add_employees(company, 20)
+    refused = client.get(f'/get-employees/{company.id}', headers={'Accept-Encoding': 'gzip;q=0'})
+    assert 'Content-Encoding' not in refused.headers
+
+
+def test_not_modified_keeps_vary(client, company):
+    add_employees(company, 20)
+    url = f'/get-employees/{company.id}'
+    etag = client.get(url, headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+
+    response = client.get(url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+
+def test_streamed_bodies_are_compressed_per_chunk(app):
+    chunks = ['{"rows": [', '1, ' * 400, '2]}']
+    with app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        response = compression.after_request(Response(iter(chunks), mimetype='application/json'))
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Content-Length' not in response.headers
+
+        parts = list(response.response)
+        decoder = zlib.decompressobj(31)
+        # Cada bloco já descomprime sozinho graças ao sync flush
+        assert decoder.decompress(parts[0]) == chunks[0].encode()
+        assert b''.join([decoder.decompress(part) for part in parts[1:]]) == ''.join(chunks[1:]).encode()
+
+        image = compression.after_request(Response(b'\x89PNG' * 500, mimetype='image/png'))
+        assert 'Content-Encoding' not in image.headers
@@ -0,0 +1,152 @@
+"""
+Conditional Request Tests
+=========================
+
+Tests for the weak ETags and 304 responses of the JSON read APIs.
+
+Usage:
+    python -m pytest test_conditional_requests.py
+"""
+
+import sys
+sys.dont_write_bytecode = True
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from extensions import db
+from instance.base import Company, Employee, Expenses, MonthlySummary, Settings
+from summary_updates import ledger_deltas, upsert_summary_delta
+
+
+def age_rows(*models):
+    """Move write_date out of the racy window, as if the rows were written an hour ago."""
+    for model in models:
+        db.session.execute(update(model).values(write_date=datetime.utcnow() - timedelta(hours=1)))
+    db.session.commit()
+
+
+def revalidate(client, url, etag):
+    return client.get(url, headers={'If-None-Match': etag})
+
+
+def test_financial_summary_revalidates_without_reading_summaries(client, company, queries):
+    upsert_summary_delta(MonthlySummary, company.id, 2026, 3, ledger_deltas('ganho', 100.0, 100.0, 0.0))
+    db.session.commit()
+    age_rows(MonthlySummary)
+    url = f'/api/financial-summary?company_id={company.id}&month=3&year=2026'
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.headers['ETag'].startswith('W/"')
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+    assert response.last_modified is not None
+
+    queries.clear()
+    not_modified = revalidate(client, url, response.headers['ETag'])
+    assert not_modified.status_code == 304
+    assert not_modified.data == b''
+    assert not_modified.headers['ETag'] == response.headers['ETag']
+    assert [statement for statement in queries if 'monthly_summary' in statement] == []
+
+    other_month = client.get(f'/api/financial-summary?company_id={company.id}&month=5&year=2026')
+    assert other_month.headers['ETag'] != response.headers['ETag']
+
+
+def test_ledger_write_changes_the_etag(client, company):
+    now = datetime.utcnow()
+    url = f'/api/financial-summary?company_id={company.id}&month={now.month}&year={now.year}'
+    first = client.get(url)
+    etag = first.headers['ETag']
+
+    client.post('/add-expenses', data={
+        'company_id': company.id, 'transaction_type': 'ganho', 'description': 'Venda',
+        'gross_value': 123.0, 'iva_rate': 23.0, 'iva_value': 23.0, 'net_value': 100.0,
+    })
+
+    # A versão dos resumos só aumenta: o ETag muda logo, mesmo dentro do mesmo segundo
+    fresh = revalidate(client, url, etag)
+    assert fresh.status_code == 200
+    assert fresh.headers['ETag'] != etag
+    assert fresh.get_json()['summary']['total_sales'] == 123.0
+    assert revalidate(client, url, fresh.headers['ETag']).status_code == 304
+
+
+def test_summary_etag_and_body_follow_writes_from_other_workers(client, company):
+    upsert_summary_delta(MonthlySummary, company.id, 2026, 3, ledger_deltas('ganho', 100.0, 100.0, 0.0))
+    db.session.commit()
+    age_rows(MonthlySummary)
+    urls = [
+        f'/api/financial-summary?company_id={company.id}&month=3&year=2026',
+        f'/api/financial-summary/range?company_id={company.id}&from=2026-03&to=2026-03',
+        f'/api/chart-data?company_id={company.id}&type=bar&month=3&year=2026',
+    ]
+    # Enche a cache de resumos deste processo
+    first = {url: client.get(url) for url in urls}
+
+    # Escrita feita noutro worker: só muda a base de dados, não a cache deste processo
+    db.session.execute(update(MonthlySummary).values(
+        total_sales=250.0, profit=250.0, write_date=datetime.utcnow() - timedelta(minutes=30)
+    ))
+    db.session.commit()
+
+    for url, response in first.items():
+        changed = revalidate(client, url, response.headers['ETag'])
+        assert changed.status_code == 200
+        assert changed.headers['ETag'] != response.headers['ETag']
+        assert changed.get_json() != response.get_json()
+        assert revalidate(client, url, changed.headers['ETag']).status_code == 304
+
+    assert client.get(urls[0]).get_json()['summary']['total_sales'] == 250.0
+
+
+def test_employee_list_etag_sees_updates_and_deletes(client, company):
+    db.session.add_all([Employee('Ana', 1000.0, 'Técnica', company.id), Employee('Rui', 900.0, 'Técnico', company.id)])
+    db.session.commit()
+    age_rows(Employee)
+    url = f'/get-employees/{company.id}'
+
+    etag = client.get(url).headers['ETag']
+    assert revalidate(client, url, etag).status_code == 304
+
+    Employee.query.filter_by(name='Rui').delete()
+    db.session.commit()
+    after_delete = revalidate(client, url, etag)
+    assert after_delete.status_code == 200
+    assert len(after_delete.get_json()['employees']) == 1
+
+    etag = after_delete.headers['ETag']
+    db.session.execute(update(Employee).values(gross_salary=1100.0, write_date=datetime.utcnow() - timedelta(minutes=5)))
+    db.session.commit()
+    after_update = revalidate(client, url, etag)
+    assert after_update.status_code == 200
+    assert after_update.get_json()['employees'][0]['gross_salary'] == 1100.0
+
+
+def test_settings_and_company_are_conditional(client, company):
+    db.session.add(Settings(company.id, rent_value=500.0))
+    db.session.commit()
+    age_rows(Settings, Company)
+
+    for url in (f'/get-settings/{company.id}', f'/get-company/{company.id}'):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert revalidate(client, url, response.headers['ETag']).status_code == 304
+        assert revalidate(client, url, 'W/"outro"').status_code == 200
+
+
+def test_pie_chart_etag_follows_the_month_expenses(client, company):
+    expense = Expenses('despesa', 'Materiais de escritório', 50.0, 23.0, 9.35, 40.65, company.user_id, company.id)
+    expense.create_date = datetime(2026, 3, 10)
+    db.session.add(expense)
+    db.session.commit()
+    age_rows(Expenses)
+    url = f'/api/chart-data?company_id={company.id}&type=pie&month=3&year=2026'
+
+    etag = client.get(url).headers['ETag']
+    assert revalidate(client, url, etag).status_code == 304
+
+    db.session.execute(update(Expenses).values(create_date=datetime(2026, 4, 10), write_date=datetime.utcnow() - timedelta(minutes=5)))
+    db.session.commit()
+    assert revalidate(client, url, etag).status_code == 200
@@ -0,0 +1,78 @@
+"""
+Config Cache Tests
+==================
+
+Tests for the versioned Info/Settings cache.
+
+Usage:
+    python -m pytest test_config_cache.py
+"""
+
+import sys
+sys.dont_write_bytecode = True
+
+from datetime import date, timedelta
+
+from sqlalchemy import update
+
+from config_cache import ConfigCache, config_cache, current_version
+from extensions import db
+from instance.base import Settings
+
+
+def settings_selects(statements):
+    return [statement for statement in statements if 'FROM settings' in statement]
+
+
+def test_settings_are_read_once_while_the_version_holds(app, company, queries):
+    db.session.add(Settings(company.id, rent_value=500.0))
+    db.session.commit()
+    company_id = company.id
+
+    queries.clear()
+    first = config_cache.get_settings(company_id)
+    second = config_cache.get_settings(str(company_id))
+
+    assert first is second
+    assert second.rent_value == 500.0
+    assert len(settings_selects(queries)) == 1
+    assert len([statement for statement in queries if 'FROM config_version' in statement]) == 2
+    assert config_cache.stats()['hit_ratio'] == 0.5
+
+
+def test_save_settings_reaches_every_worker(client, company):
+    other_worker = ConfigCache()
+    assert other_worker.get_settings(company.id) is None
+    version = current_version('settings')
+
+    response = client.post('/save-settings', data={
+        'company_id': company.id, 'total_insurance_value': 10.0, 'rent_value': 750.0,
+        'employee_insurance_value': 5.0, 'preferred_salary_expense_day': 8,
+    })
+    assert response.get_json()['success']
+
+    assert current_version('settings') == version + 1
+    assert other_worker.get_settings(company.id).rent_value == 750.0
+    assert client.get(f'/get-settings/{company.id}').get_json()['settings']['rent_value'] == 750.0
+
+
+def test_bulk_update_bumps_the_version(app, company):
+    db.session.add(Settings(company.id, rent_value=500.0))
+    db.session.commit()
+    assert config_cache.get_settings(company.id).rent_value == 500.0
+
+    db.session.execute(update(Settings).values(rent_value=600.0))
+    db.session.commit()
+    assert config_cache.get_settings(company.id).rent_value == 600.0
+
+
+def test_smodal_follows_saved_info(client):
+    assert client.get('/smodal').get_json() == {'show': False}
+
+    client.post('/save-info-settings', data={
+        'payment_vps_date': (date.today() + timedelta(days=10)).strftime('%Y-%m-%d'),
+        'subscription_type_vps': 'mensal',
+    })
+
+    assert client.get('/smodal').get_json()['show'] is True
+    assert client.get('/api/cache-stats').get_json()['config_cache']['entries'] == 1
@@ -0,0 +1,268 @@
+"""
+Dashboard API Tests
+===================
+
+Tests for the JSON endpoints consumed by the dashboard viewer.
+
+Usage:
+    python -m pytest test_dashboard_api.py
+"""
+
+import sys
+sys.dont_write_bytecode = True
+
+import json
+import re
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from extensions import db
+from instance.base import Employee, Expenses, MonthlySummary, Settings
+
+
+def add_summary(company, year, month, sales=0.0, costs=0.0, vat=0.0, salaries=0.0):
+    summary = MonthlySummary(
+        month=month,
+        year=year,
+        company_id=company.id,
+        total_sales=sales,
+        total_vat=vat,
+        total_costs=costs,
+        profit=sales - costs
+    )
+    summary.total_employee_salaries = salaries
+    db.session.add(summary)
+    db.session.commit()
+    return summary
+
+
+def test_financial_summary_range_returns_every_month(client, company):
+    add_summary(company, 2025, 12, sales=100.0, costs=50.0, vat=10.0)
+    add_summary(company, 2026, 1, sales=150.0, costs=40.0, vat=20.0)
+    add_summary(company, 2026, 3, sales=300.0, costs=90.0, vat=30.0)
+
+    response = client.get(f'/api/financial-summary/range?company_id={company.id}&from=2026-01&to=2026-03')
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert [(m['year'], m['month']) for m in data['months']] == [(2026, 1), (2026, 2), (2026, 3)]
+
+    january, february, march = (m['summary'] for m in data['months'])
+    assert january['total_sales'] == 150.0
+    assert january['sales_change'] == 50.0
+    assert january['vat_change'] == 100.0
+    assert february == {}
+    assert march['total_sales'] == 300.0
+    assert 'sales_change' not in march
+
+
+def test_financial_summary_range_matches_single_month_endpoint(client, company):
+    add_summary(company, 2026, 4, sales=80.0, costs=20.0, vat=8.0, salaries=10.0)
+    add_summary(company, 2026, 5, sales=120.0, costs=60.0, vat=12.0, salaries=15.0)
+
+    single = client.get(f'/api/financial-summary?company_id={company.id}&month=5&year=2026').get_json()
+    ranged = client.get(f'/api/financial-summary/range?company_id={company.id}&from=2026-05&to=2026-05').get_json()
+
+    assert ranged['months'][0]['summary'] == single['summary']
+
+
+def test_financial_summary_range_rejects_invalid_ranges(client, company):
+    for query in ('from=2026-05&to=2026-01', 'from=2026-13&to=2027-01', 'from=2020-01&to=2026-01', 'to=2026-01'):
+        response = client.get(f'/api/financial-summary/range?company_id={company.id}&{query}')
+        assert response.status_code == 400
+
+
+def summary_selects(statements):
+    """Data SELECTs, leaving out the user loader and the ETag validator probes."""
+    return [
+        s for s in statements
+        if s.lstrip().upper().startswith('SELECT') and 'FROM user' not in s and 'count(*)' not in s
+        and 'SELECT config_version.name' not in s
+    ]
+
+
+def test_chart_data_loads_six_months_with_one_select(client, company, queries):
+    add_summary(company, 2025, 11, sales=500.0, costs=100.0)
+    add_summary(company, 2026, 2, sales=200.0, costs=50.0, salaries=30.0)
+    url = f'/api/chart-data?company_id={company.id}&type=bar&month=3&year=2026'
+    queries.clear()
+
+    response = client.get(url)
+    data = response.get_json()['chartData']
+
+    assert len(summary_selects(queries)) == 1
+    assert data['labels'] == ['Out', 'Nov', 'Dez', 'Jan', 'Fev', 'Mar']
+    assert data['datasets'][0]['data'] == [0, 500, 0, 0, 200, 0]
+    assert data['datasets'][1]['data'] == [0, 100, 0, 0, 20, 0]
+    assert data['datasets'][2]['data'] == [0, 0, 0, 0, 30, 0]
+
+
+def test_chart_data_long_series_still_one_select(client, company, queries):
+    add_summary(company, 2023, 4, sales=10.0)
+    add_summary(company, 2026, 3, sales=20.0, costs=5.0)
+    url = f'/api/chart-data?company_id={company.id}&type=line&month=3&year=2026&months=36'
+    queries.clear()
+
+    response = client.get(url)
+    data = response.get_json()['chartData']
+
+    assert len(summary_selects(queries)) == 1
+    assert len(data['labels']) == 36
+    assert data['labels'][0] == 'Abr/23'
+    assert data['datasets'][0]['data'][0] == 10
+    assert data['datasets'][0]['data'][-1] == 15
+
+
+def test_chart_data_caps_months(client, company):
+    response = client.get(f'/api/chart-data?company_id={company.id}&type=bar&month=3&year=2026&months=500')
+
+    assert len(response.get_json()['chartData']['labels']) == 36
+
+
+def add_expense(company, description, gross_value, transaction_type='despesa'):
+    expense = Expenses(transaction_type, description, gross_value, 0.0, 0.0, gross_value, company.user_id, company.id)
+    expense.create_date = datetime(2026, 3, 15)
+    db.session.add(expense)
+    db.session.commit()
+
+
+def test_chart_pie_groups_in_sql_with_top_categories(client, company):
+    for index in range(10):
+        add_expense(company, f'Categoria{index} fornecedor', 100.0 - index)
+        add_expense(company, f'Categoria{index}', 1.0)
+    add_expense(company, 'Venda', 500.0, transaction_type='ganho')
+
+    response = client.get(f'/api/chart-data?company_id={company.id}&type=pie&month=3&year=2026')
+    chart = response.get_json()['chartData']
+
+    assert chart['labels'] == [f'Categoria{index}' for index in range(8)] + ['Outros']
+    assert chart['datasets'][0]['data'][0] == 101.0
+    assert chart['datasets'][0]['data'][-1] == (92.0 + 1.0) + (91.0 + 1.0)
+
+
+def test_dashboard_bootstrap_matches_the_individual_endpoints(client, company):
+    add_summary(company, 2026, 2, sales=200.0, costs=50.0, vat=20.0, salaries=30.0)
+    add_summary(company, 2026, 3, sales=300.0, costs=90.0, vat=30.0, salaries=30.0)
+    db.session.add(Settings(company.id, rent_value=400.0))
+    db.session.add(Employee('Ana', 1237.5, 'Técnica', company.id, social_security_rate=11.0,
+                            employer_social_security_rate=23.75, irs_rate=10.0))
+    db.session.add(Employee('Rui', 900.0, 'Estagiário', company.id, is_active=False))
+    db.session.commit()
+    query = f'company_id={company.id}&month=3&year=2026'
+
+    dashboard = client.get(f'/api/dashboard/{company.id}?month=3&year=2026').get_json()['dashboard']
+
+    assert dashboard['summary'] == client.get(f'/api/financial-summary?{query}').get_json()['summary']
+    for chart_type in ('bar', 'line'):
+        chart = client.get(f'/api/chart-data?{query}&type={chart_type}').get_json()['chartData']
+        assert dashboard['charts'][chart_type] == chart
+    assert dashboard['settings'] == client.get(f'/get-settings/{company.id}').get_json()['settings']
+    assert [employee['name'] for employee in dashboard['employees']['active']] == ['Ana']
+    assert dashboard['employees']['totals'] == {
+        'gross_salary': 1000.0, 'employee_social_security': 110.0, 'employer_social_security': 237.5,
+        'irs': 100.0, 'net_salary': 790.0, 'count': 1, 'total_cost': 1237.5,
+    }
+
+
+def test_dashboard_bootstrap_reads_each_table_once(client, company, queries):
+    add_summary(company, 2026, 3, sales=300.0)
+    queries.clear()
+
+    response = client.get(f'/api/dashboard/{company.id}?month=3&year=2026')
+
+    assert response.status_code == 200
+    tables = [statement.split('FROM ')[1].split()[0] for statement in summary_selects(queries)]
+    assert sorted(tables) == ['company', 'config_version', 'employee', 'monthly_summary', 'settings']
+
+
+def test_dashboard_bootstrap_follows_writes_from_other_workers(client, company):
+    add_summary(company, 2026, 3, sales=300.0)
+    db.session.execute(update(MonthlySummary).values(write_date=datetime.utcnow() - timedelta(hours=1)))
+    db.session.commit()
+    url = f'/api/dashboard/{company.id}?month=3&year=2026'
+    first = client.get(url)
+
+    # Escrita feita noutro worker: a cache de resumos deste processo não é invalidada
+    db.session.execute(update(MonthlySummary).values(
+        total_sales=450.0, write_date=datetime.utcnow() - timedelta(minutes=30)
+    ))
+    db.session.commit()
+
+    changed = client.get(url, headers={'If-None-Match': first.headers['ETag']})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != first.headers['ETag']
+    assert changed.get_json()['dashboard']['summary']['total_sales'] == 450.0
+    assert changed.get_json()['dashboard']['charts']['bar']['datasets'][0]['data'][-1] == 450
+    assert client.get(url, headers={'If-None-Match': changed.headers['ETag']}).status_code == 304
+
+
+def test_dashboard_etag_changes_when_the_default_month_rolls_over(client, company, monkeypatch):
+    import app as app_module
+
+    class Clock(datetime):
+        current = datetime(2026, 3, 31, 23, 59, 59)
+
+        @classmethod
+        def now(cls, tz=None):
+            return cls.current
+
+    add_summary(company, 2026, 3, sales=300.0)
+    add_summary(company, 2026, 4, sales=120.0)
+    monkeypatch.setattr(app_module, 'datetime', Clock)
+    url = f'/api/dashboard/{company.id}'
+
+    march = client.get(url)
+    assert march.get_json()['dashboard']['month'] == 3
+    assert client.get(url, headers={'If-None-Match': march.headers['ETag']}).status_code == 304
+
+    Clock.current = datetime(2026, 4, 1, 0, 0, 0)
+    april = client.get(url, headers={'If-None-Match': march.headers['ETag']})
+    assert april.status_code == 200
+    assert april.get_json()['dashboard']['month'] == 4
+    assert april.get_json()['dashboard']['summary']['total_sales'] == 120.0
+
+
+def test_dashboard_bootstrap_rejects_bad_input(client, company):
+    assert client.get('/api/dashboard/999').status_code == 404
+    assert client.get(f'/api/dashboard/{company.id}?month=13&year=2026').status_code == 400
+
+
+def embedded_dashboard(response):
+    match = re.search(r'<script id="initialDashboardData" type="application/json">(.*?)</script>',
+                      response.get_data(as_text=True), re.S)
+    return json.loads(match.group(1)) if match else None
+
+
+def test_dashboard_page_embeds_the_current_month(client, company, monkeypatch):
+    today = datetime.now()
+    add_summary(company, today.year, today.month, sales=300.0, costs=90.0)
+    db.session.add(Employee('</script><b>Ana</b>', 1000.0, 'Técnica', company.id))
+    db.session.commit()
+
+    embedded = embedded_dashboard(client.get(f'/dashboard/{company.id}'))
+    api = client.get(f'/api/dashboard/{company.id}').get_json()['dashboard']
+
+    assert embedded == api
+    assert (embedded['year'], embedded['month']) == (today.year, today.month)
+    assert embedded['summary']['total_sales'] == 300.0
+    assert embedded['employees']['active'][0]['name'] == '</script><b>Ana</b>'
+
+    monkeypatch.setitem(client.application.config, 'DASHBOARD_EMBED_INITIAL_DATA', False)
+    assert embedded_dashboard(client.get(f'/dashboard/{company.id}')) is None
+
+
+def test_dashboard_page_reload_shows_writes_from_other_workers(client, company):
+    today = datetime.now()
+    add_summary(company, today.year, today.month, sales=300.0)
+    db.session.execute(update(MonthlySummary).values(write_date=datetime.utcnow() - timedelta(hours=1)))
+    db.session.commit()
+    assert embedded_dashboard(client.get(f'/dashboard/{company.id}'))['summary']['total_sales'] == 300.0
+
+    # Lançamento gravado noutro worker: só a base de dados muda
+    db.session.execute(update(MonthlySummary).values(
+        total_sales=420.0, write_date=datetime.utcnow() - timedelta(minutes=30)
+    ))
+    db.session.commit()
+
+    assert embedded_dashboard(client.get(f'/dashboard/{company.id}'))['summary']['total_sales'] == 420.0
@@ -0,0 +1,238 @@
+"""
+Monthly Summary Tests
+=====================
+
+Tests for the incremental MonthlySummary / SimpleMonthlySummary updates
+applied by the ledger routes.
+
+Usage:
+    python -m pytest test_monthly_summary.py
+"""
+
+import sys
+sys.dont_write_bytecode = True
+
+import os
+import subprocess
+from datetime import datetime
+
+from sqlalchemy import create_engine, func, select
+
+from extensions import db
+from instance.base import User, Company, Expenses, MonthlySummary, SimpleExpenses, SimpleMonthlySummary
+
+BASEDIR = os.path.abspath(os.path.dirname(__file__))
+
+
+def expense_form(company, transaction_type, gross_value, iva_rate=23.0):
+    net_value = round(gross_value / (1 + iva_rate / 100), 2)
+    return {
+        'company_id': company.id,
+        'transaction_type': transaction_type,
+        'description': 'Teste',
+        'gross_value': gross_value,
+        'iva_rate': iva_rate,
+        'iva_value': round(gross_value - net_value, 2),
+        'net_value': net_value,
+    }
+
+
+def current_summary(model, company_id):
+    now = datetime.utcnow()
+    db.session.expire_all()
+    return model.query.filter_by(company_id=company_id, year=now.year, month=now.month).first()
+
+
+def current_value(company_id, year, month, column):
+    db.session.expire_all()
+    summary = MonthlySummary.query.filter_by(company_id=company_id, year=year, month=month).first()
+    return getattr(summary, column)
+
+
+def test_add_update_delete_keep_summary_in_sync(client, company):
+    company_id = company.id
+
+    client.post('/add-expenses', data=expense_form(company, 'ganho', 123.0))
+    client.post('/add-expenses', data=expense_form(company, 'despesa', 61.5))
+
+    summary = current_summary(MonthlySummary, company_id)
+    assert summary.total_sales == 123.0
+    assert summary.total_sales_without_vat == 100.0
+    assert summary.total_costs == 61.5
+    assert summary.total_costs_without_vat == 50.0
+    assert summary.total_vat == 23.0 - 11.5
+    assert summary.profit == 123.0 - 61.5
+    assert summary.profit_without_vat == 50.0
+
+    expense = Expenses.query.filter_by(company_id=company_id, transaction_type='despesa').first()
+    client.post(f'/update-expense/{expense.id}', data=expense_form(company, 'ganho', 61.5))
+
+    summary = current_summary(MonthlySummary, company_id)
+    assert summary.total_sales == 184.5
+    assert summary.total_costs == 0.0
+    assert summary.total_vat == 34.5
+    assert summary.profit == 184.5
+
+    response = client.post(f'/delete-expense/{expense.id}')
+    assert response.get_json()['success']
+
+    summary = current_summary(MonthlySummary, company_id)
+    assert summary.total_sales == 123.0
+    assert summary.profit == 123.0
+    assert MonthlySummary.query.filter_by(company_id=company_id).count() == 1
+
+
+def test_simple_ledger_updates_simple_summary(client, company):
+    company_id = company.id
+
+    client.post('/add-simple-expenses', data=expense_form(company, 'ganho', 246.0))
+    client.post('/add-simple-expenses', data=expense_form(company, 'despesa', 40.0, iva_rate=0.0))
+
+    summary = current_summary(SimpleMonthlySummary, company_id)
+    assert summary.total_sales == 246.0
+    assert summary.total_costs == 40.0
+    assert summary.profit == 206.0
+    assert summary.profit_without_vat == 200.0 - 40.0
+
+    expense = SimpleExpenses.query.filter_by(company_id=company_id, transaction_type='despesa').first()
+    client.post(f'/delete-simple-expense/{expense.id}')
+
+    summary = current_summary(SimpleMonthlySummary, company_id)
+    assert summary.total_costs == 0.0
+    assert summary.profit == 246.0
+
+
+def test_failed_summary_update_rolls_back_ledger_row(client, company, monkeypatch):
+    import app as app_module
+    company_id = company.id
+
+    def fail(expense):
+        raise RuntimeError('summary unavailable')
+
+    monkeypatch.setattr(app_module, 'update_monthly_summary', fail)
+    client.post('/add-expenses', data=expense_form(company, 'ganho', 10.0))
+
+    assert Expenses.query.filter_by(company_id=company_id).count() == 0
+
+
+WORKER = '''
+import sys
+sys.dont_write_bytecode = True
+from app import app, update_monthly_summary
+from extensions import db
+from instance.base import Expenses
+
+company_id, user_id, count, worker = map(int, sys.argv[1:5])
+
+with app.app_context():
+    for i in range(count):
+        transaction_type = 'ganho' if (i + worker) % 2 else 'despesa'
+        gross_value = float(worker + 1)
+        expense = Expenses(transaction_type, 'Stress', gross_value, 0.0, 0.0, gross_value, user_id, company_id)
+        db.session.add(expense)
+        db.session.flush()
+        update_monthly_summary(expense)
+        db.session.commit()
+'''
+
+
+def test_concurrent_workers_do_not_lose_summary_updates(tmp_path):
+    db_path = tmp_path / 'stress.db'
+    engine = create_engine(f'sqlite:///{db_path}')
+    db.metadata.create_all(engine)
+
+    with engine.begin() as conn:
+        user_id = conn.execute(User.__table__.insert().values(username='stress', type='Admin')).inserted_primary_key[0]
+        company_id = conn.execute(Company.__table__.insert().values(
+            name='Stress', location='', relationship_type='', user_id=user_id
+        )).inserted_primary_key[0]
+
+    workers, per_worker = 6, 40
+    env = dict(os.environ, FLASK_ENV='development', DATABASE_URI=f'sqlite:///{db_path}')
+    processes = [
+        subprocess.Popen(
+            [sys.executable, '-c', WORKER, str(company_id), str(user_id), str(per_worker), str(worker)],
+            cwd=BASEDIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+        for worker in range(workers)
+    ]
+    for process in processes:
+        _, stderr = process.communicate(timeout=120)
+        assert process.returncode == 0, stderr.decode()
+
+    expenses = Expenses.__table__
+    summaries = MonthlySummary.__table__
+    with engine.connect() as conn:
+        ledger = dict(conn.execute(
+            select(expenses.c.transaction_type, func.sum(expenses.c.gross_value))
+            .where(expenses.c.company_id == company_id)
+            .group_by(expenses.c.transaction_type)
+        ).all())
+        summary_rows = conn.execute(select(summaries).where(summaries.c.company_id == company_id)).all()
+
+    expected_total = sum(float(worker + 1) for worker in range(workers)) * per_worker
+    assert ledger['ganho'] + ledger['despesa'] == expected_total
+    assert len(summary_rows) == 1
+    summary = summary_rows[0]
+    assert summary.total_sales == ledger['ganho']
+    assert summary.total_costs == ledger['despesa']
+    assert summary.profit == ledger['ganho'] - ledger['despesa']
+
+
+def add_ledger_row(company, transaction_type, gross_value, create_date, description='Teste', net_value=None, iva_value=0.0):
+    expense = Expenses(
+        transaction_type, description, gross_value, 0.0, iva_value,
+        gross_value if net_value is None else net_value, company.user_id, company.id
+    )
+    expense.create_date = create_date
+    db.session.add(expense)
+    return expense
+
+
+def test_rebuild_recomputes_drifted_summaries(app, company):
+    from summary_rebuild import rebuild_summaries
+    company_id = company.id
+
+    add_ledger_row(company, 'ganho', 123.0, datetime(2026, 1, 5), net_value=100.0, iva_value=23.0)
+    add_ledger_row(company, 'Despesa', 50.0, datetime(2026, 1, 31, 23, 59, 59))
+    add_ledger_row(company, 'despesa', 900.0, datetime(2026, 1, 28), description='Salário: Ana - Gerente')
+    add_ledger_row(company, 'ganho', 10.0, datetime(2026, 2, 1))
+    drifted = MonthlySummary(month=1, year=2026, company_id=company_id, total_sales=1.0)
+    stale = MonthlySummary(month=3, year=2026, company_id=company_id, total_sales=99.0, profit=99.0)
+    db.session.add_all([drifted, stale])
+    db.session.commit()
+
+    changes = rebuild_summaries('expenses', dry_run=True)
+    assert [key for key, _ in changes] == [(company_id, 2026, 1), (company_id, 2026, 2), (company_id, 2026, 3)]
+    assert current_value(company_id, 2026, 1, 'total_sales') == 1.0
+
+    rebuild_summaries('expenses')
+
+    january = MonthlySummary.query.filter_by(company_id=company_id, year=2026, month=1).one()
+    assert january.total_sales == 123.0
+    assert january.total_sales_without_vat == 100.0
+    assert january.total_vat == 23.0
+    assert january.total_costs == 950.0
+    assert january.total_costs_without_vat == 950.0
+    assert january.total_employee_salaries == 900.0
+    assert january.profit == 123.0 - 950.0
+    assert current_value(company_id, 2026, 2, 'total_sales') == 10.0
+    assert current_value(company_id, 2026, 3, 'total_sales') == 0.0
+    assert rebuild_summaries('expenses', dry_run=True) == []
+
+
+def test_rebuild_respects_company_and_period_scope(app, company, user):
+    from summary_rebuild import rebuild_summaries
+    other = Company(name='Outra', location='', relationship_type='', user_id=user.id)
+    db.session.add(other)
+    db.session.flush()
+
+    add_ledger_row(company, 'ganho', 10.0, datetime(2026, 1, 10))
+    add_ledger_row(company, 'ganho', 20.0, datetime(2026, 2, 10))
+    add_ledger_row(other, 'ganho', 30.0, datetime(2026, 1, 10))
+    db.session.commit()
+
+    rebuild_summaries('expenses', company_id=company.id, start=(2026, 2), end=(2026, 2))
+
+    assert MonthlySummary.query.count() == 1
+    assert current_value(company.id, 2026, 2, 'total_sales') == 20.0
@@ -0,0 +1,197 @@
+"""
+Ledger Pagination Tests
+=======================
+
+Tests for the (create_date, id) keyset pagination used by the /expenses and
+/simple-sales pages.
+
+Usage:
+    python -m pytest test_pagination.py
+"""
+
+import sys
+sys.dont_write_bytecode = True
+
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from extensions import db
+from instance.base import Expenses, SimpleExpenses
+from pagination import keyset_paginate, encode_cursor, decode_cursor, invalidate_counts, store_count, _count_cache
+
+
+def add_rows(model, company, count, start=datetime(2025, 3, 1, 9, 0)):
+    for index in range(count):
+        row = model('ganho', f'Linha {index}', 10.0, 0.0, 0.0, 10.0, company.user_id, company.id)
+        # Metade das linhas com microssegundos, metade em múltiplos exatos de hora
+        row.create_date = start + timedelta(hours=index // 2, microseconds=(index % 2) * 1500)
+        db.session.add(row)
+    db.session.commit()
+
+
+def walk_forward(model, company, per_page, **kwargs):
+    pages = [keyset_paginate(model, company.id, per_page=per_page, **kwargs)]
+    while pages[-1].next_cursor:
+        pages.append(keyset_paginate(model, company.id, per_page=per_page, after=pages[-1].next_cursor, **kwargs))
+    return pages
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor('2025-03-01 09:00:00.001500', 42)
+    assert decode_cursor(cursor) == ('2025-03-01 09:00:00.001500', 42)
+    assert decode_cursor('não-é-um-cursor') is None
+    assert decode_cursor(None) is None
+
+
+def test_pages_cover_every_row_once_in_order(company):
+    add_rows(Expenses, company, 25)
+
+    pages = walk_forward(Expenses, company, per_page=10)
+    ids = [row.id for page in pages for row in page.items]
+
+    expected = [row.id for row in Expenses.query.order_by(Expenses.create_date.desc(), Expenses.id.desc())]
+    assert ids == expected
+    assert [len(page.items) for page in pages] == [10, 10, 5]
+    assert not pages[0].has_prev and pages[-1].has_prev
+    assert pages[0].total == 25
+
+
+def test_before_cursor_returns_previous_page(company):
+    add_rows(Expenses, company, 25)
+
+    pages = walk_forward(Expenses, company, per_page=10)
+    previous = keyset_paginate(Expenses, company.id, per_page=10, before=pages[2].prev_cursor)
+    assert [row.id for row in previous.items] == [row.id for row in pages[1].items]
+
+    first = keyset_paginate(Expenses, company.id, per_page=10, before=previous.prev_cursor)
+    assert [row.id for row in first.items] == [row.id for row in pages[0].items]
+    assert not first.has_prev and first.prev_cursor is None
+
+
+def test_stale_cursor_falls_back_to_first_page(company):
+    add_rows(Expenses, company, 3)
+
+    page = keyset_paginate(Expenses, company.id, per_page=10, after=encode_cursor('2000-01-01', 1))
+    assert len(page.items) == 3
+    assert not page.has_prev
+
+
+def test_count_modes(app, company):
+    add_rows(SimpleExpenses, company, 4)
+    try:
+        app.config['LEDGER_COUNT_MODE'] = 'skip'
+        assert keyset_paginate(SimpleExpenses, company.id).total is None
+
+        app.config['LEDGER_COUNT_MODE'] = 'cached'
+        assert keyset_paginate(SimpleExpenses, company.id).total == 4
+        add_rows(SimpleExpenses, company, 1)
+        assert keyset_paginate(SimpleExpenses, company.id).total == 4
+
+        invalidate_counts(SimpleExpenses, company.id)
+        assert keyset_paginate(SimpleExpenses, company.id).total == 5
+    finally:
+        app.config['LEDGER_COUNT_MODE'] = 'cached'
+        _count_cache.clear()
+
+
+def test_count_cache_drops_expired_and_oldest_entries():
+    now = time.monotonic()
+    try:
+        store_count(('expenses', 1, None), now - 1, 10, max_entries=3)
+        store_count(('expenses', 2, None), now + 60, 20, max_entries=3)
+        # A primeira já tinha expirado: sai na escrita seguinte
+        assert list(_count_cache) == [('expenses', 2, None)]
+
+        for company_id in range(3, 6):
+            store_count(('expenses', company_id, None), now + 60, company_id, max_entries=3)
+        assert list(_count_cache) == [('expenses', 3, None), ('expenses', 4, None), ('expenses', 5, None)]
+    finally:
+        _count_cache.clear()
+
+
+def test_simple_sales_page_links_keep_month(client, company):
+    add_rows(SimpleExpenses, company, 120)
+
+    response = client.get(f'/simple-sales/{company.id}?month=3&year=2025')
+    body = response.get_data(as_text=True)
+
+    assert response.status_code == 200
+    assert 'after=' in body and 'month=3' in body
+    assert '120 transações' in body
+
+
+def fetch_transactions(client, company, **params):
+    params = {'company_id': company.id, 'month': 3, 'year': 2025, **params}
+    return client.get('/api/transactions', query_string=params)
+
+
+def test_api_transactions_walks_pages_with_cursor(client, company):
+    add_rows(Expenses, company, 7)
+
+    seen, cursor = [], None
+    while True:
+        data = fetch_transactions(client, company, limit=3, **({'cursor': cursor} if cursor else {})).get_json()
+        seen.extend(row['id'] for row in data['transactions'])
+        assert data['total'] == 7
+        cursor = data['next_cursor']
+        if not cursor:
+            break
+
+    assert sorted(seen) == sorted(row.id for row in Expenses.query)
+    assert len(seen) == 7
+
+
+def test_api_transactions_type_filter_is_exact(client, company):
+    add_rows(Expenses, company, 2)
+    cost = Expenses('despesa', 'Renda', 50.0, 0.0, 0.0, 50.0, company.user_id, company.id)
+    cost.create_date = datetime(2025, 3, 10)
+    db.session.add(cost)
+    db.session.commit()
+
+    data = fetch_transactions(client, company, type='despesa').get_json()
+    assert [row['id'] for row in data['transactions']] == [cost.id]
+
+    assert fetch_transactions(client, company, type='desp').status_code == 400
+
+
+def test_api_transactions_sort_by_amount(client, company):
+    for index, value in enumerate([30.0, 10.0, 20.0, 20.0]):
+        row = Expenses('ganho', f'Venda {index}', value, 0.0, 0.0, value, company.user_id, company.id)
+        row.create_date = datetime(2025, 3, index + 1)
+        db.session.add(row)
+    db.session.commit()
+
+    first = fetch_transactions(client, company, sort='amount', limit=2).get_json()
+    second = fetch_transactions(client, company, sort='amount', limit=2, cursor=first['next_cursor']).get_json()
+
+    values = [row['gross_value'] for row in first['transactions'] + second['transactions']]
+    assert values == [30.0, 20.0, 20.0, 10.0]
+    assert second['next_cursor'] is None
+
+    assert fetch_transactions(client, company, sort='description').status_code == 400
+
+
+def test_api_transactions_rejects_a_cursor_from_another_sort(client, company):
+    add_rows(Expenses, company, 5)
+
+    by_date = fetch_transactions(client, company, limit=2).get_json()
+    by_amount = fetch_transactions(client, company, sort='amount', limit=2).get_json()
+
+    assert fetch_transactions(client, company, sort='amount', cursor=by_date['next_cursor']).status_code == 400
+    assert fetch_transactions(client, company, before=by_amount['next_cursor']).status_code == 400
+    # Cursores sem ordenação (emitidos antes desta verificação) também são recusados
+    legacy = encode_cursor(*decode_cursor(by_amount['next_cursor']))
+    assert fetch_transactions(client, company, sort='amount', cursor=legacy).status_code == 400
+    assert fetch_transactions(client, company, sort='amount', cursor=by_amount['next_cursor']).status_code == 200
+
+
+def test_amount_sort_uses_the_gross_value_index(app, company):
+    plan = db.session.execute(text(
+        "EXPLAIN QUERY PLAN SELECT id FROM expenses WHERE company_id = :company_id "
+        "AND (gross_value, id) < (50, 10) ORDER BY gross_value DESC, id DESC LIMIT 3"
+    ), {'company_id': company.id}).all()
+    details = ' '.join(row[-1] for row in plan)
+    assert 'ix_expenses_company_gross_value' in details
+    assert 'TEMP B-TREE' not in details
@@ -0,0 +1,87 @@
+"""
+Period Filter Tests
+===================
+
+Tests for the half-open month and date-range filters on the ledgers'
+create_date, at the exact instants around each month boundary and for both
+ways SQLite stores a DateTime (ORM text with microseconds, CURRENT_TIMESTAMP
+text without).
+
+Usage:
+    python -m pytest test_periods.py
+"""
+
+import sys
+sys.dont_write_bytecode = True
+
+from datetime import datetime
+
+from sqlalchemy import select, text, type_coerce, String
+
+from extensions import db
+from instance.base import Expenses
+from periods import date_range_filter, month_bounds, month_filter
+
+APRIL_EDGES = {
+    'last_of_march': datetime(2026, 3, 31, 23, 59, 59, 999999),
+    'first_of_april': datetime(2026, 4, 1, 0, 0, 0),
+    'last_of_april': datetime(2026, 4, 30, 23, 59, 59, 999999),
+    'first_of_may': datetime(2026, 5, 1, 0, 0, 0),
+}
+
+
+def add_expenses(company, dates):
+    for description, create_date in dates.items():
+        expense = Expenses('despesa', description, 10.0, 0.0, 0.0, 10.0, company.user_id, company.id)
+        expense.create_date = create_date
+        db.session.add(expense)
+    db.session.commit()
+
+
+def matching(*criteria):
+    return sorted(db.session.execute(select(Expenses.description).where(*criteria)).scalars())
+
+
+def test_month_filter_edges_with_microseconds(company):
+    add_expenses(company, APRIL_EDGES)
+
+    stored = db.session.execute(
+        select(type_coerce(Expenses.create_date, String)).where(Expenses.description == 'first_of_april')
+    ).scalar()
+    assert stored == '2026-04-01 00:00:00.000000'
+
+    assert matching(month_filter(Expenses.create_date, 2026, 4)) == ['first_of_april', 'last_of_april']
+    assert matching(month_filter(Expenses.create_date, 2026, 3)) == ['last_of_march']
+    assert matching(month_filter(Expenses.create_date, 2026, 5)) == ['first_of_may']
+
+
+def test_month_filter_edges_with_current_timestamp_text(company):
+    # Linhas gravadas com CURRENT_TIMESTAMP do SQLite: texto sem microssegundos
+    for description, stamp in (('last_of_march', '2026-03-31 23:59:59'), ('first_of_april', '2026-04-01 00:00:00'),
+                               ('last_of_april', '2026-04-30 23:59:59'), ('first_of_may', '2026-05-01 00:00:00')):
+        db.session.execute(text(
+            "INSERT INTO expenses (transaction_type, description, gross_value, iva_rate, iva_value, net_value, "
+            "user_id, company_id, create_date) VALUES ('despesa', :description, 10, 0, 0, 10, :user_id, :company_id, :stamp)"
+        ), {'description': description, 'user_id': company.user_id, 'company_id': company.id, 'stamp': stamp})
+    db.session.commit()
+
+    assert matching(month_filter(Expenses.create_date, 2026, 4)) == ['first_of_april', 'last_of_april']
+    assert matching(month_filter(Expenses.create_date, 2026, 3)) == ['last_of_march']
+
+
+def test_year_boundary_and_date_range(company):
+    add_expenses(company, {
+        'last_of_2025': datetime(2025, 12, 31, 23, 59, 59, 999999),
+        'new_year': datetime(2026, 1, 1, 0, 0, 0),
+        'mid_january': datetime(2026, 1, 15, 12, 30, 0, 1),
+    })
+
+    assert month_bounds(2025, 12) == (datetime(2025, 12, 1), datetime(2026, 1, 1))
+    assert matching(month_filter(Expenses.create_date, 2025, 12)) == ['last_of_2025']
+    assert matching(month_filter(Expenses.create_date, 2026, 1)) == ['mid_january', 'new_year']
+
+    # Só a data conta: [1 jan, 15 jan) exclui tudo o que foi gravado no dia 15
+    assert matching(date_range_filter(Expenses.create_date, datetime(2026, 1, 1), datetime(2026, 1, 15))) == ['new_year']
+    assert matching(date_range_filter(Expenses.create_date, datetime(2026, 1, 1), datetime(2026, 1, 16))) == [
+        'mid_january', 'new_year'
+    ]
@@ -0,0 +1,191 @@
+"""
+Salary Automation Tests
+=======================
+
+Tests for the monthly salary and fixed-expense run in salary_automation.
+
+Usage:
+    python -m pytest test_salary_automation.py
+"""
+
+import sys
+sys.dont_write_bytecode = True
+
+import logging
+import os
+import subprocess
+from datetime import date, datetime
+
+from sqlalchemy import create_engine, func, select
+
+import salary_automation
+from extensions import db
+from instance.base import AutomatedPosting, User, Company, Employee, Expenses, MonthlySummary, Settings
+from salary_automation import process_company_expenses, claim_postings, build_fixed_expense_postings, backfill_fixed_expenses
+from summary_rebuild import rebuild_summaries
+
+BASEDIR = os.path.abspath(os.path.dirname(__file__))
+
+RUN_DATE = datetime(2026, 3, 31, 9, 0)
+
+
+def setup_company(company, employees=3):
+    settings = Settings(company.id, total_insurance_value=80.0, rent_value=1230.0, employee_insurance_value=45.0, other_expenses=20.0)
+    db.session.add(settings)
+    for index in range(employees):
+        db.session.add(Employee(f'Funcionário {index}', 1000.0 + index, 'Técnico', company.id))
+    db.session.commit()
+    return settings
+
+
+def test_run_posts_every_row_in_one_transaction(company, queries):
+    settings = setup_company(company, employees=50)
+    queries.clear()
+
+    posted = process_company_expenses(company, settings, RUN_DATE, db)
+
+    assert sum(1 for statement in queries if statement.startswith('INSERT INTO expenses')) == 1
+    assert sum(1 for statement in queries if statement.startswith('INSERT INTO automated_posting')) == 1
+    assert sum(1 for statement in queries if 'FROM automated_posting' in statement) == 1
+    assert not any('FROM expenses' in statement for statement in queries)
+
+    assert posted == 54
+    assert Expenses.query.count() == 54
+
+    summary = MonthlySummary.query.filter_by(company_id=company.id, year=2026, month=3).one()
+    salaries = sum(1000.0 + index for index in range(50))
+    assert summary.total_employee_salaries == salaries
+    assert summary.total_employee_insurance == 45.0
+    assert round(summary.total_costs, 2) == round(salaries + 1230.0 + 45.0 + 80.0 + 20.0, 2)
+    assert round(summary.total_vat, 2) == -230.0
+    assert round(summary.profit, 2) == -round(summary.total_costs, 2)
+
+
+def test_second_run_posts_only_missing_rows(company):
+    settings = setup_company(company)
+    process_company_expenses(company, settings, RUN_DATE, db)
+
+    assert process_company_expenses(company, settings, RUN_DATE, db) == 0
+
+    db.session.add(Employee('Nova Contratação', 900.0, 'Estagiária', company.id))
+    db.session.commit()
+    assert process_company_expenses(company, settings, RUN_DATE, db) == 1
+
+    assert Expenses.query.filter(Expenses.description.like('Salário: Nova Contratação%')).count() == 1
+
+
+def test_run_summary_matches_rebuild(company):
+    settings = setup_company(company)
+    process_company_expenses(company, settings, RUN_DATE, db)
+
+    assert rebuild_summaries('expenses', company_id=company.id, dry_run=True) == []
+
+
+def test_renamed_employee_is_not_posted_twice(company):
+    settings = setup_company(company, employees=1)
+    process_company_expenses(company, settings, RUN_DATE, db)
+
+    employee = Employee.query.one()
+    employee.name = 'Nome Corrigido'
+    db.session.commit()
+
+    assert process_company_expenses(company, settings, RUN_DATE, db) == 0
+    assert AutomatedPosting.query.filter_by(company_id=company.id, period='2026-03').count() == 5
+
+
+def test_claim_skips_items_posted_by_a_concurrent_run(company):
+    settings = setup_company(company, employees=0)
+    pending = build_fixed_expense_postings(company, settings, set(), RUN_DATE)
+    db.session.add(AutomatedPosting(company.id, '2026-03', 'rent', 1230.0))
+    db.session.commit()
+
+    claimed = claim_postings(company.id, '2026-03', pending)
+
+    assert claimed == {('employee_insurance', 0), ('company_insurance', 0), ('other_expenses', 0)}
+
+
+def test_backfill_posts_each_missed_month_on_its_salary_day(app, company):
+    settings = setup_company(company, employees=2)
+    settings.preferred_salary_expense_day = 99
+    db.session.commit()
+
+    stats = backfill_fixed_expenses(app, (2025, 12), (2026, 3), workers=1, now=datetime(2026, 3, 20))
+
+    assert stats['periods'] == 4
+    assert stats['rows'] == 3 * 6
+    assert stats['failures'] == 0
+    dates = {expense.create_date.date() for expense in Expenses.query}
+    assert dates == {date(2025, 12, 31), date(2026, 1, 31), date(2026, 2, 28)}
+    assert MonthlySummary.query.count() == 3
+
+    assert backfill_fixed_expenses(app, (2025, 12), (2026, 3), workers=1, now=datetime(2026, 3, 31, 12))['rows'] == 6
+
+
+def test_backfill_on_sqlite_uses_one_worker_and_logs_failures(app, company, monkeypatch, caplog):
+    setup_company(company, employees=1)
+    post = salary_automation.process_company_expenses
+
+    def fail_in_january(company, settings, run_at, db):
+        if run_at.month == 1:
+            raise RuntimeError('disco cheio')
+        return post(company, settings, run_at, db)
+
+    monkeypatch.setattr(salary_automation, 'process_company_expenses', fail_in_january)
+
+    with caplog.at_level(logging.INFO, logger='salary_automation'):
+        stats = backfill_fixed_expenses(app, (2025, 12), (2026, 2), workers=4, now=datetime(2026, 3, 20))
+
+    assert (stats['workers'], stats['failures'], stats['rows']) == (1, 1, 2 * 5)
+    errors = [record.getMessage() for record in caplog.records if record.levelno == logging.ERROR]
+    assert errors == [f"Erro ao lançar despesas fixas da empresa {company.id} (Empresa Teste) em 01/2026: disco cheio"]
+
+
+def test_post_fixed_expenses_command_reports_throughput(app, company):
+    setup_company(company, employees=1)
+
+    result = app.test_cli_runner().invoke(args=[
+        'post-fixed-expenses', '--from', '2026-01', '--to', '2026-02', '--company', str(company.id), '--workers', '1'
+    ])
+
+    assert result.exit_code == 0, result.output
+    assert '1 empresas x 2 meses: 10 lançamentos' in result.output
+    assert 'lançamentos/s, workers: 1' in result.output
+
+    result = app.test_cli_runner().invoke(args=['post-fixed-expenses', '--from', '2026-03', '--to', '2026-01'])
+    assert result.exit_code != 0
+
+
+WORKER_POOL_COMPANIES = 6
+
+
+def test_backfill_worker_pool_on_a_database_file(tmp_path):
+    db_path = tmp_path / 'backfill.db'
+    engine = create_engine(f'sqlite:///{db_path}')
+    db.metadata.create_all(engine)
+
+    with engine.begin() as conn:
+        user_id = conn.execute(User.__table__.insert().values(username='backfill', type='Admin')).inserted_primary_key[0]
+        for index in range(WORKER_POOL_COMPANIES):
+            company_id = conn.execute(Company.__table__.insert().values(
+                name=f'Empresa {index}', location='', relationship_type='', user_id=user_id, is_active=True
+            )).inserted_primary_key[0]
+            conn.execute(Settings.__table__.insert().values(
+                company_id=company_id, rent_value=100.0, total_insurance_value=0.0, employee_insurance_value=0.0,
+                other_expenses=0.0, preferred_salary_expense_day=1
+            ))
+            conn.execute(Employee.__table__.insert().values(name='Ana', gross_salary=1000.0, position='Técnica', company_id=company_id))
+
+    env = dict(os.environ, FLASK_ENV='development', DATABASE_URI=f'sqlite:///{db_path}', SCHEDULER_ENABLED='false')
+    command = [sys.executable, '-m', 'flask', '--app', 'app', 'post-fixed-expenses',
+               '--from', '2025-01', '--to', '2025-12', '--workers', '3', '--batch-size', '2']
+    for _ in range(2):
+        result = subprocess.run(command, cwd=BASEDIR, env=env, capture_output=True, text=True, timeout=120)
+        assert result.returncode == 0, result.stderr
+        assert 'workers: 1' in result.stdout
+
+    with engine.connect() as conn:
+        rows = conn.execute(select(func.count()).select_from(Expenses.__table__)).scalar()
+        summaries = conn.execute(select(func.count()).select_from(MonthlySummary.__table__)).scalar()
+
+    assert rows == WORKER_POOL_COMPANIES * 12 * 2
+    assert summaries == WORKER_POOL_COMPANIES * 12
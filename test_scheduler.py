@@ -0,0 +1,185 @@
+"""
+Scheduler Tests
+===============
+
+Tests for the single-leader fixed-expense scheduler in day_checker.
+
+Usage:
+    python -m pytest test_scheduler.py
+"""
+
+import sys
+sys.dont_write_bytecode = True
+
+import os
+import subprocess
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func, select, update
+
+import salary_automation
+from day_checker import JOB_NAME, acquire_lease, release_lease, pending_run_dates, next_run_at, run_due_jobs
+from extensions import db
+from instance.base import User, Company, Employee, Expenses, SchedulerState, Settings
+
+BASEDIR = os.path.abspath(os.path.dirname(__file__))
+
+
+def setup_company(company, salary_day):
+    db.session.add(Settings(company.id, rent_value=500.0, preferred_salary_expense_day=salary_day))
+    db.session.add(Employee('Ana', 1000.0, 'Técnica', company.id))
+    db.session.commit()
+
+
+def test_next_run_uses_wall_clock():
+    run_time = time(6, 0)
+    assert next_run_at(datetime(2026, 3, 10, 5, 59), run_time) == datetime(2026, 3, 10, 6, 0)
+    assert next_run_at(datetime(2026, 3, 10, 6, 0), run_time) == datetime(2026, 3, 11, 6, 0)
+
+
+def test_pending_run_dates_catch_up_is_capped():
+    assert pending_run_dates(None, date(2026, 3, 10), 31) == [date(2026, 3, 10)]
+    assert pending_run_dates(date(2026, 3, 7), date(2026, 3, 10), 31) == [date(2026, 3, 8), date(2026, 3, 9), date(2026, 3, 10)]
+    assert pending_run_dates(date(2026, 3, 10), date(2026, 3, 10), 31) == []
+    assert pending_run_dates(date(2025, 1, 1), date(2026, 3, 10), 2) == [date(2026, 3, 9), date(2026, 3, 10)]
+
+
+def test_lease_is_exclusive_until_it_expires(app):
+    now = datetime(2026, 3, 10, 6, 0)
+
+    assert acquire_lease(JOB_NAME, 'a:1', now, 60)
+    assert not acquire_lease(JOB_NAME, 'b:2', now + timedelta(seconds=30), 60)
+    assert acquire_lease(JOB_NAME, 'b:2', now + timedelta(seconds=61), 60)
+
+    release_lease(JOB_NAME, 'b:2')
+    assert acquire_lease(JOB_NAME, 'a:1', now + timedelta(seconds=62), 60)
+
+
+def test_run_catches_up_missed_salary_day(app, company):
+    setup_company(company, salary_day=8)
+    db.session.add(SchedulerState(JOB_NAME, last_run_date=date(2026, 3, 6)))
+    db.session.commit()
+
+    processed = run_due_jobs(app, now=datetime(2026, 3, 10, 7, 0))
+
+    assert processed == [date(2026, 3, 7), date(2026, 3, 8), date(2026, 3, 9), date(2026, 3, 10)]
+    posted = Expenses.query.filter_by(company_id=company.id).all()
+    assert len(posted) == 2
+    assert {expense.create_date.date() for expense in posted} == {date(2026, 3, 8)}
+    assert db.session.get(SchedulerState, JOB_NAME).last_run_date == date(2026, 3, 10)
+    assert db.session.get(SchedulerState, JOB_NAME).holder is None
+
+    assert run_due_jobs(app, now=datetime(2026, 3, 10, 8, 0)) == []
+
+
+def test_run_before_run_time_waits_for_the_day(app, company):
+    setup_company(company, salary_day=10)
+    db.session.add(SchedulerState(JOB_NAME, last_run_date=date(2026, 3, 9)))
+    db.session.commit()
+
+    assert run_due_jobs(app, now=datetime(2026, 3, 10, 5, 0)) == []
+    assert Expenses.query.count() == 0
+
+
+def second_company(company):
+    other = Company('Segunda', 'Porto', 'cliente', company.user_id)
+    db.session.add(other)
+    db.session.commit()
+    setup_company(other, salary_day=8)
+
+
+def lease_expiry():
+    db.session.expire_all()
+    return db.session.get(SchedulerState, JOB_NAME).lease_expires_at
+
+
+def test_lease_is_utc_and_renewed_for_each_company(app, company, monkeypatch):
+    setup_company(company, salary_day=8)
+    second_company(company)
+    db.session.add(SchedulerState(JOB_NAME, last_run_date=date(2026, 3, 6)))
+    db.session.commit()
+    post = salary_automation.process_company_expenses
+    seen = []
+
+    def slow_company(*args):
+        # Dia de catch-up demorado: o lease já teria expirado a meio
+        expiry = lease_expiry()
+        seen.append(expiry)
+        assert abs(expiry - datetime.utcnow() - timedelta(seconds=app.config['SCHEDULER_LEASE_SECONDS'])) < timedelta(seconds=5)
+        db.session.execute(update(SchedulerState).values(lease_expires_at=datetime.utcnow() - timedelta(seconds=1)))
+        db.session.commit()
+        return post(*args)
+
+    monkeypatch.setattr(salary_automation, 'process_company_expenses', slow_company)
+
+    assert run_due_jobs(app, now=datetime(2026, 3, 8, 7, 0)) == [date(2026, 3, 7), date(2026, 3, 8)]
+    assert len(seen) == 2
+    assert Expenses.query.count() == 4
+
+
+def test_run_stops_when_the_lease_is_taken(app, company, monkeypatch):
+    setup_company(company, salary_day=8)
+    second_company(company)
+    db.session.add(SchedulerState(JOB_NAME, last_run_date=date(2026, 3, 7)))
+    db.session.commit()
+    post = salary_automation.process_company_expenses
+
+    def lease_stolen(*args):
+        db.session.execute(update(SchedulerState).values(holder='outro:1'))
+        db.session.commit()
+        return post(*args)
+
+    monkeypatch.setattr(salary_automation, 'process_company_expenses', lease_stolen)
+
+    with pytest.raises(RuntimeError):
+        run_due_jobs(app, now=datetime(2026, 3, 8, 7, 0))
+    assert Expenses.query.count() == 2
+    state = db.session.get(SchedulerState, JOB_NAME)
+    assert (state.holder, state.last_run_date) == ('outro:1', date(2026, 3, 7))
+
+
+WORKER = '''
+import sys
+sys.dont_write_bytecode = True
+from datetime import datetime
+from app import app
+from day_checker import run_due_jobs
+
+print(len(run_due_jobs(app, now=datetime(2026, 3, 10, 7, 0))))
+'''
+
+
+def test_concurrent_schedulers_post_once(tmp_path):
+    db_path = tmp_path / 'scheduler.db'
+    engine = create_engine(f'sqlite:///{db_path}')
+    db.metadata.create_all(engine)
+
+    with engine.begin() as conn:
+        user_id = conn.execute(User.__table__.insert().values(username='leader', type='Admin')).inserted_primary_key[0]
+        company_id = conn.execute(Company.__table__.insert().values(
+            name='Leader', location='', relationship_type='', user_id=user_id
+        )).inserted_primary_key[0]
+        conn.execute(Settings.__table__.insert().values(
+            company_id=company_id, rent_value=500.0, total_insurance_value=0.0, employee_insurance_value=0.0,
+            other_expenses=0.0, preferred_salary_expense_day=10
+        ))
+        conn.execute(Employee.__table__.insert().values(name='Ana', gross_salary=1000.0, position='Técnica', company_id=company_id))
+
+    env = dict(os.environ, FLASK_ENV='development', DATABASE_URI=f'sqlite:///{db_path}', SCHEDULER_ENABLED='false')
+    processes = [
+        subprocess.Popen(
+            [sys.executable, '-c', WORKER],
+            cwd=BASEDIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        for _ in range(5)
+    ]
+    outputs = []
+    for process in processes:
+        stdout, stderr = process.communicate(timeout=120)
+        assert process.returncode == 0, stderr.decode()
+        outputs.append(int(stdout.decode().split()[-1]))
+
+    assert sorted(outputs) == [0, 0, 0, 0, 1]
+    with engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(Expenses.__table__)).scalar() == 2
@@ -0,0 +1,78 @@
+"""
+Serializer Tests
+================
+
+Tests for the model serializer registry and the orjson JSON provider.
+
+Usage:
+    python -m pytest test_serializers.py
+"""
+
+import sys
+sys.dont_write_bytecode = True
+
+import uuid
+from datetime import date, datetime
+
+import pytest
+from flask.json.provider import DefaultJSONProvider
+
+from extensions import db
+from instance.base import Employee, Expenses
+from json_provider import OrjsonProvider, configure_json
+from serializers import get_serializer
+
+
+def test_core_rows_and_orm_objects_serialize_alike(app, company):
+    expense = Expenses('despesa', 'Renda', 500.0, 23.0, 93.5, 406.5, company.user_id, company.id)
+    expense.create_date = datetime(2026, 3, 10, 8, 30)
+    db.session.add(expense)
+    db.session.commit()
+
+    serializer = get_serializer('transaction')
+    row = db.session.execute(serializer.select()).one()
+
+    assert serializer.dump_rows([row]) == [serializer.dump(expense)]
+    assert serializer.dump(expense)['create_date'] == '2026-03-10 08:30:00'
+
+
+def test_get_employees_selects_only_serialized_columns(client, company, queries):
+    db.session.add(Employee('Ana', 1000.0, 'Técnica', company.id, irs_rate=11.5))
+    db.session.commit()
+
+    queries.clear()
+    employees = client.get(f'/get-employees/{company.id}').get_json()['employees']
+
+    assert employees == [{
+        'id': 1, 'name': 'Ana', 'position': 'Técnica', 'gross_salary': 1000.0, 'social_security_rate': 0.0,
+        'employer_social_security_rate': 0.0, 'irs_rate': 11.5, 'extra_payment': 0.0,
+        'extra_payment_description': None, 'is_active': True, 'company_id': company.id,
+    }]
+    employee_select = next(statement for statement in queries if 'FROM employee' in statement and 'count(*)' not in statement)
+    assert 'employee.write_date' not in employee_select
+
+
+def test_orjson_provider_matches_the_stdlib_output(app):
+    pytest.importorskip('orjson')
+    stdlib, fast = DefaultJSONProvider(app), OrjsonProvider(app)
+    value = {
+        'b': 1.5, 'a': 'Órgão', 'when': datetime(2026, 3, 10, 8, 30), 'day': date(2026, 3, 10),
+        'id': uuid.UUID(int=1), 'nested': [None, True, {'z': 0, 'y': 2}],
+    }
+
+    assert fast.loads(fast.dumps(value)) == stdlib.loads(stdlib.dumps(value))
+    assert list(fast.loads(fast.dumps(value))) == sorted(value)
+    assert fast.dumps({'a': 1}, separators=(',', ':')) == '{"a":1}'
+
+    with app.test_request_context():
+        assert fast.response(value).get_json() == stdlib.response(value).get_json()
+
+
+def test_configure_json_honours_the_setting(app, monkeypatch):
+    original = app.json
+    try:
+        monkeypatch.setitem(app.config, 'JSON_PROVIDER', 'stdlib')
+        configure_json(app)
+        assert type(app.json) is DefaultJSONProvider
+    finally:
+        app.json = original
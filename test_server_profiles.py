@@ -0,0 +1,115 @@
+"""
+Server Profile Tests
+====================
+
+Tests for the gunicorn worker profiles, the matching SQLAlchemy engine
+options and the fork-safety of a preloaded app.
+
+Usage:
+    python -m pytest test_server_profiles.py
+"""
+
+import sys
+sys.dont_write_bytecode = True
+
+import os
+import subprocess
+
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, text
+
+from extensions import db
+from server_profiles import (
+    BACKGROUND_CONNECTIONS, dispose_engines, engine_options, preload_enabled, profile_name, worker_settings
+)
+
+
+def test_pool_follows_the_profile_concurrency(monkeypatch):
+    sync = engine_options('sqlite:////srv/cadete.db', 'sync')
+    monkeypatch.setenv('GUNICORN_THREADS', '8')
+    gthread = engine_options('sqlite:////srv/cadete.db', 'gthread', busy_timeout=5)
+
+    assert sync['pool_size'] == 1 + BACKGROUND_CONNECTIONS
+    assert gthread['pool_size'] == 8 + BACKGROUND_CONNECTIONS
+    assert gthread['pool_pre_ping'] is True
+    assert gthread['connect_args'] == {'check_same_thread': False, 'timeout': 5}
+    assert 'connect_args' not in engine_options('postgresql://cadete@localhost/cadete', 'gevent')
+
+
+def test_in_memory_sqlite_keeps_the_default_pool():
+    assert engine_options('sqlite:///:memory:', 'gthread') == {}
+    assert engine_options('sqlite://', 'gthread') == {}
+
+
+def test_profile_is_read_from_the_environment(monkeypatch):
+    monkeypatch.setenv('GUNICORN_PROFILE', 'GThread')
+    monkeypatch.setenv('GUNICORN_WORKERS', '3')
+
+    assert profile_name() == 'gthread'
+    assert worker_settings()['worker_class'] == 'gthread'
+    assert worker_settings()['workers'] == 3
+
+    monkeypatch.setenv('GUNICORN_PROFILE', 'eventlet')
+    with pytest.raises(ValueError):
+        profile_name()
+
+
+def test_engine_options_open_a_working_file_engine(tmp_path):
+    uri = f"sqlite:///{tmp_path / 'cadete.db'}"
+    engine = create_engine(uri, **engine_options(uri, 'gthread'))
+    with engine.connect() as connection:
+        assert connection.execute(text('SELECT 1')).scalar() == 1
+    engine.dispose()
+
+
+def test_preload_defaults_and_gevent(monkeypatch):
+    monkeypatch.delenv('GUNICORN_PRELOAD', raising=False)
+    assert preload_enabled('sync') is True
+    assert preload_enabled('gthread') is True
+    assert preload_enabled('gevent') is False
+
+    monkeypatch.setenv('GUNICORN_PRELOAD', 'false')
+    assert preload_enabled('sync') is False
+
+    monkeypatch.setenv('GUNICORN_PRELOAD', 'true')
+    with pytest.raises(ValueError):
+        preload_enabled('gevent')
+
+
+def test_dispose_engines_keeps_the_parent_connections_open(tmp_path):
+    forked = Flask(__name__)
+    forked.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'cadete.db'}"
+    db.init_app(forked)
+
+    with forked.app_context():
+        inherited_pool = db.engine.pool
+        connection = db.engine.connect()
+
+    dispose_engines(forked)
+
+    with forked.app_context():
+        assert db.engine.pool is not inherited_pool
+        # close=False: a ligação do "master" continua utilizável
+        assert connection.execute(text('SELECT 1')).scalar() == 1
+        connection.close()
+        with db.engine.connect() as fresh:
+            assert fresh.execute(text('SELECT 1')).scalar() == 1
+        db.engine.dispose()
+
+
+def test_importing_the_app_starts_no_threads(tmp_path):
+    # O master do gunicorn importa a aplicação com preload: não pode arrancar threads nem abrir ligações
+    script = (
+        "import threading, app\n"
+        "from extensions import db\n"
+        "with app.app.app_context(): opened = db.engine.pool.checkedin() + db.engine.pool.checkedout()\n"
+        "print(threading.active_count(), opened)\n"
+    )
+    env = dict(os.environ, FLASK_ENV='production', DATABASE_URI=f"sqlite:///{tmp_path / 'cadete.db'}",
+               PYTHONDONTWRITEBYTECODE='1')
+    result = subprocess.run([sys.executable, '-c', script], cwd=os.path.dirname(os.path.abspath(__file__)),
+                            env=env, capture_output=True, text=True, timeout=60)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ['1', '0']
@@ -0,0 +1,73 @@
+"""
+SQLite Pragma Tests
+===================
+
+Tests for the per-connection SQLite pragmas (WAL, synchronous, busy
+timeout, cache and mmap sizes) and the WAL checkpoint helper.
+
+Usage:
+    python -m pytest test_sqlite_pragmas.py
+"""
+
+import sys
+sys.dont_write_bytecode = True
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from extensions import db
+from sqlite_pragmas import checkpoint, configure_sqlite, sqlite_pragmas
+
+SETTINGS = {
+    'SQLITE_JOURNAL_MODE': 'wal',
+    'SQLITE_SYNCHRONOUS': 'normal',
+    'SQLITE_BUSY_TIMEOUT': 2,
+    'SQLITE_CACHE_SIZE_KB': 8000,
+    'SQLITE_MMAP_SIZE': 1048576,
+}
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'cadete.db'}")
+    assert configure_sqlite(engine, SETTINGS)
+    yield engine
+    engine.dispose()
+
+
+def pragma(connection, name):
+    return connection.execute(text(f"PRAGMA {name}")).scalar()
+
+
+def test_every_connection_gets_the_pragmas(engine):
+    with engine.connect() as connection:
+        assert pragma(connection, 'journal_mode') == 'wal'
+        assert pragma(connection, 'synchronous') == 1  # NORMAL
+        assert pragma(connection, 'busy_timeout') == 2000
+        assert pragma(connection, 'cache_size') == -8000
+        assert pragma(connection, 'mmap_size') == 1048576
+        assert pragma(connection, 'wal_autocheckpoint') == 1000
+
+
+def test_readers_are_not_blocked_by_an_open_write(engine):
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE ledger (id INTEGER PRIMARY KEY, value REAL)"))
+        connection.execute(text("INSERT INTO ledger (value) VALUES (1.0)"))
+
+    with engine.connect() as writer, engine.connect() as reader:
+        writer.execute(text("INSERT INTO ledger (value) VALUES (2.0)"))
+        # A escrita ainda não fez commit: o leitor vê o último estado confirmado, sem esperar
+        assert reader.execute(text("SELECT count(*) FROM ledger")).scalar() == 1
+        writer.commit()
+
+    busy, wal_pages, checkpointed = checkpoint(engine, 'truncate')
+    assert (busy, wal_pages, checkpointed) == (0, 0, 0)
+
+
+def test_in_memory_and_invalid_settings(app):
+    assert configure_sqlite(db.engine, SETTINGS) is False
+
+    with pytest.raises(ValueError):
+        sqlite_pragmas({'SQLITE_JOURNAL_MODE': 'wal; DROP TABLE user'})
+    with pytest.raises(ValueError):
+        checkpoint(db.engine, 'now')
@@ -0,0 +1,89 @@
+"""
+Static Asset Tests
+==================
+
+Tests for the fingerprinted, precompressed static asset build and the
+static endpoint that serves it.
+
+Usage:
+    python -m pytest test_static_assets.py
+"""
+
+import sys
+sys.dont_write_bytecode = True
+
+import gzip
+import json
+
+import pytest
+
+from static_assets import build_assets, static_assets
+
+
+@pytest.fixture
+def static_folder(tmp_path):
+    (tmp_path / 'company' / 'js').mkdir(parents=True)
+    (tmp_path / 'company' / 'js' / 'main.js').write_text(
+        '// Página de empresas\nfunction  openCompany( id ) {\n    return "/company/" + id;\n}\n' * 20
+    )
+    (tmp_path / 'company' / 'css').mkdir()
+    (tmp_path / 'company' / 'css' / 'main.css').write_text('/* grelha */\n.grid {\n    display: grid;\n}\n')
+    return tmp_path
+
+
+@pytest.fixture
+def built_assets(app, static_folder, monkeypatch):
+    build_assets(str(static_folder))
+    monkeypatch.setattr(static_assets, 'static_folder', str(static_folder))
+    monkeypatch.setattr(static_assets, 'manifest', {})
+    monkeypatch.setattr(static_assets, 'encodings', {})
+    static_assets.load()
+    return static_assets.manifest
+
+
+def test_build_writes_minified_fingerprinted_copies(static_folder):
+    report = build_assets(str(static_folder))
+
+    manifest = json.loads((static_folder / 'dist' / 'manifest.json').read_text())
+    output = manifest['company/js/main.js']
+    assert output.startswith('dist/company/js/main.') and output.endswith('.js')
+
+    minified = (static_folder / output).read_bytes()
+    assert b'// P' not in minified
+    assert gzip.decompress((static_folder / (output + '.gz')).read_bytes()) == minified
+    assert {row[0] for row in report} == {'company/js/main.js', 'company/css/main.css'}
+
+    (static_folder / 'company' / 'js' / 'main.js').write_text('function changed() {}\n')
+    build_assets(str(static_folder), prune=True)
+    new_output = json.loads((static_folder / 'dist' / 'manifest.json').read_text())['company/js/main.js']
+    assert new_output != output
+    assert not (static_folder / output).exists()
+
+
+def test_asset_url_uses_the_manifest(app, built_assets):
+    with app.test_request_context():
+        assert static_assets.url('company/js/main.js') == '/static/' + built_assets['company/js/main.js']
+        assert static_assets.url('login/js/main.js') == '/static/login/js/main.js'
+
+
+def test_fingerprinted_files_are_served_precompressed_and_immutable(client, built_assets, static_folder):
+    url = '/static/' + built_assets['company/js/main.js']
+
+    encoded = client.get(url, headers={'Accept-Encoding': 'gzip, deflate'})
+    assert encoded.headers['Content-Encoding'] == 'gzip'
+    assert encoded.mimetype in ('text/javascript', 'application/javascript')
+    assert 'immutable' in encoded.headers['Cache-Control']
+    assert 'max-age=31536000' in encoded.headers['Cache-Control']
+    assert 'Accept-Encoding' in encoded.headers['Vary']
+    assert gzip.decompress(encoded.data) == (static_folder / built_assets['company/js/main.js']).read_bytes()
+    encoded.close()
+
+    plain = client.get(url)
+    assert 'Content-Encoding' not in plain.headers
+    plain.close()
+
+    source = client.get('/static/company/js/main.js')
+    assert source.status_code == 200
+    assert 'immutable' not in source.headers['Cache-Control']
+    assert 'max-age=300' in source.headers['Cache-Control']
+    source.close()
@@ -0,0 +1,185 @@
+"""
+Summary Cache Tests
+===================
+
+Tests for the monthly summary cache, its commit-time invalidation and its
+version check against writes committed by other workers.
+
+Usage:
+    python -m pytest test_summary_cache.py
+"""
+
+import sys
+sys.dont_write_bytecode = True
+
+import os
+import time
+from datetime import datetime
+
+import pytest
+from flask import g
+from sqlalchemy import update
+
+from extensions import db
+from instance.base import Employee, Expenses, MonthlySummary, Settings
+from salary_automation import process_company_expenses
+from summary_cache import MemoryBackend, RedisBackend, SummaryCache, summary_cache
+from summary_rebuild import rebuild_summaries
+from summary_updates import ledger_deltas, upsert_summary_delta
+
+
+def summary_selects(statements):
+    return [statement for statement in statements if 'FROM monthly_summary' in statement and 'count(*)' not in statement]
+
+
+def financial_summary(client, company, year, month):
+    return client.get(f'/api/financial-summary?company_id={company.id}&month={month}&year={year}').get_json()['summary']
+
+
+def test_repeated_reads_are_served_from_cache(client, company, queries):
+    upsert_summary_delta(MonthlySummary, company.id, 2026, 3, ledger_deltas('ganho', 100.0, 100.0, 0.0))
+    db.session.commit()
+    company_id = company.id
+
+    queries.clear()
+    first = client.get(f'/api/financial-summary?company_id={company_id}&month=3&year=2026').get_json()
+    second = client.get(f'/api/financial-summary?company_id={company_id}&month=3&year=2026').get_json()
+
+    assert first == second
+    assert second['summary']['total_sales'] == 100.0
+    assert len(summary_selects(queries)) == 1
+    assert summary_cache.stats()['hits'] == 2
+    assert summary_cache.stats()['misses'] == 2
+
+
+def test_missing_months_are_cached_too(app, company, queries):
+    queries.clear()
+    assert summary_cache.get_summary('expenses', company.id, 2026, 1) is None
+    assert summary_cache.get_summary('expenses', company.id, 2026, 1) is None
+
+    assert len(summary_selects(queries)) == 1
+
+
+def test_ledger_routes_invalidate_on_commit(client, company):
+    now = datetime.utcnow()
+    assert financial_summary(client, company, now.year, now.month) == {}
+
+    client.post('/add-expenses', data={
+        'company_id': company.id, 'transaction_type': 'ganho', 'description': 'Venda',
+        'gross_value': 123.0, 'iva_rate': 23.0, 'iva_value': 23.0, 'net_value': 100.0,
+    })
+    assert financial_summary(client, company, now.year, now.month)['total_sales'] == 123.0
+
+    expense = Expenses.query.one()
+    client.post(f'/delete-expense/{expense.id}')
+    assert financial_summary(client, company, now.year, now.month)['total_sales'] == 0.0
+
+
+def test_rolled_back_write_keeps_cached_value(app, company):
+    upsert_summary_delta(MonthlySummary, company.id, 2026, 3, ledger_deltas('ganho', 100.0, 100.0, 0.0))
+    db.session.commit()
+    assert summary_cache.get_summary('expenses', company.id, 2026, 3).total_sales == 100.0
+
+    upsert_summary_delta(MonthlySummary, company.id, 2026, 3, ledger_deltas('ganho', 50.0, 50.0, 0.0))
+    db.session.rollback()
+
+    assert summary_cache.get_summary('expenses', company.id, 2026, 3).total_sales == 100.0
+    assert summary_cache.stats()['hits'] == 1
+
+
+def test_cache_hits_do_not_read_the_summary_table(app, company, queries):
+    upsert_summary_delta(MonthlySummary, company.id, 2026, 3, ledger_deltas('ganho', 100.0, 100.0, 0.0))
+    db.session.commit()
+    summary_cache.get_summaries('expenses', company.id, [(2026, 2), (2026, 3)])
+
+    queries.clear()
+    summaries = summary_cache.get_summaries('expenses', company.id, [(2026, 2), (2026, 3)])
+
+    assert summaries[(2026, 3)].total_sales == 100.0
+    assert [statement for statement in queries if 'monthly_summary' in statement] == []
+    assert len([statement for statement in queries if 'FROM config_version' in statement]) == 1
+
+
+def test_writes_from_other_workers_are_seen(app, company):
+    # Cache de outro worker: o commit abaixo só invalida a cache deste processo
+    other_worker = SummaryCache(MemoryBackend())
+    upsert_summary_delta(MonthlySummary, company.id, 2026, 3, ledger_deltas('ganho', 100.0, 100.0, 0.0))
+    db.session.commit()
+    assert other_worker.get_summary('expenses', company.id, 2026, 3).total_sales == 100.0
+
+    upsert_summary_delta(MonthlySummary, company.id, 2026, 3, ledger_deltas('ganho', 150.0, 150.0, 0.0))
+    db.session.commit()
+    assert other_worker.get_summary('expenses', company.id, 2026, 3).total_sales == 250.0
+    assert other_worker.stats()['hits'] == 0
+
+    # update() em massa: sobe a versão de todo o ledger
+    db.session.execute(update(MonthlySummary).values(total_sales=400.0))
+    db.session.commit()
+    assert other_worker.get_summary('expenses', company.id, 2026, 3).total_sales == 400.0
+    assert other_worker.get_summary('expenses', company.id, 2026, 3).total_sales == 400.0
+    assert other_worker.stats()['hits'] == 1
+
+
+def test_salary_automation_and_rebuild_invalidate(app, company):
+    settings = Settings(company.id, rent_value=0.0)
+    db.session.add(settings)
+    db.session.add(Employee('Ana', 1000.0, 'Técnica', company.id))
+    db.session.commit()
+    assert summary_cache.get_summary('expenses', company.id, 2026, 3) is None
+
+    process_company_expenses(company, settings, datetime(2026, 3, 31), db)
+    summary = summary_cache.get_summary('expenses', company.id, 2026, 3)
+    assert summary.total_employee_salaries == 1000.0
+
+    MonthlySummary.query.filter_by(company_id=company.id).update({'total_costs': 0.0})
+    db.session.commit()
+    summary_cache.clear()
+    assert summary_cache.get_summary('expenses', company.id, 2026, 3).total_costs == 0.0
+
+    rebuild_summaries('expenses', company_id=company.id)
+    assert summary_cache.get_summary('expenses', company.id, 2026, 3).total_costs == 1000.0
+
+
+def test_memory_backend_evicts_least_recently_used_and_expires():
+    backend = MemoryBackend(max_entries=2, ttl=60)
+    backend.set_many({'a': 1, 'b': 2})
+    backend.get_many(['a'])
+    backend.set_many({'c': 3})
+    assert backend.get_many(['a', 'b', 'c']) == {'a': 1, 'c': 3}
+
+    backend = MemoryBackend(max_entries=2, ttl=0.01)
+    backend.set_many({'a': 1})
+    time.sleep(0.02)
+    assert backend.get_many(['a']) == {}
+    assert len(backend) == 0
+
+
+def test_cache_stats_endpoint(client, user):
+    response = client.get('/api/cache-stats')
+    assert response.status_code == 200
+    assert response.get_json()['summary_cache']['backend'] == 'memory'
+
+    user.type = 'User'
+    db.session.commit()
+    # Os pedidos do test client partilham o app context da fixture; em produção cada pedido tem o seu
+    g.pop('_login_user', None)
+    assert client.get('/api/cache-stats').status_code == 403
+
+
+def test_redis_backend_round_trip():
+    pytest.importorskip('redis')
+    backend = RedisBackend(os.environ.get('SUMMARY_CACHE_URL', 'redis://localhost:6379/15'), ttl=5, prefix='cadete:test:')
+    try:
+        backend.client.ping()
+    except Exception:
+        pytest.skip('servidor Redis indisponível')
+
+    backend.clear()
+    backend.set_many({('expenses', 1, 2026, 3): {'total_sales': 10.0}, ('expenses', 1, 2026, 4): {}})
+    assert backend.get_many([('expenses', 1, 2026, 3), ('expenses', 1, 2026, 4), ('expenses', 1, 2026, 5)]) == {
+        ('expenses', 1, 2026, 3): {'total_sales': 10.0},
+        ('expenses', 1, 2026, 4): {},
+    }
+    backend.delete_many([('expenses', 1, 2026, 3)])
+    assert backend.get_many([('expenses', 1, 2026, 3)]) == {}
+    backend.clear()
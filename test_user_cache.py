@@ -0,0 +1,109 @@
+"""
+User Cache Tests
+================
+
+Tests for the cached Flask-Login user loader and its validation against
+the per-user version counters, including writes made by other workers.
+
+Usage:
+    python -m pytest test_user_cache.py
+"""
+
+import sys
+sys.dont_write_bytecode = True
+
+import time
+
+from flask import g
+from sqlalchemy import update
+
+from app import load_user
+from extensions import db
+from instance.base import User
+from user_cache import UserCache, user_cache
+
+
+def user_selects(statements):
+    return [statement for statement in statements if 'FROM user' in statement]
+
+
+def test_loader_queries_once_per_ttl(app, user, queries):
+    user_id = user.id
+    queries.clear()
+    first = load_user(str(user_id))
+    second = load_user(str(user_id))
+
+    assert first is second
+    assert (second.id, second.type, second.username) == (user_id, 'Admin', 'tester')
+    assert second.is_authenticated
+    assert len(user_selects(queries)) == 1
+    assert user_cache.stats()['hits'] == 1
+    # Um acerto só lê os contadores de versão
+    assert sum('FROM config_version' in statement for statement in queries) == 2
+
+
+def test_missing_user_is_not_cached(app):
+    assert load_user('999') is None
+    assert user_cache.stats()['entries'] == 0
+
+
+def test_expired_entry_is_reloaded(app, user, queries):
+    user_id = user.id
+    user_cache.ttl = 0.01
+    try:
+        load_user(str(user_id))
+        time.sleep(0.02)
+        queries.clear()
+        load_user(str(user_id))
+        assert len(user_selects(queries)) == 1
+    finally:
+        user_cache.ttl = app.config['USER_CACHE_TTL']
+
+
+def test_failed_login_and_password_change_invalidate(app, user):
+    cached = load_user(str(user.id))
+
+    app.test_client().post('/login', data={'username': 'tester', 'password': 'errada'})
+    assert load_user(str(user.id)) is not cached
+
+    cached = load_user(str(user.id))
+    user.set_password('nova')
+    db.session.commit()
+    assert load_user(str(user.id)) is not cached
+
+
+def test_bulk_update_invalidates_and_rollback_keeps_entry(app, user):
+    cached = load_user(str(user.id))
+
+    db.session.execute(update(User).values(is_locked=True))
+    db.session.rollback()
+    assert load_user(str(user.id)) is cached
+
+    db.session.execute(update(User).values(type='User'))
+    db.session.commit()
+    assert load_user(str(user.id)).type == 'User'
+
+
+def test_type_change_outside_the_cache_is_seen_by_the_next_request(app, user, client):
+    assert client.get('/api/cache-stats').status_code == 200
+
+    # Outro worker, com a sua própria cache, despromove o utilizador
+    other_worker = UserCache()
+    assert other_worker.get(user.id).type == 'Admin'
+    user.type = 'User'
+    db.session.commit()
+    g.pop('_login_user', None)
+
+    assert client.get('/api/cache-stats').status_code == 403
+    assert other_worker.get(user.id).type == 'User'
+
+
+def test_locked_user_is_logged_out(app, user, client):
+    assert client.get('/api/cache-stats').status_code == 200
+
+    db.session.execute(update(User).where(User.id == user.id).values(is_locked=True))
+    db.session.commit()
+    g.pop('_login_user', None)
+
+    assert not load_user(str(user.id)).is_active
+    assert client.get('/api/cache-stats').status_code == 302
@@ -0,0 +1,128 @@
+import threading
+import time
+from flask_login import UserMixin
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from config_cache import bump_config_version
+from extensions import db
+from instance.base import ConfigVersion, User
+
+# Contadores em config_version: 'user' sobe com escritas em massa, 'user:<id>' com cada utilizador
+ALL_USERS_VERSION = 'user'
+
+
+def version_names(user_id):
+    return ALL_USERS_VERSION, f'user:{int(user_id)}'
+
+
+def current_user_version(user_id):
+    """'<all users>.<user>' version of one user, read with one primary-key query on config_version."""
+    names = version_names(user_id)
+    versions = dict(db.session.execute(
+        select(ConfigVersion.name, ConfigVersion.version).where(ConfigVersion.name.in_(names))
+    ).all())
+    return '.'.join(str(versions.get(name, 0)) for name in names)
+
+
+class CachedUser(UserMixin):
+    """
+    Detached snapshot of the fields of a User that requests read from current_user.
+
+    is_active is False for deactivated or locked accounts, so Flask-Login
+    treats an existing session of such a user as logged out.
+    """
+
+    def __init__(self, id, username, name, type, active, is_locked, write_date):
+        self.id = id
+        self.username = username
+        self.name = name
+        self.type = type
+        self.active = active
+        self.is_locked = is_locked
+        self.write_date = write_date
+
+    @property
+    def is_active(self):
+        return self.active is not False and not self.is_locked
+
+
+class UserCache:
+    """
+    Process-local TTL cache behind Flask-Login's user_loader.
+
+    Every write to a User row (login, failed attempts, locks, password or
+    type changes) bumps that user's counter in config_version in the same
+    transaction, and bulk updates bump the counter shared by all users.
+    Each lookup reads those counters with one primary-key query and reuses
+    the snapshot only while they are unchanged, so a demotion or lock made
+    by another gunicorn worker applies to the very next request.
+    """
+
+    def __init__(self, ttl=30):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def configure(self, app):
+        self.ttl = app.config.get('USER_CACHE_TTL', 30)
+
+    def get(self, user_id):
+        now = time.monotonic()
+        version = current_user_version(user_id)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now and entry[1] == version:
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        row = db.session.execute(
+            select(User.id, User.username, User.name, User.type, User.active, User.is_locked, User.write_date)
+            .where(User.id == user_id)
+        ).first()
+        if row is None:
+            return None
+
+        user = CachedUser(row.id, row.username, row.name, row.type, row.active, row.is_locked, row.write_date)
+        if self.ttl > 0:
+            with self._lock:
+                self._entries[user_id] = (now + self.ttl, version, user)
+        return user
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+user_cache = UserCache()
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_flushed_users(session, flush_context):
+    changed = {
+        obj.id
+        for obj in (session.new | session.dirty | session.deleted)
+        if isinstance(obj, User) and (obj in session.new or obj in session.deleted or session.is_modified(obj))
+    }
+    for user_id in sorted(changed):
+        bump_config_version(version_names(user_id)[1], session)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _bump_bulk_user_writes(orm_execute_state):
+    # update(User)/delete(User) em massa não passam pelo flush
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and orm_execute_state.bind_mapper is User.__mapper__:
+        bump_config_version(ALL_USERS_VERSION, orm_execute_state.session)